@@ -0,0 +1,140 @@
+"""
+Benchmark: login and route throughput under a mixed load.
+
+Starts gunicorn with the repo's gunicorn.conf.py (one worker, two threads)
+on a throw-away seeded instance, then runs login clients and route clients
+side by side for a fixed time. The same load runs twice: with bcrypt inline
+on the request threads (FLASK_BCRYPT_WORKERS=0, the old behaviour) and with
+the bounded hashing executor (the default).
+
+Usage:
+    python benchmarks/auth_load.py [--seconds 10] [--logins 4] [--routes 2]
+"""
+import argparse
+import http.cookiejar
+import os
+import random
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+CSRF: re.Pattern = re.compile(r'name="csrf_token" type="hidden" value="([^"]+)"')
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def login_client(base: str, stop: threading.Event, results: dict) -> None:
+    """
+    Log in over and over; count successes and 503 backpressure answers.
+    """
+    while not stop.is_set():
+        opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        start: float = time.perf_counter()
+        try:
+            page: str = opener.open(f'{base}/users/login', timeout=30).read().decode('utf-8')
+            data: bytes = urllib.parse.urlencode({'csrf_token': CSRF.search(page).group(1), 'id': 'bench',
+                                                  'passwd': 'benchmark'}).encode('utf-8')
+            opener.open(f'{base}/users/login', data=data, timeout=30).read()
+            results['login'].append(time.perf_counter() - start)
+        except urllib.error.HTTPError as error:
+            results['busy' if error.code == 503 else 'errors'].append(error.code)
+            time.sleep(float(error.headers.get('Retry-After', 1)) if error.code == 503 else 0)
+
+
+def route_client(base: str, schools: int, stop: threading.Event, results: dict) -> None:
+    """
+    Request single routes between random schools; record latencies.
+    """
+    rng: random.Random = random.Random(threading.get_ident())
+    while not stop.is_set():
+        url: str = f'{base}/api/routes/alternatives?source_id={rng.randint(1, schools)}&target_id={rng.randint(1, schools)}&k=1'
+        start: float = time.perf_counter()
+        try:
+            urllib.request.urlopen(url, timeout=30).read()
+            results['route'].append(time.perf_counter() - start)
+        except urllib.error.HTTPError as error:
+            results['errors'].append(error.code)
+
+
+def run(workdir: str, env: dict, args: argparse.Namespace) -> dict:
+    """
+    Run one load scenario against a fresh gunicorn and return its samples.
+    """
+    port: int = free_port()
+    env = {**os.environ, **env, 'PORT': str(port), 'WORKERS': '1', 'THREADS': '2',
+           'PYTHONPATH': os.path.join(ROOT, 'src')}
+    server = subprocess.Popen(['gunicorn', '-c', os.path.join(ROOT, 'gunicorn.conf.py'), 'app:app'], cwd=workdir,
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base: str = f'http://127.0.0.1:{port}'
+    try:
+        for _ in range(200):
+            try:
+                urllib.request.urlopen(f'{base}/ready', timeout=5).read()
+                break
+            except OSError:
+                time.sleep(0.1)
+        results: dict = {'login': [], 'route': [], 'busy': [], 'errors': []}
+        stop: threading.Event = threading.Event()
+        threads: list = [threading.Thread(target=login_client, args=(base, stop, results)) for _ in range(args.logins)]
+        threads += [threading.Thread(target=route_client, args=(base, args.schools, stop, results)) for _ in range(args.routes)]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return results
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--logins', type=int, default=4, help='concurrent login clients')
+    parser.add_argument('--routes', type=int, default=2, help='concurrent route clients')
+    parser.add_argument('--schools', type=int, default=200)
+    parser.add_argument('--rounds', type=int, default=12, help='bcrypt cost (FLASK_BCRYPT_ROUNDS)')
+    args = parser.parse_args()
+
+    workdir: str = tempfile.mkdtemp(prefix='campus-link-auth-')
+    try:
+        subprocess.check_call([sys.executable, os.path.join(ROOT, 'benchmarks', 'startup.py'), '--child', 'seed',
+                               '--schools', str(args.schools)], cwd=workdir)
+        scenarios: list = [
+            ('bcrypt inline', {'FLASK_BCRYPT_WORKERS': '0'}),
+            ('bcrypt executor', {}),
+        ]
+        print(f'{args.logins} login + {args.routes} route clients, {args.seconds:g}s, bcrypt cost {args.rounds}, '
+              f'1 worker x 2 threads')
+        print(f'{"":18}{"logins/s":>10}{"busy/s":>9}{"login p50":>11}{"routes/s":>10}{"route p50":>11}{"route p95":>11}')
+        for title, env in scenarios:
+            results: dict = run(workdir, {**env, 'FLASK_BCRYPT_ROUNDS': str(args.rounds)}, args)
+            route: list = sorted(results['route']) or [0.0]
+            login: list = results['login'] or [0.0]
+            route_p95: float = route[min(int(len(route) * 0.95), len(route) - 1)]
+            print(f'{title:18}{len(results["login"]) / args.seconds:>10.1f}{len(results["busy"]) / args.seconds:>9.1f}'
+                  f'{statistics.median(login) * 1000:>9.0f}ms{len(results["route"]) / args.seconds:>10.1f}'
+                  f'{statistics.median(route) * 1000:>9.0f}ms{route_p95 * 1000:>9.0f}ms'
+                  + (f'  errors: {len(results["errors"])}' if results['errors'] else ''))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
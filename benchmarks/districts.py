@@ -0,0 +1,171 @@
+"""
+Deterministic generator of synthetic school districts for benchmarks.
+
+Schools are scattered around district centres on a plane. Inside a
+district each school is linked to its nearest neighbours. Districts are
+joined only through their hub schools, each linked to the hubs of the
+nearest districts, plus a chain through all hubs so the graph is
+connected. This gives the sparse, clustered shape of real transport costs:
+many cheap local edges and a few expensive long ones.
+
+The same arguments always give the same graph: all randomness comes from
+one seeded random.Random.
+
+Usage as a module:
+    from districts import generate_district
+    edges, names = generate_district(10000, degree=4, seed=1)
+
+or to write CSV files `flask import-data` reads:
+    python benchmarks/districts.py --schools 10000 --output-dir /tmp/district
+"""
+import argparse
+import csv
+import itertools
+import math
+import os
+import random
+from typing import Dict, List, Tuple
+
+COSTS: Tuple[str, ...] = ('distance', 'uniform', 'lognormal')
+
+# Plane size in cost units; a district spans roughly DISTRICT_RADIUS
+PLANE: int = 10000
+DISTRICT_RADIUS: int = 400
+
+
+def _edge_cost(rng: random.Random, distance: float, cost: str, max_cost: int) -> int:
+    """
+    Cost of one edge under a cost distribution.
+
+    Args:
+        rng (random.Random): Generator state
+        distance (float): Euclidean distance between the schools
+        cost (str): 'distance' (proportional, +-20% noise), 'uniform' (1..max_cost)
+                    or 'lognormal' (heavy-tailed around max_cost / 10)
+        max_cost (int): Largest cost produced
+
+    Returns:
+        int: Cost between 1 and max_cost
+    """
+    if cost == 'uniform':
+        value: float = rng.randint(1, max_cost)
+    elif cost == 'lognormal':
+        value = rng.lognormvariate(math.log(max(max_cost / 10, 1)), 0.75)
+    else:
+        value = distance / 10 * rng.uniform(0.8, 1.2)
+    return max(1, min(max_cost, int(round(value))))
+
+
+def generate_district(schools: int, degree: int = 4, districts: int = 0, cost: str = 'distance',
+                      max_cost: int = 500, seed: int = 1) -> Tuple[List[Tuple[int, int, int]], Dict[int, str]]:
+    """
+    Generate a clustered school graph.
+
+    Args:
+        schools (int): Number of schools (IDs 1..schools)
+        degree (int): Local edges entered per school (before reverse edges are added)
+        districts (int): Number of clusters (0: one per ~250 schools)
+        cost (str): Cost distribution, one of COSTS
+        max_cost (int): Largest edge cost
+        seed (int): Random seed
+
+    Returns:
+        (edges, names): Directed (from, to, cost) triples, as stored in
+                        transportation_costs (at most one per school pair),
+                        and school ID -> name
+    """
+    assert cost in COSTS, f'Unknown cost distribution: {cost}'
+    rng: random.Random = random.Random(seed)
+    districts = districts or max(1, schools // 250)
+    centres: List[Tuple[float, float]] = [(rng.uniform(0, PLANE), rng.uniform(0, PLANE)) for _ in range(districts)]
+    members: List[List[int]] = [[] for _ in range(districts)]
+    position: Dict[int, Tuple[float, float]] = {}
+    names: Dict[int, str] = {}
+    # Uneven district sizes, like real ones: a few large, many small
+    cum_weights: List[float] = list(itertools.accumulate(rng.paretovariate(1.5) for _ in range(districts)))
+    for sid in range(1, schools + 1):
+        # Every district gets at least one school
+        district: int = sid - 1 if sid <= districts else rng.choices(range(districts), cum_weights=cum_weights)[0]
+        cx, cy = centres[district]
+        position[sid] = (rng.gauss(cx, DISTRICT_RADIUS), rng.gauss(cy, DISTRICT_RADIUS))
+        members[district].append(sid)
+        names[sid] = f'District {district + 1} School {len(members[district])}'
+
+    edges: Dict[Tuple[int, int], int] = {}
+
+    def link(a: int, b: int, scale: float = 1.0) -> None:
+        # One cost row per pair, like the costs form (the reverse is implied)
+        if a != b and (a, b) not in edges and (b, a) not in edges:
+            distance: float = math.dist(position[a], position[b])
+            edges[(a, b)] = min(max_cost, int(_edge_cost(rng, distance, cost, max_cost) * scale) or 1)
+
+    window: int = 2 * degree
+    for group in members:
+        # Nearest neighbours among the schools closest in x: a cheap, local approximation
+        group.sort(key=lambda sid: position[sid])
+        for i, sid in enumerate(group):
+            candidates: List[int] = group[max(0, i - window):i] + group[i + 1:i + 1 + window]
+            candidates.sort(key=lambda other: math.dist(position[sid], position[other]))
+            for other in candidates[:degree]:
+                link(sid, other)
+            if i:
+                # Chain through the district keeps it connected
+                link(group[i - 1], sid)
+
+    hubs: List[int] = [group[len(group) // 2] for group in members if group]
+    for hub in hubs:
+        nearest: List[int] = sorted(hubs, key=lambda other: math.dist(position[hub], position[other]))[1:3]
+        for other in nearest:
+            link(hub, other, scale=2.0)
+    ordered: List[int] = sorted(hubs, key=lambda hub: position[hub])
+    for a, b in zip(ordered, ordered[1:]):
+        link(a, b, scale=2.0)
+    return [(a, b, weight) for (a, b), weight in edges.items()], names
+
+
+def build_graph(edges: List[Tuple[int, int, int]], schools: List[int], bidirectional: bool = True) -> Dict[int, Dict[int, int]]:
+    """
+    Adjacency dict with the rules of ResourceOptimizer.build_graph_from_database().
+
+    Args:
+        edges (List[Tuple[int, int, int]]): (from, to, cost) triples
+        schools (List[int]): All school IDs
+        bidirectional (bool): Add the reverse of every edge unless entered explicitly
+
+    Returns:
+        Dict[int, Dict[int, int]]: School connections with costs
+    """
+    graph: Dict[int, Dict[int, int]] = {sid: {} for sid in schools}
+    for a, b, weight in edges:
+        graph[a][b] = weight
+        if bidirectional:
+            graph[b].setdefault(a, weight)
+    return graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--schools', type=int, default=10000)
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--districts', type=int, default=0)
+    parser.add_argument('--cost', choices=COSTS, default='distance')
+    parser.add_argument('--max-cost', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output-dir', default='.')
+    args = parser.parse_args()
+
+    edges, names = generate_district(args.schools, args.degree, args.districts, args.cost, args.max_cost, args.seed)
+    os.makedirs(args.output_dir, exist_ok=True)
+    with open(os.path.join(args.output_dir, 'schools.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['id', 'name', 'address', 'type', 'status'])
+        writer.writerows((sid, name, '-', 'high school', 'Open') for sid, name in names.items())
+    with open(os.path.join(args.output_dir, 'costs.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['from_school_id', 'to_school_id', 'cost'])
+        writer.writerows(edges)
+    print(f'{len(names)} schools, {len(edges)} costs written to {args.output_dir}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark: incremental tree repair vs full Dijkstra after a cost edit.
+
+Builds a synthetic district (schools on a grid, each linked to nearby
+schools), computes a shortest-path tree, then applies random cost increases
+and decreases. Each edit is handled twice, once by dynamic_sp.repair_tree()
+and once by a full CSRGraph search, and the results are compared.
+
+Usage:
+    python benchmarks/dynamic_sp.py [--schools 20000] [--edits 200] [--seed 1]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from typing import Dict, List
+
+# csr and dynamic_sp only need the standard library; import them directly so
+# the benchmark does not create the Flask app or touch the database
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src', 'app'))
+from csr import CSRGraph  # noqa: E402
+from dynamic_sp import repair_tree  # noqa: E402
+
+
+def synthetic_graph(schools: int, seed: int) -> Dict[int, Dict[int, int]]:
+    """
+    Grid-like district: every school links to up to 4 random nearby schools.
+
+    Args:
+        schools (int): Number of schools
+        seed (int): Random seed
+
+    Returns:
+        Dict[int, Dict[int, int]]: School connections with costs
+    """
+    rng: random.Random = random.Random(seed)
+    side: int = max(1, int(schools ** 0.5))
+    graph: Dict[int, Dict[int, int]] = {sid: {} for sid in range(1, schools + 1)}
+    for sid in graph:
+        row, col = divmod(sid - 1, side)
+        for _ in range(4):
+            other: int = (row + rng.randint(-2, 2)) * side + (col + rng.randint(-2, 2)) + 1
+            if other != sid and other in graph:
+                graph[sid][other] = rng.randint(1, 100)
+    return graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--schools', type=int, default=20000)
+    parser.add_argument('--edits', type=int, default=200)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng: random.Random = random.Random(args.seed)
+    graph: Dict[int, Dict[int, int]] = synthetic_graph(args.schools, args.seed)
+    reverse: Dict[int, Dict[int, int]] = {sid: {} for sid in graph}
+    for tail, edges in graph.items():
+        for head, weight in edges.items():
+            reverse[head][tail] = weight
+    csr: CSRGraph = CSRGraph.from_dict(graph)
+    edges: List[tuple] = [(tail, head) for tail, row in graph.items() for head in row]
+    distances, predecessors = csr.shortest_path_tree(1)
+
+    repair_time: float = 0.0
+    full_time: float = 0.0
+    touched: List[int] = []
+    for _ in range(args.edits):
+        tail, head = rng.choice(edges)
+        old_weight: int = graph[tail][head]
+        new_weight: int = max(1, old_weight + rng.choice((-1, 1)) * rng.randint(1, 50))
+        graph[tail][head] = new_weight
+        reverse[head][tail] = new_weight
+        row: int = csr.index[tail]
+        for k in range(csr.offsets[row], csr.offsets[row + 1]):
+            if csr.targets[k] == csr.index[head]:
+                csr.weights[k] = new_weight
+
+        start: float = time.perf_counter()
+        distances, predecessors, count = repair_tree(graph, reverse, csr.ids, csr.index,
+                                                     distances, predecessors, tail, head, old_weight)
+        repair_time += time.perf_counter() - start
+        touched.append(count)
+
+        start = time.perf_counter()
+        expected, _ = csr.shortest_path_tree(1)
+        full_time += time.perf_counter() - start
+        if expected != distances:
+            sys.exit(f'repair mismatch after editing {tail}->{head}')
+
+    touched.sort()
+    print(f'schools={len(csr)} edges={csr.num_edges} edits={args.edits}')
+    print(f'repair: {repair_time / args.edits * 1000:.3f} ms/edit '
+          f'(touched median {touched[len(touched) // 2]}, max {touched[-1]})')
+    print(f'full:   {full_time / args.edits * 1000:.3f} ms/edit')
+    print(f'speedup: {full_time / max(repair_time, 1e-9):.0f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+"""
+Benchmark suite: graph build, single-pair queries, full trees and memory.
+
+For each district size a synthetic graph from districts.py is loaded into
+a throw-away database, then the suite times:
+
+    build    generating the dict graph from edges, CSRGraph.from_dict, and
+             ResourceOptimizer.build_graph_from_database() (ORM, like a worker)
+    query    one source/target pair with sp.dijkstra, sp.bidirectional_dijkstra,
+             sp.alt_search, CSRGraph.search and ResourceOptimizer.find_optimal_path
+             (auto engine, end to end, graph already cached)
+    tree     a full shortest-path tree with sp.shortest_path_tree and
+             CSRGraph.shortest_path_tree
+    memory   bytes held by the dict graph (tracemalloc) and the CSR arrays
+
+Every run uses the same seeded pairs and sources, so two result files are
+comparable: the JSON holds the run's settings, the machine and commit, and
+per metric the runs, min, mean, p50 and p95 in milliseconds. --compare
+prints the p50 ratio of this run against an earlier file.
+
+Usage:
+    python benchmarks/shortest_paths.py [--sizes 100,1000,10000,100000] [--queries 20]
+                                        [--trees 3] [--output shortest_paths.json]
+                                        [--compare baseline.json]
+"""
+import argparse
+import datetime
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from districts import COSTS, build_graph, generate_district  # noqa: E402
+
+
+def stats(samples: List[float]) -> Dict[str, float]:
+    """
+    Summary of timings in milliseconds.
+
+    Args:
+        samples (List[float]): Durations in seconds
+
+    Returns:
+        Dict[str, float]: runs, min, mean, p50 and p95
+    """
+    ordered: List[float] = sorted(sample * 1000 for sample in samples)
+    return {'runs': len(ordered), 'min': round(ordered[0], 3), 'mean': round(sum(ordered) / len(ordered), 3),
+            'p50': round(ordered[len(ordered) // 2], 3),
+            'p95': round(ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)], 3)}
+
+
+def timed(function: Callable, *args) -> Tuple[float, object]:
+    """
+    Run a function once with the garbage collector paused.
+
+    Returns:
+        Tuple[float, object]: Duration in seconds and the result
+    """
+    gc.collect()
+    gc.disable()
+    try:
+        start: float = time.perf_counter()
+        result: object = function(*args)
+        return time.perf_counter() - start, result
+    finally:
+        gc.enable()
+
+
+def seed_database(edges: List[Tuple[int, int, int]], names: Dict[int, str]) -> None:
+    """
+    Replace the schools and costs of the benchmark database.
+
+    Args:
+        edges (List[Tuple[int, int, int]]): (from, to, cost) triples
+        names (Dict[int, str]): School ID -> name
+    """
+    from app import db
+    from app.optimizer import graph_cache
+    with db.engine.begin() as connection:
+        connection.exec_driver_sql('DELETE FROM transportation_costs')
+        connection.exec_driver_sql('DELETE FROM schools')
+        connection.exec_driver_sql("INSERT INTO schools (id, name, address, _type, status) "
+                                   "VALUES (?, ?, '-', 'high school', 'Open')", list(names.items()))
+        connection.exec_driver_sql('INSERT INTO transportation_costs (from_school_id, to_school_id, cost) '
+                                   'VALUES (?, ?, ?)', edges)
+    graph_cache.invalidate()
+
+
+def run_size(schools: int, args: argparse.Namespace) -> dict:
+    """
+    Every measurement for one district size.
+
+    Args:
+        schools (int): Number of schools
+        args (argparse.Namespace): Suite settings
+
+    Returns:
+        dict: Graph shape plus timings (ms) and memory (bytes) per metric
+    """
+    from app import sp
+    from app.csr import CSRGraph
+    from app.optimizer import ResourceOptimizer
+
+    elapsed, (edges, names) = timed(generate_district, schools, args.degree, 0, args.cost, args.max_cost, args.seed)
+    ids: List[int] = list(names)
+    rng: random.Random = random.Random(args.seed)
+    pairs: List[Tuple[int, int]] = [(rng.choice(ids), rng.choice(ids)) for _ in range(args.queries)]
+    sources: List[int] = [rng.choice(ids) for _ in range(args.trees)]
+    timings: Dict[str, List[float]] = {'build.generate': [elapsed]}
+
+    def measure(name: str, function: Callable, *call_args) -> object:
+        duration, result = timed(function, *call_args)
+        timings.setdefault(name, []).append(duration)
+        return result
+
+    graph: Dict[int, Dict[int, int]] = {}
+    csr: Optional[CSRGraph] = None
+    for _ in range(args.builds):
+        graph = measure('build.graph_dict', build_graph, edges, ids)
+        csr = measure('build.csr', CSRGraph.from_dict, graph)
+    seed_database(edges, names)
+    for _ in range(args.builds):
+        measure('build.database', ResourceOptimizer(bidirectional=True).build_graph_from_database)
+    reverse: Dict[int, Dict[int, int]] = measure('build.reverse', sp.reverse_graph, graph)
+    landmarks: list = measure('build.alt_landmarks', lambda: sp.landmark_distances(
+        graph, reverse, sp.select_landmarks(graph, reverse, 8)))
+
+    optimizer: ResourceOptimizer = ResourceOptimizer(bidirectional=True)
+    optimizer.find_optimal_path(*pairs[0])  # graph load and per-version precomputation, not timed
+    for source, target in pairs:
+        if source == target:
+            continue
+        expected: float = measure('query.sp_dijkstra', sp.dijkstra, graph, source, target)[0]
+        bidirectional: tuple = measure('query.sp_bidirectional', sp.bidirectional_dijkstra, graph, reverse, source, target)
+        assert bidirectional[0] == expected
+        assert measure('query.sp_alt', sp.alt_search, graph, source, target, landmarks)[0] == expected
+        distances, _ = measure('query.csr', csr.search, csr.index[source], csr.index[target])
+        assert distances[csr.index[target]] == expected
+        assert measure('query.optimizer', optimizer.find_optimal_path, source, target)['total_cost'] == expected
+    for source in sources:
+        measure('tree.sp', sp.shortest_path_tree, graph, source)
+        measure('tree.csr', csr.shortest_path_tree, source)
+
+    del reverse, landmarks, optimizer
+    gc.collect()
+    tracemalloc.start()
+    graph = build_graph(edges, ids)
+    dict_bytes: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return {
+        'schools': schools,
+        'edges': csr.num_edges,
+        'costs': len(edges),
+        'timings': {name: stats(samples) for name, samples in timings.items()},
+        'memory': {'graph_dict': dict_bytes, 'csr': csr.nbytes(),
+                   'bytes_per_edge_dict': round(dict_bytes / csr.num_edges, 1),
+                   'bytes_per_edge_csr': round(csr.nbytes() / csr.num_edges, 1)},
+    }
+
+
+def machine() -> dict:
+    """
+    Where the suite ran: Python, platform, CPUs and git commit.
+    """
+    try:
+        commit: Optional[str] = subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                                        stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'commit': commit}
+
+
+def compare(results: dict, baseline_path: str) -> None:
+    """
+    Print p50 ratios (this run / baseline) for sizes and metrics in both files.
+
+    Args:
+        results (dict): This run
+        baseline_path (str): Earlier output of this script
+    """
+    with open(baseline_path) as f:
+        baseline: dict = json.load(f)
+    before: Dict[int, dict] = {entry['schools']: entry for entry in baseline['results']}
+    print(f'\np50 vs {baseline_path} (commit {baseline["machine"].get("commit")}), <1 is faster')
+    for entry in results['results']:
+        old: Optional[dict] = before.get(entry['schools'])
+        if old is None:
+            continue
+        ratios: List[str] = [f'{name} {timing["p50"] / old["timings"][name]["p50"]:.2f}'
+                             for name, timing in entry['timings'].items()
+                             if name in old['timings'] and old['timings'][name]['p50']]
+        print(f'{entry["schools"]:>7}: ' + ', '.join(ratios))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', default='100,1000,10000,100000', help='Comma-separated school counts.')
+    parser.add_argument('--degree', type=int, default=4)
+    parser.add_argument('--cost', choices=COSTS, default='distance')
+    parser.add_argument('--max-cost', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--queries', type=int, default=20, help='Source/target pairs per size.')
+    parser.add_argument('--trees', type=int, default=3, help='Full trees per size.')
+    parser.add_argument('--builds', type=int, default=3, help='Repetitions of each graph build.')
+    parser.add_argument('--output', default='shortest_paths.json')
+    parser.add_argument('--compare', help='Earlier output file to compare against.')
+    args = parser.parse_args()
+    sizes: List[int] = [int(size) for size in args.sizes.split(',')]
+    output: str = os.path.abspath(args.output)
+
+    workdir: str = tempfile.mkdtemp(prefix='campus-link-sp-')
+    os.chdir(workdir)
+    sys.path.insert(0, os.path.join(ROOT, 'src'))
+    from app import app, db
+    # Keep background hierarchy builds from competing with the timings
+    app.config['CH_MIN_NODES'] = 0
+    results: dict = {'suite': 'shortest_paths', 'started': datetime.datetime.now(datetime.timezone.utc).isoformat(
+        timespec='seconds'), 'machine': machine(), 'settings': {**vars(args), 'sizes': sizes}, 'results': []}
+    try:
+        with app.app_context():
+            db.create_all()
+            print(f'{"schools":>8}{"edges":>9}{"db build":>10}{"csr":>8}{"dijkstra":>10}{"bidir":>8}'
+                  f'{"alt":>8}{"csr q":>8}{"route":>8}{"sp tree":>9}{"csr tree":>9}{"B/edge":>8}')
+            for schools in sizes:
+                entry: dict = run_size(schools, args)
+                results['results'].append(entry)
+                t: Dict[str, dict] = entry['timings']
+                print(f'{schools:>8}{entry["edges"]:>9}' + ''.join(
+                    f'{t[name]["p50"]:>{width}.1f}' for name, width in (
+                        ('build.database', 10), ('build.csr', 8), ('query.sp_dijkstra', 10),
+                        ('query.sp_bidirectional', 8), ('query.sp_alt', 8), ('query.csr', 8),
+                        ('query.optimizer', 8), ('tree.sp', 9), ('tree.csr', 9)))
+                    + f'{entry["memory"]["bytes_per_edge_dict"]:>8.0f}', flush=True)
+    finally:
+        os.chdir(ROOT)
+        shutil.rmtree(workdir, ignore_errors=True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f'p50 in ms; results written to {output}')
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
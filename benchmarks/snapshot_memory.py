@@ -0,0 +1,111 @@
+"""
+Benchmark: per-worker memory of the graph with and without shared snapshots.
+
+A district is seeded once, then several processes (like gunicorn workers)
+load the graph at the same time, run a few searches and report their
+resident (RSS) and proportional (PSS, shared pages split between the
+processes that map them) set sizes above a bare `import app` baseline,
+plus how long the first graph load took. RSS is shown for the lightest
+and heaviest process, PSS summed over all of them.
+
+Usage:
+    python benchmarks/snapshot_memory.py [--schools 20000] [--processes 4]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def memory() -> dict:
+    """
+    RSS and PSS of this process in MiB (PSS is 0 where smaps_rollup is missing).
+    """
+    sizes: dict = {'rss': 0.0, 'pss': 0.0}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('Rss', 'Pss'):
+                    sizes[key.lower()] = int(rest.split()[0]) / 1024
+    except OSError:
+        import resource
+        sizes['rss'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return sizes
+
+
+def child() -> None:
+    """
+    Load the graph, search, wait for the parent's go, print JSON sizes.
+    """
+    sys.path.insert(0, os.path.join(ROOT, 'src'))
+    from app import app
+    from app.optimizer import ResourceOptimizer
+    baseline: dict = memory()
+    with app.app_context():
+        start: float = time.perf_counter()
+        optimizer: ResourceOptimizer = ResourceOptimizer(engine='dijkstra')
+        optimizer.load_graph()
+        load: float = time.perf_counter() - start
+        schools: list = list(optimizer.csr.ids)
+        for source in schools[::max(len(schools) // 5, 1)]:
+            optimizer.find_optimal_path(source, schools[-1])
+        print('ready', flush=True)
+        sys.stdin.readline()
+        sizes: dict = memory()
+        print(json.dumps({'load': load, 'rss': sizes['rss'] - baseline['rss'], 'pss': sizes['pss'] - baseline['pss'],
+                          'backing': type(optimizer.graph).__name__}), flush=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--schools', type=int, default=20000)
+    parser.add_argument('--processes', type=int, default=4)
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    workdir: str = tempfile.mkdtemp(prefix='campus-link-snapshot-')
+    try:
+        subprocess.check_call([sys.executable, os.path.join(ROOT, 'benchmarks', 'startup.py'), '--child', 'seed',
+                               '--schools', str(args.schools)], cwd=workdir)
+        print(f'{args.schools} schools, {args.processes} processes, sizes above `import app`')
+        print(f'{"mode":10}{"backing":>20}{"load p50":>10}{"RSS min":>9}{"RSS max":>9}{"PSS total":>11}')
+        for mode, enabled in (('dict', 'false'), ('snapshot', 'true')):
+            for name in os.listdir(os.path.join(workdir, 'instance')):
+                if name.startswith('graph-') or name.endswith(('.npz', '.pickle')):
+                    os.remove(os.path.join(workdir, 'instance', name))
+            env: dict = {**os.environ, 'FLASK_GRAPH_SNAPSHOT': enabled}
+            procs: list = [subprocess.Popen([sys.executable, os.path.abspath(__file__), '--child'], cwd=workdir,
+                                            env=env, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+                           for _ in range(args.processes)]
+            # Measure only once every process holds its graph, so shared pages are split fairly
+            for proc in procs:
+                assert proc.stdout.readline().strip() == 'ready'
+            results: list = []
+            for proc in procs:
+                proc.stdin.write('go\n')
+                proc.stdin.flush()
+                results.append(json.loads(proc.stdout.readline()))
+            for proc in procs:
+                proc.wait()
+            loads: list = sorted(result['load'] for result in results)
+            # The process that built the graph keeps its peak heap; the others show the steady state
+            rss: list = sorted(result['rss'] for result in results)
+            pss: float = sum(result['pss'] for result in results)
+            print(f'{mode:10}{results[0]["backing"]:>20}{loads[len(loads) // 2] * 1000:>8.0f}ms'
+                  f'{rss[0]:>7.1f}MB{rss[-1]:>7.1f}MB{pss:>9.1f}MB')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
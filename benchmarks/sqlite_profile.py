@@ -0,0 +1,119 @@
+"""
+Benchmark: mixed read/write throughput of the SQLite engine profiles.
+
+For each profile a fresh instance is seeded, then several processes (like
+gunicorn workers), each with a few threads, run a 90/10 mix for a fixed
+time: reads load one school with its outgoing costs, writes change one
+transportation cost and commit. Reported are completed operations per
+second, write latency and the number of "database is locked" failures.
+
+Usage:
+    python benchmarks/sqlite_profile.py [--seconds 5] [--processes 2] [--threads 2]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def worker(args: argparse.Namespace) -> None:
+    """
+    One process: run the mix on args.threads threads, print JSON counts.
+    """
+    sys.path.insert(0, os.path.join(ROOT, 'src'))
+    from sqlalchemy.exc import OperationalError
+    from app import app, db
+    from app.models import School, TransportationCost
+
+    with app.app_context():
+        edges: list = [(c.from_school_id, c.to_school_id) for c in db.session.query(TransportationCost).all()]
+    results: dict = {'reads': 0, 'writes': 0, 'locked': 0, 'write_times': []}
+    lock: threading.Lock = threading.Lock()
+    deadline: float = time.perf_counter() + args.seconds
+
+    def run() -> None:
+        rng: random.Random = random.Random(threading.get_ident() ^ os.getpid())
+        with app.app_context():
+            while time.perf_counter() < deadline:
+                start: float = time.perf_counter()
+                try:
+                    if rng.random() < args.write_ratio:
+                        from_id, to_id = rng.choice(edges)
+                        db.session.query(TransportationCost).filter_by(from_school_id=from_id, to_school_id=to_id) \
+                            .update({'cost': rng.randint(1, 50)})
+                        db.session.commit()
+                        kind: str = 'writes'
+                    else:
+                        school_id: int = rng.randint(1, args.schools)
+                        db.session.get(School, school_id)
+                        db.session.query(TransportationCost).filter_by(from_school_id=school_id).all()
+                        db.session.rollback()
+                        kind = 'reads'
+                except OperationalError:
+                    db.session.rollback()
+                    with lock:
+                        results['locked'] += 1
+                    continue
+                with lock:
+                    results[kind] += 1
+                    if kind == 'writes':
+                        results['write_times'].append(time.perf_counter() - start)
+
+    threads: list = [threading.Thread(target=run) for _ in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(json.dumps(results))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--processes', type=int, default=2)
+    parser.add_argument('--threads', type=int, default=2)
+    parser.add_argument('--schools', type=int, default=500)
+    parser.add_argument('--write-ratio', type=float, default=0.1)
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+    if args.child:
+        worker(args)
+        return
+
+    print(f'{args.processes} processes x {args.threads} threads, {args.write_ratio:.0%} writes, {args.seconds:g}s')
+    print(f'{"profile":12}{"ops/s":>9}{"reads/s":>9}{"writes/s":>10}{"write p50":>11}{"write p95":>11}{"locked":>8}')
+    for profile in ('default', 'production'):
+        workdir: str = tempfile.mkdtemp(prefix='campus-link-sqlite-')
+        env: dict = {**os.environ, 'FLASK_SQLITE_PROFILE': json.dumps(profile)}
+        try:
+            subprocess.check_call([sys.executable, os.path.join(ROOT, 'benchmarks', 'startup.py'), '--child', 'seed',
+                                   '--schools', str(args.schools)], cwd=workdir, env=env)
+            command: list = [sys.executable, os.path.abspath(__file__), '--child'] + [
+                f'--{name.replace("_", "-")}={value}' for name, value in vars(args).items() if name != 'child']
+            procs: list = [subprocess.Popen(command, cwd=workdir, env=env, stdout=subprocess.PIPE, text=True)
+                           for _ in range(args.processes)]
+            totals: dict = {'reads': 0, 'writes': 0, 'locked': 0, 'write_times': []}
+            for proc in procs:
+                result: dict = json.loads(proc.communicate()[0])
+                for key in totals:
+                    totals[key] += result[key]
+            times: list = sorted(totals['write_times']) or [0.0]
+            ops: int = totals['reads'] + totals['writes']
+            print(f'{profile:12}{ops / args.seconds:>9.0f}{totals["reads"] / args.seconds:>9.0f}'
+                  f'{totals["writes"] / args.seconds:>10.0f}{statistics.median(times) * 1000:>9.1f}ms'
+                  f'{times[min(int(len(times) * 0.95), len(times) - 1)] * 1000:>9.1f}ms{totals["locked"]:>8}')
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
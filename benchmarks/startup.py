@@ -0,0 +1,136 @@
+"""
+Benchmark: worker import time and first-request latency, with and without warm-up.
+
+Creates a throw-away instance folder with a synthetic district, then starts
+fresh Python processes (one per scenario) that import the app, optionally
+run warmup.warm_up() like the gunicorn hooks do, and time the first hit of
+each page. Every process is new, so nothing is shared between scenarios
+except the Jinja bytecode cache on disk.
+
+Usage:
+    python benchmarks/startup.py [--schools 200]
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+SRC: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+# (label, method, url, form data) hit in order by each child process
+REQUESTS: list = [
+    ('login page', 'GET', '/users/login', None),
+    ('log in', 'POST', '/users/login', {'id': 'bench', 'passwd': 'benchmark'}),
+    ('schools page', 'GET', '/schools', None),
+    ('route', 'POST', '/schools/1/routes', {'target_school_id': 2}),
+    ('route svg', 'GET', '/schools/1/routes/visual?target_id=2&format=svg', None),
+    ('route png', 'GET', '/schools/1/routes/visual?target_id=2', None),
+]
+
+
+def seed(schools: int) -> None:
+    """
+    Create tables plus a user and a random district in ./instance.
+
+    Args:
+        schools (int): Number of schools
+    """
+    import bcrypt
+    from app import app, db
+    from app.models import School, TransportationCost, User
+    rng: random.Random = random.Random(1)
+    with app.app_context():
+        db.create_all()
+        db.session.add(User(id='bench', name='bench', about='', passwd=bcrypt.hashpw(b'benchmark', bcrypt.gensalt())))
+        for sid in range(1, schools + 1):
+            db.session.add(School(id=sid, name=f'School {sid}', address='-', _type='high school', status='Open'))
+        for sid in range(1, schools + 1):
+            for other in {rng.randint(1, schools) for _ in range(3)} | {sid % schools + 1}:
+                if other != sid:
+                    db.session.add(TransportationCost(from_school_id=sid, to_school_id=other, cost=rng.randint(1, 50)))
+        db.session.commit()
+
+
+def child(warm: bool) -> None:
+    """
+    Time import, optional warm-up and first requests; print JSON.
+
+    Args:
+        warm (bool): Run warmup.warm_up() before the first request
+    """
+    timings: dict = {}
+    start: float = time.perf_counter()
+    from app import app
+    timings['import app'] = time.perf_counter() - start
+    app.config['WTF_CSRF_ENABLED'] = False
+    if warm:
+        from app import warmup
+        start = time.perf_counter()
+        warmup.warm_up()
+        timings['warm_up()'] = time.perf_counter() - start
+    client = app.test_client()
+    for label, method, url, data in REQUESTS:
+        start = time.perf_counter()
+        response = client.open(url, method=method, data=data)
+        response.close()
+        timings[label] = time.perf_counter() - start
+        if response.status_code >= 400:
+            raise SystemExit(f'{label}: HTTP {response.status_code}')
+    print(json.dumps(timings))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--schools', type=int, default=200)
+    parser.add_argument('--child', choices=('cold', 'warm', 'seed'))
+    args = parser.parse_args()
+    sys.path.insert(0, SRC)
+    if args.child == 'seed':
+        seed(args.schools)
+        return
+    if args.child:
+        child(args.child == 'warm')
+        return
+
+    workdir: str = tempfile.mkdtemp(prefix='campus-link-startup-')
+    try:
+        def run(mode: str) -> dict:
+            out: str = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child', mode,
+                                                '--schools', str(args.schools)], cwd=workdir, text=True)
+            return json.loads(out) if out.strip() else {}
+
+        run('seed')
+        scenarios: list = [
+            ('cold, no bytecode cache', 'cold', True),
+            ('cold, bytecode cache', 'cold', False),
+            ('warmed, bytecode cache', 'warm', False),
+        ]
+        results: list = []
+        for title, mode, clear_cache in scenarios:
+            if clear_cache:
+                shutil.rmtree(os.path.join(workdir, 'instance', 'jinja-cache'), ignore_errors=True)
+            for name in os.listdir(os.path.join(workdir, 'instance')):
+                # Drop derived graph files so every scenario starts equal
+                if name.endswith(('.npz', '.pickle')) or name == 'route-images':
+                    path: str = os.path.join(workdir, 'instance', name)
+                    shutil.rmtree(path) if os.path.isdir(path) else os.remove(path)
+            results.append((title, run(mode)))
+
+        labels: list = ['import app', 'warm_up()'] + [label for label, *_ in REQUESTS]
+        print(f'schools={args.schools} (milliseconds)')
+        print(f'{"":16}' + ''.join(f'{title:>26}' for title, _ in results))
+        for label in labels:
+            cells: str = ''.join(f'{timings[label] * 1000:>26.1f}' if label in timings else f'{"-":>26}'
+                                 for _, timings in results)
+            print(f'{label:16}{cells}')
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
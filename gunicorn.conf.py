@@ -1,9 +1,38 @@
-# Gunicorn configuration file
-pythonbind = "0.0.0.0:8000"
-workers = 2
-threads = 2
-timeout = 60
+# Gunicorn configuration file (loaded automatically from the working directory)
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WORKERS', 2))
+threads = int(os.environ.get('THREADS', 2))
+timeout = int(os.environ.get('TIMEOUT', 60))
 worker_class = "sync"
 accesslog = "-"
 errorlog = "-"
-loglevel = "info"
\ No newline at end of file
+loglevel = "info"
+
+# Import the app once in the master and fork workers from it: imports,
+# compiled templates and module state are shared copy-on-write
+preload_app = True
+
+
+def when_ready(server):
+    """Warm heavy imports and templates in the master, before forking."""
+    from app import warmup
+    warmup.warm_imports()
+    server.log.info("Warm-up in master: %s", {k: round(v, 3) for k, v in warmup.timings.items()})
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master (not fork-safe)."""
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    """Load this worker's graph before it accepts requests."""
+    from app import app, warmup
+    # Request threads per worker, so bcrypt backpressure always leaves one for routes
+    app.config['THREADS'] = worker.cfg.threads
+    warmup.warm_up()
+    worker.log.info("Worker %s warm: %s", worker.pid, {k: round(v, 3) for k, v in warmup.timings.items()})
@@ -10,15 +10,66 @@ app = Flask('Schools Web App', template_folder=template_dir, static_folder=stati
 # app.secret_key = os.environ['SECRET_KEY']
 app.secret_key = 'you will never know'
 
+# Jinja bytecode cache, so new workers skip template compilation
+from jinja2 import FileSystemBytecodeCache
+jinja_cache_dir = os.path.join(app.instance_path, 'jinja-cache')
+os.makedirs(jinja_cache_dir, exist_ok=True)
+app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(jinja_cache_dir)}
+
 # db initialization
 from flask_sqlalchemy import SQLAlchemy
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{app.instance_path}/schools.db"
+
+# Settings from FLASK_* environment variables (e.g. FLASK_BCRYPT_ROUNDS=12)
+app.config.from_prefixed_env()
+
+# SQLite engine profiles: PRAGMAs run on every new connection. 'production'
+# uses WAL so readers never block the writer, relaxed fsync (safe in WAL),
+# a memory-mapped read path and a busy timeout instead of instant
+# "database is locked"; 'default' keeps SQLite's own settings.
+SQLITE_PROFILES: dict = {
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,          # ms
+        'cache_size': -16000,          # KiB (negative = size, not pages)
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+    },
+    'default': {},
+}
+sqlite_pragmas: dict = {**SQLITE_PROFILES[app.config.get('SQLITE_PROFILE', 'production')],
+                        **app.config.get('SQLITE_PRAGMAS', {})}
+if sqlite_pragmas:
+    # One pooled connection per request thread, kept open so the page cache and mmap stay warm
+    app.config.setdefault('SQLALCHEMY_ENGINE_OPTIONS', {
+        'pool_size': app.config.get('SQLITE_POOL_SIZE', 8),
+        'max_overflow': 0,
+        'pool_timeout': 30,
+        'connect_args': {'timeout': sqlite_pragmas.get('busy_timeout', 5000) / 1000},
+    })
 db = SQLAlchemy(app)
 
-# models initialization
+from sqlalchemy import event
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """
+    Apply the SQLite profile to a new DB-API connection.
+
+    Args:
+        dbapi_connection: sqlite3 connection
+        connection_record: SQLAlchemy pool record (unused)
+    """
+    cursor = dbapi_connection.cursor()
+    for name, value in sqlite_pragmas.items():
+        cursor.execute(f'PRAGMA {name} = {value}')
+    cursor.close()
+
+with app.app_context():
+    event.listen(db.engine, 'connect', set_sqlite_pragmas)
+
+# models initialization (tables are created by init_db.py / `flask init-db`, not at import)
 from app import models
-with app.app_context(): 
-    db.create_all()
 
 # login manager #Modified 10/02/2025 AG#
 from flask_login import LoginManager
@@ -26,22 +77,24 @@ login_manager = LoginManager()
 login_manager.init_app(app)
 login_manager.login_view = 'login'  # endpoint for login view
 
-from app.models import User
+from app import users
 
 # user_loader callback
 @login_manager.user_loader
-def load_user(id: str): 
+def load_user(id: str) -> 'users.UserRecord | None':
     """
-    Given a user ID from the session, return the corresponding User instance.
+    Given a user ID from the session, return the corresponding user.
+
+    Served from a per-worker cache (see users.py), so an authenticated page
+    view normally costs no query. Database errors are not swallowed.
 
     Args:
         id: The user identifier stored by Flask-Login. Often a string.
 
     Returns:
-        The User object if found, otherwise None.
+        The UserRecord if found, otherwise None.
     """
-    try: 
-        return db.session.query(User).filter(User.id==id).one()
-    except: 
-        return None
+    return users.load(id)
 
+# views and CLI commands (imported last, they depend on app, db and the models above)
+from app import routes, commands, query_budget
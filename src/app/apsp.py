@@ -0,0 +1,192 @@
+"""
+All-pairs shortest paths for small districts.
+
+Distances and next hops between every pair of schools are computed once per
+graph version with a blocked Floyd-Warshall (min-plus products over square
+tiles, vectorized with NumPy) and saved next to the database, so a route
+query is just a walk along next hops.
+"""
+import os
+from typing import List, Optional
+
+import numpy as np
+
+from app.csr import CSRGraph
+
+BLOCK_SIZE: int = 64
+STRIPE_WIDTH: int = 128
+
+
+def _min_plus(dist: np.ndarray, nxt: np.ndarray, rows: slice, cols: slice, mid: slice) -> None:
+    """
+    Relax tile dist[rows, cols] through the intermediate nodes in mid.
+
+    Computes the min-plus product dist[rows, mid] (x) dist[mid, cols] and
+    keeps the strictly better entries, taking the next hop towards the
+    chosen intermediate node.
+
+    Args:
+        dist (np.ndarray): Distance matrix, updated in place
+        nxt (np.ndarray): Next-hop matrix, updated in place
+        rows (slice): Row tile
+        cols (slice): Column tile
+        mid (slice): Intermediate tile
+    """
+    # Lay the candidates out as (row, col, mid) so argmin runs over contiguous memory
+    left: np.ndarray = dist[rows, mid]
+    right: np.ndarray = np.ascontiguousarray(dist[mid, cols].T)
+    candidates: np.ndarray = left[:, None, :] + right[None, :, :]
+    best: np.ndarray = candidates.argmin(axis=2)
+    best_dist: np.ndarray = np.take_along_axis(candidates, best[:, :, None], axis=2)[:, :, 0]
+    tile: np.ndarray = dist[rows, cols]
+    better: np.ndarray = best_dist < tile
+    if not better.any():
+        return
+    r, c = np.nonzero(better)
+    tile[r, c] = best_dist[r, c]
+    nxt[rows, cols][r, c] = nxt[rows, mid][r, best[r, c]]
+
+
+def floyd_warshall(csr: CSRGraph, block: int = BLOCK_SIZE):
+    """
+    Blocked Floyd-Warshall over a CSR graph.
+
+    Args:
+        csr (CSRGraph): School graph
+        block (int): Tile size
+
+    Returns:
+        (dist, nxt): n x n float64 distances (inf if unreachable) and
+        int32 next hops (dense index of the first step, -1 if none)
+    """
+    n: int = len(csr)
+    dist: np.ndarray = np.full((n, n), np.inf)
+    nxt: np.ndarray = np.full((n, n), -1, dtype=np.int32)
+    offsets: np.ndarray = np.frombuffer(csr.offsets, dtype=np.int64)
+    targets: np.ndarray = np.frombuffer(csr.targets, dtype=np.int32)
+    weights: np.ndarray = np.frombuffer(csr.weights, dtype=np.int32)
+    sources: np.ndarray = np.repeat(np.arange(n), np.diff(offsets))
+    dist[sources, targets] = weights
+    nxt[sources, targets] = targets
+    diagonal: np.ndarray = np.arange(n)
+    dist[diagonal, diagonal] = 0
+    nxt[diagonal, diagonal] = diagonal
+
+    tiles: List[slice] = [slice(start, min(start + block, n)) for start in range(0, n, block)]
+    # Column stripes bound the block x stripe x block temporary of each
+    # min-plus product so it stays cache-sized
+    stripes: List[slice] = [slice(start, min(start + STRIPE_WIDTH, n)) for start in range(0, n, STRIPE_WIDTH)]
+    everything: slice = slice(0, n)
+    for k in tiles:
+        # Phase 1: close the pivot tile with plain Floyd-Warshall
+        for m in range(k.start, k.stop):
+            via: np.ndarray = dist[k, m][:, None] + dist[m, k][None, :]
+            tile: np.ndarray = dist[k, k]
+            better: np.ndarray = via < tile
+            if better.any():
+                tile[better] = via[better]
+                hops: np.ndarray = nxt[k, k]
+                hops[better] = np.broadcast_to(nxt[k, m][:, None], tile.shape)[better]
+        # Phase 2: pivot row and pivot column (pivot tile itself is a no-op)
+        for stripe in stripes:
+            _min_plus(dist, nxt, k, stripe, k)
+        _min_plus(dist, nxt, everything, k, k)
+        # Phase 3: every other row tile, one column stripe at a time
+        for i in tiles:
+            if i is k:
+                continue
+            for stripe in stripes:
+                _min_plus(dist, nxt, i, stripe, k)
+    return dist, nxt
+
+
+class AllPairs:
+    """
+    Distance and next-hop matrices for one graph version.
+
+    Attributes:
+        version (int): Graph version the matrices belong to
+        ids (np.ndarray): Dense index -> school ID
+        dist (np.ndarray): Distance matrix
+        nxt (np.ndarray): Next-hop matrix
+    """
+    def __init__(self, version: int, ids: np.ndarray, dist: np.ndarray, nxt: np.ndarray) -> None:
+        """
+        Wrap computed or loaded matrices.
+
+        Args:
+            version (int): Graph version
+            ids (np.ndarray): Dense index -> school ID
+            dist (np.ndarray): Distance matrix
+            nxt (np.ndarray): Next-hop matrix
+        """
+        self.version: int = version
+        self.ids: np.ndarray = ids
+        self.dist: np.ndarray = dist
+        self.nxt: np.ndarray = nxt
+
+    @classmethod
+    def compute(cls, version: int, csr: CSRGraph) -> 'AllPairs':
+        """
+        Run Floyd-Warshall on a graph.
+
+        Args:
+            version (int): Graph version of csr
+            csr (CSRGraph): School graph
+
+        Returns:
+            AllPairs: Fresh matrices
+        """
+        dist, nxt = floyd_warshall(csr)
+        return cls(version, np.frombuffer(csr.ids, dtype=np.int64).copy(), dist, nxt)
+
+    @classmethod
+    def load(cls, path: str, version: int) -> Optional['AllPairs']:
+        """
+        Load matrices saved by save(), if they match a graph version.
+
+        Args:
+            path (str): .npz file path
+            version (int): Expected graph version
+
+        Returns:
+            Optional[AllPairs]: Matrices or None if missing, unreadable or stale
+        """
+        try:
+            with np.load(path) as data:
+                if int(data['version']) != version:
+                    return None
+                return cls(version, data['ids'], data['dist'], data['nxt'])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    def save(self, path: str) -> None:
+        """
+        Save the matrices atomically (write to a temp file, then rename).
+
+        Args:
+            path (str): .npz file path
+        """
+        tmp_path: str = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, version=np.int64(self.version), ids=self.ids, dist=self.dist, nxt=self.nxt)
+        os.replace(tmp_path, path)
+
+    def path(self, source: int, target: int) -> List[int]:
+        """
+        Walk next hops between two dense indices.
+
+        Args:
+            source (int): Dense index of the starting school
+            target (int): Dense index of the ending school
+
+        Returns:
+            List[int]: School IDs from source to target, empty if unreachable
+        """
+        if self.nxt[source, target] < 0:
+            return []
+        nodes: List[int] = [source]
+        while source != target:
+            source = int(self.nxt[source, target])
+            nodes.append(source)
+        return [int(self.ids[i]) for i in nodes]
@@ -0,0 +1,205 @@
+"""
+Streaming export of schools and transportation costs.
+
+Rows are read through a server-side cursor in batches of
+BULK_EXPORT_BATCH_SIZE and written as they arrive, so an export uses the
+same memory for 20 or 2,000,000 rows. CSV and JSONL use the column names
+bulk_import.py reads, so an export can be imported again unchanged.
+
+The binary edge list (format 'bin', costs only) is a compact, framed form
+of the whole graph for fast reloads:
+
+    header  b'CLEL', uint16 version, uint16 reserved
+    blocks  uint8 kind, uint32 count, payload
+              kind 1 (schools): count int32 IDs, count uint32 name byte
+                                lengths, then the UTF-8 names back to back
+              kind 2 (edges):   count x (int32 from, int32 to, int32 cost)
+              kind 0 (end):     count 0, no payload; marks a complete file
+
+All integers are little-endian. read_edge_list() parses a file back into
+the (graph, school_names) pair ResourceOptimizer works on, without the ORM.
+"""
+import csv
+import io
+import json
+import struct
+import sys
+from array import array
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app import app
+
+KINDS: Tuple[str, ...] = ('schools', 'costs')
+FORMATS: Tuple[str, ...] = ('csv', 'jsonl', 'bin')
+MIMETYPES: Dict[str, str] = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson', 'bin': 'application/octet-stream'}
+
+MAGIC: bytes = b'CLEL'
+VERSION: int = 1
+HEADER: struct.Struct = struct.Struct('<4sHH')
+BLOCK: struct.Struct = struct.Struct('<BI')
+END, SCHOOLS, EDGES = 0, 1, 2
+
+# Columns (and their output names) per kind; names match bulk_import.py
+QUERIES: Dict[str, Tuple[str, List[str]]] = {
+    'schools': ('SELECT id, name, address, _type, status FROM schools ORDER BY id',
+                ['id', 'name', 'address', 'type', 'status']),
+    # Table order, like ResourceOptimizer.build_graph_from_database()
+    'costs': ('SELECT from_school_id, to_school_id, cost FROM transportation_costs',
+              ['from_school_id', 'to_school_id', 'cost']),
+}
+
+
+def _batches(engine: Engine, query: str) -> Iterator[list]:
+    """
+    Rows of a query in batches, from a streaming cursor.
+
+    Args:
+        engine (Engine): Database engine
+        query (str): SQL text
+
+    Returns:
+        Iterator[list]: Lists of up to BULK_EXPORT_BATCH_SIZE row tuples
+    """
+    batch_size: int = app.config.get('BULK_EXPORT_BATCH_SIZE', 10000)
+    with engine.connect() as connection:
+        result = connection.execution_options(stream_results=True).execute(text(query))
+        for partition in result.partitions(batch_size):
+            yield partition
+
+
+def _little_endian(values: array) -> bytes:
+    """
+    Bytes of an int array in little-endian order.
+    """
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def export_chunks(engine: Engine, kind: str, fmt: str) -> Iterator[bytes]:
+    """
+    Encoded export of one table, one chunk per database batch.
+
+    Args:
+        engine (Engine): Database engine
+        kind (str): 'schools' or 'costs'
+        fmt (str): 'csv', 'jsonl' or 'bin' (bin only for costs)
+
+    Returns:
+        Iterator[bytes]: File contents in order
+    """
+    query, columns = QUERIES[kind]
+    if fmt == 'bin':
+        yield from _binary_chunks(engine)
+        return
+    if fmt == 'csv':
+        buffer: io.StringIO = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for rows in _batches(engine, query):
+            writer.writerows(rows)
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+        return
+    for rows in _batches(engine, query):
+        yield ''.join(json.dumps(dict(zip(columns, row))) + '\n' for row in rows).encode('utf-8')
+
+
+def _binary_chunks(engine: Engine) -> Iterator[bytes]:
+    """
+    Binary edge list: header, school blocks, edge blocks, end block.
+
+    Args:
+        engine (Engine): Database engine
+
+    Returns:
+        Iterator[bytes]: File contents in order
+    """
+    yield HEADER.pack(MAGIC, VERSION, 0)
+    for rows in _batches(engine, 'SELECT id, name FROM schools ORDER BY id'):
+        names: List[bytes] = [(name or '').encode('utf-8') for _, name in rows]
+        yield (BLOCK.pack(SCHOOLS, len(rows)) + _little_endian(array('i', [row[0] for row in rows]))
+               + _little_endian(array('I', [len(name) for name in names])) + b''.join(names))
+    for rows in _batches(engine, QUERIES['costs'][0]):
+        flat: array = array('i', [value for row in rows for value in row])
+        yield BLOCK.pack(EDGES, len(rows)) + _little_endian(flat)
+    yield BLOCK.pack(END, 0)
+
+
+def _read_exact(stream: BinaryIO, size: int) -> bytes:
+    """
+    Read exactly size bytes or fail on a truncated file.
+    """
+    data: bytes = stream.read(size)
+    if len(data) != size:
+        raise ValueError('Truncated edge list')
+    return data
+
+
+def _ints(data: bytes, typecode: str) -> array:
+    """
+    Little-endian bytes to an int array in native order.
+    """
+    values: array = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def read_edge_list(stream: BinaryIO, bidirectional: bool) -> Tuple[Dict[int, Dict[int, int]], Dict[int, str]]:
+    """
+    Rebuild the optimizer graph from a binary edge list.
+
+    Applies the same rules as ResourceOptimizer.build_graph_from_database():
+    edges to unknown schools are skipped and, if bidirectional, a reverse
+    edge is added unless one was entered explicitly.
+
+    Args:
+        stream (BinaryIO): Binary stream positioned at the header
+        bidirectional (bool): Whether to add reverse edges
+
+    Returns:
+        (graph, school_names): Adjacency dict and school ID -> name
+
+    Raises:
+        ValueError: Not an edge list, unknown version or truncated file
+    """
+    magic, version, _ = HEADER.unpack(_read_exact(stream, HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a version 1 Campus-Link edge list')
+    graph: Dict[int, Dict[int, int]] = {}
+    names: Dict[int, str] = {}
+    while True:
+        kind, count = BLOCK.unpack(_read_exact(stream, BLOCK.size))
+        if kind == END:
+            return graph, names
+        if kind == SCHOOLS:
+            ids: array = _ints(_read_exact(stream, 4 * count), 'i')
+            lengths: array = _ints(_read_exact(stream, 4 * count), 'I')
+            blob: bytes = _read_exact(stream, sum(lengths))
+            offset: int = 0
+            for school_id, length in zip(ids, lengths):
+                graph[school_id] = {}
+                names[school_id] = blob[offset:offset + length].decode('utf-8')
+                offset += length
+        elif kind == EDGES:
+            flat: array = _ints(_read_exact(stream, 12 * count), 'i')
+            it = iter(flat)
+            for from_id, to_id, cost in zip(it, it, it):
+                from_edges = graph.get(from_id)
+                to_edges = graph.get(to_id)
+                if from_edges is None or to_edges is None:
+                    continue
+                from_edges[to_id] = cost
+                if bidirectional:
+                    to_edges.setdefault(from_id, cost)
+        else:
+            raise ValueError(f'Unknown block kind {kind}')
@@ -0,0 +1,318 @@
+"""
+Streaming bulk import of schools and transportation costs.
+
+Rows are read one at a time from a CSV (header row) or JSONL file,
+validated, and upserted in batches: each batch is one transaction running
+a single executemany of INSERT ... ON CONFLICT DO UPDATE, so a file with a
+million edges costs a few thousand commits instead of a million form
+posts. Only the current batch and the set of known school IDs are held in
+memory. Rows that fail validation are written, with their line number and
+the reason, to a reject file in the input's format and the import goes on.
+
+Columns:
+    schools: id (optional; omitted = new school), name, address, type, status
+    costs:   from_school_id, to_school_id, cost
+
+Used by `flask import-data` and POST /api/import/<kind>.
+"""
+import csv
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, TextIO, Tuple
+
+from sqlalchemy import text
+
+from app import app, db
+from app.optimizer import graph_cache
+
+KINDS: Tuple[str, ...] = ('schools', 'costs')
+FORMATS: Tuple[str, ...] = ('csv', 'jsonl')
+
+# Both spellings used by the create and update forms
+SCHOOL_TYPES: Set[str] = {'elementary school', 'middle school', 'high school', 'elementary', 'middle'}
+SCHOOL_STATUSES: Set[str] = {'Open', 'Closed'}
+
+UPSERT_SCHOOL: str = ('INSERT INTO schools (id, name, address, _type, status) VALUES (?, ?, ?, ?, ?) '
+                      'ON CONFLICT (id) DO UPDATE SET name = excluded.name, address = excluded.address, '
+                      '_type = excluded._type, status = excluded.status')
+INSERT_SCHOOL: str = 'INSERT INTO schools (name, address, _type, status) VALUES (?, ?, ?, ?)'
+UPSERT_COST: str = ('INSERT INTO transportation_costs (from_school_id, to_school_id, cost) VALUES (?, ?, ?) '
+                    'ON CONFLICT (from_school_id, to_school_id) DO UPDATE SET cost = excluded.cost')
+
+
+# Value types int() converts exactly (bools and floats are rejected, not truncated)
+_PLAIN: Set[type] = {int, str}
+
+
+class RowError(ValueError):
+    """
+    A row that cannot be imported; the message is written to the reject file.
+    """
+
+
+def read_rows(stream: TextIO, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """
+    Yield (line number, row) pairs from a CSV or JSONL stream.
+
+    CSV rows are dicts keyed by the header; JSONL rows are whatever the
+    line decodes to, or a RowError for lines that are not valid JSON.
+
+    Args:
+        stream (TextIO): Text stream positioned at the start of the file
+        fmt (str): 'csv' or 'jsonl'
+
+    Returns:
+        Iterator[Tuple[int, Any]]: Rows with their 1-based line number
+    """
+    if fmt == 'csv':
+        reader = csv.reader(stream)
+        header: Optional[List[str]] = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        for values in reader:
+            if values:
+                yield reader.line_num, dict(zip(header, values))
+        return
+    for line_num, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_num, json.loads(line)
+        except ValueError as e:
+            yield line_num, RowError(f'invalid JSON: {e}')
+
+
+def _int(row: dict, field: str, minimum: Optional[int] = None) -> int:
+    """
+    Integer field of a row (JSON numbers or CSV strings).
+
+    Args:
+        row (dict): Parsed row
+        field (str): Field name
+        minimum (Optional[int]): Smallest accepted value
+
+    Returns:
+        int: Field value
+
+    Raises:
+        RowError: Missing, not an integer or below minimum
+    """
+    value: Any = row.get(field)
+    if isinstance(value, bool) or value is None or value == '':
+        raise RowError(f'{field} is required')
+    try:
+        number: int = value if isinstance(value, int) else int(str(value).strip())
+    except ValueError:
+        raise RowError(f'{field} must be an integer') from None
+    if minimum is not None and number < minimum:
+        raise RowError(f'{field} must be at least {minimum}')
+    return number
+
+
+def _text(row: dict, field: str, required: bool = True) -> str:
+    """
+    String field of a row, stripped.
+
+    Args:
+        row (dict): Parsed row
+        field (str): Field name
+        required (bool): Whether an empty value is an error
+
+    Returns:
+        str: Field value ('' if optional and missing)
+
+    Raises:
+        RowError: Required and empty
+    """
+    value: str = str(row.get(field) or '').strip()
+    if required and not value:
+        raise RowError(f'{field} is required')
+    return value
+
+
+def school_params(row: dict, known_ids: Set[int]) -> tuple:
+    """
+    Validate a school row.
+
+    Args:
+        row (dict): Parsed row
+        known_ids (Set[int]): School IDs in the database, updated with this row's ID
+
+    Returns:
+        tuple: (id, name, address, type, status), id None for a new school
+
+    Raises:
+        RowError: Invalid row
+    """
+    school_id: Optional[int] = _int(row, 'id', minimum=1) if row.get('id') not in (None, '') else None
+    name: str = _text(row, 'name')
+    address: str = _text(row, 'address', required=False)
+    school_type: str = _text(row, 'type') if row.get('type') not in (None, '') else _text(row, '_type')
+    if school_type not in SCHOOL_TYPES:
+        raise RowError(f'type must be one of: {", ".join(sorted(SCHOOL_TYPES))}')
+    status: str = _text(row, 'status')
+    if status not in SCHOOL_STATUSES:
+        raise RowError('status must be Open or Closed')
+    if school_id is not None:
+        known_ids.add(school_id)
+    return school_id, name, address, school_type, status
+
+
+def cost_params(row: dict, known_ids: Set[int]) -> tuple:
+    """
+    Validate a transportation cost row.
+
+    Args:
+        row (dict): Parsed row
+        known_ids (Set[int]): School IDs that exist
+
+    Returns:
+        tuple: (from_school_id, to_school_id, cost)
+
+    Raises:
+        RowError: Invalid row or unknown school
+    """
+    from_value: Any = row.get('from_school_id')
+    to_value: Any = row.get('to_school_id')
+    cost_value: Any = row.get('cost')
+    # Fast path for plain int/str values; anything unusual gets the detailed checks
+    if type(from_value) in _PLAIN and type(to_value) in _PLAIN and type(cost_value) in _PLAIN:
+        try:
+            from_id: int = int(from_value)
+            to_id: int = int(to_value)
+            cost: int = int(cost_value)
+        except ValueError:
+            from_id, to_id, cost = _int(row, 'from_school_id'), _int(row, 'to_school_id'), _int(row, 'cost')
+    else:
+        from_id, to_id, cost = _int(row, 'from_school_id'), _int(row, 'to_school_id'), _int(row, 'cost')
+    if cost < 1:
+        raise RowError('cost must be at least 1')
+    if from_id == to_id:
+        raise RowError('from_school_id and to_school_id must differ')
+    for school_id in (from_id, to_id):
+        if school_id not in known_ids:
+            raise RowError(f'unknown school {school_id}')
+    return from_id, to_id, cost
+
+
+class RejectWriter:
+    """
+    Writes rejected rows, in the input's format, as they occur.
+
+    CSV rejects repeat the original columns after line and error; JSONL
+    rejects are {"line": .., "error": .., "row": ..} objects.
+
+    Attributes:
+        count (int): Rows rejected so far
+        samples (List[dict]): The first few rejects (line and error) for summaries
+    """
+    MAX_SAMPLES: int = 20
+
+    def __init__(self, stream: Optional[TextIO], fmt: str) -> None:
+        """
+        Create a writer.
+
+        Args:
+            stream (Optional[TextIO]): Reject file, None to only count
+            fmt (str): 'csv' or 'jsonl'
+        """
+        self.stream: Optional[TextIO] = stream
+        self.fmt: str = fmt
+        self.count: int = 0
+        self.samples: List[dict] = []
+        self._csv: Optional[csv.DictWriter] = None
+
+    def write(self, line: int, error: str, row: Any) -> None:
+        """
+        Record one rejected row.
+
+        Args:
+            line (int): Line number in the input
+            error (str): Why the row was rejected
+            row (Any): Parsed row (None if it could not be parsed)
+        """
+        self.count += 1
+        if len(self.samples) < self.MAX_SAMPLES:
+            self.samples.append({'line': line, 'error': error})
+        if self.stream is None:
+            return
+        if self.fmt == 'jsonl':
+            self.stream.write(json.dumps({'line': line, 'error': error, 'row': row}) + '\n')
+            return
+        row = row if isinstance(row, dict) else {}
+        if self._csv is None:
+            self._csv = csv.DictWriter(self.stream, ['line', 'error'] + [k for k in row if k is not None],
+                                       extrasaction='ignore')
+            self._csv.writeheader()
+        self._csv.writerow({**row, 'line': line, 'error': error})
+
+
+def import_rows(kind: str, stream: TextIO, fmt: str, rejects: RejectWriter,
+                batch_size: Optional[int] = None) -> Dict[str, int]:
+    """
+    Validate and upsert every row of a file, one transaction per batch.
+
+    Bumps the graph version once at the end if anything was written, so
+    every worker reloads the graph and the dropdown choices (web callers
+    also trigger refresh_hierarchies()). Batches committed before an error
+    are kept and bump it too.
+
+    Args:
+        kind (str): 'schools' or 'costs'
+        stream (TextIO): Input text stream
+        fmt (str): 'csv' or 'jsonl'
+        rejects (RejectWriter): Receives invalid rows
+        batch_size (Optional[int]): Rows per transaction (default BULK_IMPORT_BATCH_SIZE, 5000)
+
+    Returns:
+        Dict[str, int]: rows read, imported, rejected and batches committed
+
+    Raises:
+        UnicodeDecodeError: The input is not UTF-8
+        csv.Error: The CSV input is malformed
+    """
+    batch_size = batch_size or app.config.get('BULK_IMPORT_BATCH_SIZE', 5000)
+    known_ids: Set[int] = {school_id for (school_id,) in db.session.execute(text('SELECT id FROM schools'))}
+    db.session.rollback()
+    validate: Callable[[dict, Set[int]], tuple] = school_params if kind == 'schools' else cost_params
+    summary: Dict[str, int] = {'read': 0, 'imported': 0, 'rejected': 0, 'batches': 0}
+    batch: List[tuple] = []
+
+    def flush() -> None:
+        with db.engine.begin() as connection:
+            if kind == 'costs':
+                connection.exec_driver_sql(UPSERT_COST, batch)
+            else:
+                with_id: List[tuple] = [params for params in batch if params[0] is not None]
+                without_id: List[tuple] = [params[1:] for params in batch if params[0] is None]
+                if with_id:
+                    connection.exec_driver_sql(UPSERT_SCHOOL, with_id)
+                if without_id:
+                    connection.exec_driver_sql(INSERT_SCHOOL, without_id)
+        summary['imported'] += len(batch)
+        summary['batches'] += 1
+        batch.clear()
+
+    try:
+        for line, row in read_rows(stream, fmt):
+            summary['read'] += 1
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                if not isinstance(row, dict):
+                    raise RowError('row must be an object')
+                batch.append(validate(row, known_ids))
+            except RowError as e:
+                rejects.write(line, str(e), None if isinstance(row, RowError) else row)
+                continue
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        # Batches committed before an error (bad encoding, malformed CSV) stay,
+        # so the graph must be reloaded either way
+        summary['rejected'] = rejects.count
+        if summary['imported']:
+            graph_cache.invalidate()
+    return summary
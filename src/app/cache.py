@@ -0,0 +1,134 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Tuple
+import threading
+
+
+class LRUCache:
+    """
+    Bounded, thread-safe least-recently-used cache with hit/miss counters.
+
+    Used for per-worker caches whose entries are expensive to compute
+    (shortest-path trees, rendered images, ...). When the cache is full the
+    least recently used entry is evicted.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept
+        hits (int): Number of lookups answered from the cache
+        misses (int): Number of lookups that found nothing
+        evictions (int): Number of entries dropped to respect maxsize
+    """
+    def __init__(self, maxsize: int = 128) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            maxsize (int): Maximum number of entries kept (at least 1)
+        """
+        self.maxsize: int = max(1, maxsize)
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._data: OrderedDict = OrderedDict()
+        self._lock: threading.Lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a key and mark it as most recently used.
+
+        Args:
+            key (Hashable): Cache key
+            default (Any): Value returned when the key is missing
+
+        Returns:
+            Any: Cached value or default
+        """
+        with self._lock:
+            try:
+                value: Any = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Store a value, evicting the least recently used entries if needed.
+
+        Args:
+            key (Hashable): Cache key
+            value (Any): Value to store
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def pop(self, key: Hashable) -> None:
+        """
+        Drop one entry if present (counters are kept).
+
+        Args:
+            key (Hashable): Cache key
+        """
+        with self._lock:
+            self._data.pop(key, None)
+
+    def items(self) -> List[Tuple[Hashable, Any]]:
+        """
+        Snapshot of the cached entries, least recently used first.
+
+        Does not touch recency or counters.
+
+        Returns:
+            List[Tuple[Hashable, Any]]: (key, value) pairs
+        """
+        with self._lock:
+            return list(self._data.items())
+
+    def clear(self) -> None:
+        """
+        Drop every entry (counters are kept).
+        """
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        """
+        Check for a key without touching recency or counters.
+
+        Args:
+            key (Hashable): Cache key
+
+        Returns:
+            bool: Whether the key is cached
+        """
+        return key in self._data
+
+    def __len__(self) -> int:
+        """
+        Number of entries currently cached.
+
+        Returns:
+            int: Entry count
+        """
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Snapshot of the cache counters.
+
+        Returns:
+            Dict[str, int]: size, maxsize, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
@@ -0,0 +1,319 @@
+"""
+Contraction hierarchies for large (state-wide) school graphs.
+
+Schools are contracted one by one in order of importance. Whenever removing
+a school would break a shortest path between two of its neighbours, a
+shortcut edge is added that remembers the school it skips. Queries then run
+a bidirectional Dijkstra that only climbs towards more important schools,
+which settles a few hundred nodes instead of most of the graph. Shortcuts
+are unpacked recursively, so the returned path lists every real school.
+"""
+import os
+import pickle
+import struct
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+INF: float = float('inf')
+
+# Witness searches give up after settling this many nodes; a missed witness
+# only costs an unnecessary shortcut, never a wrong answer
+WITNESS_SETTLE_LIMIT: int = 60
+
+# Saved files start with magic + graph version, so a stale file is rejected
+# without unpickling it
+FILE_HEADER: struct.Struct = struct.Struct('<4sq')
+FILE_MAGIC: bytes = b'CLCH'
+
+
+class ContractionHierarchy:
+    """
+    Preprocessed upward/downward graphs plus shortcut middles.
+
+    Attributes:
+        version (int): Graph version the hierarchy was built from
+        rank (Dict[int, int]): Contraction order of each school
+        up (Dict[int, Dict[int, int]]): Forward edges towards higher rank
+        down (Dict[int, Dict[int, int]]): Reversed edges coming from higher rank,
+                                          searched backwards from the target
+        middle (Dict[Tuple[int, int], int]): Skipped school of each shortcut
+        num_shortcuts (int): Shortcuts added during preprocessing
+    """
+    def __init__(self, version: int, rank: Dict[int, int], up: Dict[int, Dict[int, int]],
+                 down: Dict[int, Dict[int, int]], middle: Dict[Tuple[int, int], int]) -> None:
+        """
+        Wrap a built hierarchy.
+
+        Args:
+            version (int): Graph version the hierarchy was built from
+            rank (Dict[int, int]): Contraction order of each school
+            up (Dict[int, Dict[int, int]]): Forward upward edges
+            down (Dict[int, Dict[int, int]]): Reversed downward edges
+            middle (Dict[Tuple[int, int], int]): Skipped school of each shortcut
+        """
+        self.version: int = version
+        self.rank: Dict[int, int] = rank
+        self.up: Dict[int, Dict[int, int]] = up
+        self.down: Dict[int, Dict[int, int]] = down
+        self.middle: Dict[Tuple[int, int], int] = middle
+        self.num_shortcuts: int = len(middle)
+
+    @classmethod
+    def build(cls, version: int, graph: Dict[int, Dict[int, int]]) -> 'ContractionHierarchy':
+        """
+        Contract every school of a graph.
+
+        Nodes are ordered lazily by twice the edge difference (shortcuts
+        needed minus edges removed) plus the number of already contracted
+        neighbours, which spreads contraction evenly over the graph.
+
+        Args:
+            version (int): Graph version of graph
+            graph (Dict[int, Dict[int, int]]): School connections with costs
+
+        Returns:
+            ContractionHierarchy: Built hierarchy
+        """
+        # Remaining (not yet contracted) graph, both directions
+        out_edges: Dict[int, Dict[int, int]] = {node: dict(edges) for node, edges in graph.items()}
+        in_edges: Dict[int, Dict[int, int]] = {node: {} for node in graph}
+        for node, edges in graph.items():
+            out_edges[node].pop(node, None)
+            for neighbor, weight in edges.items():
+                if neighbor != node:
+                    in_edges[neighbor][node] = weight
+        middle: Dict[Tuple[int, int], int] = {}
+        contracted_neighbors: Dict[int, int] = {node: 0 for node in graph}
+        rank: Dict[int, int] = {}
+        # Every edge ever present, kept for the final up/down split
+        all_edges: Dict[int, Dict[int, int]] = {node: dict(edges) for node, edges in out_edges.items()}
+
+        def priority(node: int) -> int:
+            shortcuts: int = len(_shortcuts_for(node, out_edges, in_edges))
+            edge_difference: int = shortcuts - len(out_edges[node]) - len(in_edges[node])
+            return 2 * edge_difference + contracted_neighbors[node]
+
+        pq: list = [(priority(node), node) for node in graph]
+        pq.sort()
+        while pq:
+            _, node = heappop(pq)
+            if node in rank:
+                continue
+            # Lazy update: re-queue if the priority went stale and is now worse
+            current: int = priority(node)
+            if pq and current > pq[0][0]:
+                heappush(pq, (current, node))
+                continue
+
+            for source, target, weight in _shortcuts_for(node, out_edges, in_edges):
+                if weight < out_edges[source].get(target, INF):
+                    out_edges[source][target] = weight
+                    in_edges[target][source] = weight
+                    if weight < all_edges[source].get(target, INF):
+                        all_edges[source][target] = weight
+                        middle[(source, target)] = node
+            rank[node] = len(rank)
+            for neighbor in out_edges[node]:
+                in_edges[neighbor].pop(node, None)
+                contracted_neighbors[neighbor] += 1
+            for neighbor in in_edges[node]:
+                out_edges[neighbor].pop(node, None)
+                contracted_neighbors[neighbor] += 1
+            out_edges[node] = {}
+            in_edges[node] = {}
+
+        up: Dict[int, Dict[int, int]] = {node: {} for node in graph}
+        down: Dict[int, Dict[int, int]] = {node: {} for node in graph}
+        for source, edges in all_edges.items():
+            for target, weight in edges.items():
+                if rank[target] > rank[source]:
+                    up[source][target] = weight
+                else:
+                    down[target][source] = weight
+        return cls(version, rank, up, down, middle)
+
+    def query(self, source: int, target: int) -> Tuple[Optional[int], List[int], int]:
+        """
+        Shortest path between two schools using only upward searches.
+
+        Args:
+            source (int): Starting school ID
+            target (int): Ending school ID
+
+        Returns:
+            (cost, path, explored): cost is None and path empty if unreachable,
+            explored is the number of nodes settled by both searches
+        """
+        if source == target:
+            return 0, [source], 1
+        graphs: tuple = (self.up, self.down)
+        distances: tuple = ({source: 0}, {target: 0})
+        parents: tuple = ({source: None}, {target: None})
+        queues: tuple = ([(0, source)], [(0, target)])
+        settled: tuple = (set(), set())
+        best: float = INF
+        meeting: Optional[int] = None
+
+        while queues[0] or queues[1]:
+            # A side is done once its smallest key cannot beat the best meeting
+            for side in (0, 1):
+                if queues[side] and queues[side][0][0] >= best:
+                    queues[side].clear()
+            side: int = 0 if queues[0] and (not queues[1] or queues[0][0][0] <= queues[1][0][0]) else 1
+            if not queues[side]:
+                break
+            current_dist, current = heappop(queues[side])
+            if current in settled[side]:
+                continue
+            settled[side].add(current)
+            if current in distances[1 - side] and current_dist + distances[1 - side][current] < best:
+                best = current_dist + distances[1 - side][current]
+                meeting = current
+            for neighbor, weight in graphs[side][current].items():
+                distance: int = current_dist + weight
+                if distance < distances[side].get(neighbor, INF):
+                    distances[side][neighbor] = distance
+                    parents[side][neighbor] = current
+                    heappush(queues[side], (distance, neighbor))
+
+        explored: int = len(settled[0]) + len(settled[1])
+        if meeting is None:
+            return None, [], explored
+        hierarchy_path: List[int] = []
+        node: Optional[int] = meeting
+        while node is not None:
+            hierarchy_path.append(node)
+            node = parents[0][node]
+        hierarchy_path.reverse()
+        node = parents[1][meeting]
+        while node is not None:
+            hierarchy_path.append(node)
+            node = parents[1][node]
+        return best, self.unpack(hierarchy_path), explored
+
+    def unpack(self, hierarchy_path: List[int]) -> List[int]:
+        """
+        Replace every shortcut on a path by the schools it skips.
+
+        Args:
+            hierarchy_path (List[int]): Path over hierarchy edges
+
+        Returns:
+            List[int]: Path over original edges
+        """
+        path: List[int] = [hierarchy_path[0]]
+        # Stack of edges still to expand, in reverse order
+        stack: List[Tuple[int, int]] = list(zip(hierarchy_path[:-1], hierarchy_path[1:]))[::-1]
+        while stack:
+            edge: Tuple[int, int] = stack.pop()
+            skipped: Optional[int] = self.middle.get(edge)
+            if skipped is None:
+                path.append(edge[1])
+            else:
+                stack.append((skipped, edge[1]))
+                stack.append((edge[0], skipped))
+        return path
+
+    @classmethod
+    def load(cls, path: str, version: int) -> Optional['ContractionHierarchy']:
+        """
+        Load a hierarchy saved by save(), if it matches a graph version.
+
+        The version in the header is checked first, so a stale file costs
+        one small read, not an unpickle.
+
+        Args:
+            path (str): Hierarchy file path (written by this app only)
+            version (int): Expected graph version
+
+        Returns:
+            Optional[ContractionHierarchy]: Hierarchy or None if missing or stale
+        """
+        try:
+            with open(path, 'rb') as f:
+                header: bytes = f.read(FILE_HEADER.size)
+                if len(header) != FILE_HEADER.size or FILE_HEADER.unpack(header) != (FILE_MAGIC, version):
+                    return None
+                hierarchy = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        if not isinstance(hierarchy, cls) or hierarchy.version != version:
+            return None
+        return hierarchy
+
+    def save(self, path: str) -> None:
+        """
+        Save the hierarchy atomically (write to a temp file, then rename).
+
+        Args:
+            path (str): Hierarchy file path
+        """
+        tmp_path: str = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(FILE_HEADER.pack(FILE_MAGIC, self.version))
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+
+def _shortcuts_for(node: int, out_edges: Dict[int, Dict[int, int]], in_edges: Dict[int, Dict[int, int]]) -> List[Tuple[int, int, int]]:
+    """
+    Shortcuts needed to contract a node.
+
+    For every remaining in-neighbour u and out-neighbour w, a shortcut u->w
+    is needed unless a witness path avoiding the node is at most as cheap.
+
+    Args:
+        node (int): Node to contract
+        out_edges (Dict[int, Dict[int, int]]): Remaining forward edges
+        in_edges (Dict[int, Dict[int, int]]): Remaining backward edges
+
+    Returns:
+        List[Tuple[int, int, int]]: (source, target, cost) of each shortcut
+    """
+    shortcuts: List[Tuple[int, int, int]] = []
+    outgoing: Dict[int, int] = out_edges[node]
+    if not outgoing:
+        return shortcuts
+    max_out: int = max(outgoing.values())
+    for source, in_weight in in_edges[node].items():
+        targets: Dict[int, int] = {target: in_weight + weight for target, weight in outgoing.items() if target != source}
+        if not targets:
+            continue
+        witness: Dict[int, int] = _witness_search(source, node, in_weight + max_out, out_edges)
+        for target, via_cost in targets.items():
+            if witness.get(target, INF) > via_cost:
+                shortcuts.append((source, target, via_cost))
+    return shortcuts
+
+
+def _witness_search(source: int, avoid: int, max_cost: int, out_edges: Dict[int, Dict[int, int]]) -> Dict[int, int]:
+    """
+    Bounded Dijkstra from source that skips the node being contracted.
+
+    Args:
+        source (int): Start of the search
+        avoid (int): Node being contracted
+        max_cost (int): Stop once distances exceed this
+        out_edges (Dict[int, Dict[int, int]]): Remaining forward edges
+
+    Returns:
+        Dict[int, int]: Tentative distances found (upper bounds)
+    """
+    distances: Dict[int, int] = {source: 0}
+    pq: list = [(0, source)]
+    settled: int = 0
+    while pq and settled < WITNESS_SETTLE_LIMIT:
+        current_dist, current = heappop(pq)
+        if current_dist > max_cost:
+            break
+        if current_dist > distances[current]:
+            continue
+        settled += 1
+        for neighbor, weight in out_edges[current].items():
+            if neighbor == avoid:
+                continue
+            distance: int = current_dist + weight
+            if distance < distances.get(neighbor, INF):
+                distances[neighbor] = distance
+                heappush(pq, (distance, neighbor))
+    return distances
@@ -0,0 +1,103 @@
+"""
+Change log of the schools and transportation_costs tables.
+
+SQLite triggers (migration 4 in migrations.py) append one graph_changes
+row for every insert, update and delete on either table, whether it comes
+from the ORM, a bulk import or a manual SQL session. Each row's version is
+its AUTOINCREMENT key, so versions only ever grow and are never reused,
+even after old rows are pruned. Updates that change nothing are not
+logged.
+
+A process that caches anything derived from these tables keeps the version
+it built from; current_version() is one primary-key read, and
+changes_since() returns just the rows that changed after it.
+"""
+from typing import List, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+
+class Change(NamedTuple):
+    """
+    One logged change.
+
+    Attributes:
+        version (int): Change log version this change created
+        entity (str): 'school' or 'cost'
+        op (str): 'insert', 'update' or 'delete'
+        school_id (int): The school, or the cost's from_school_id
+        to_school_id (Optional[int]): The cost's to_school_id (None for schools)
+        old_cost (Optional[int]): Cost before the change (None for schools and inserts)
+        new_cost (Optional[int]): Cost after the change (None for schools and deletes)
+    """
+    version: int
+    entity: str
+    op: str
+    school_id: int
+    to_school_id: Optional[int]
+    old_cost: Optional[int]
+    new_cost: Optional[int]
+
+
+# sqlite_sequence still holds the last version after every row was pruned
+CURRENT_VERSION: str = ("SELECT COALESCE((SELECT MAX(version) FROM graph_changes), "
+                        "(SELECT seq FROM sqlite_sequence WHERE name = 'graph_changes'), 0)")
+OLDEST_VERSION: str = 'SELECT MIN(version) FROM graph_changes'
+CHANGES_SINCE: str = ('SELECT version, entity, op, school_id, to_school_id, old_cost, new_cost '
+                      'FROM graph_changes WHERE version > :since ORDER BY version LIMIT :limit')
+
+
+def current_version(connection: Connection) -> int:
+    """
+    Version of the latest change.
+
+    Args:
+        connection (Connection): Open connection
+
+    Returns:
+        int: Latest version, 0 if nothing was ever logged
+    """
+    return connection.execute(text(CURRENT_VERSION)).scalar_one()
+
+
+def changes_since(connection: Connection, since: int, limit: int = 1000) -> Optional[List[Change]]:
+    """
+    Changes made after a version, oldest first.
+
+    Args:
+        connection (Connection): Open connection
+        since (int): Last version the caller has seen
+        limit (int): Maximum number of changes returned; call again from the
+                     last returned version for the rest
+
+    Returns:
+        Optional[List[Change]]: Changes, or None if rows after since were
+                                already pruned (the caller must reload everything)
+    """
+    oldest: Optional[int] = connection.execute(text(OLDEST_VERSION)).scalar()
+    if oldest is None:
+        # Empty log: complete only if nothing happened after since
+        return [] if since >= current_version(connection) else None
+    if since < oldest - 1:
+        return None
+    return [Change(*row) for row in connection.execute(text(CHANGES_SINCE), {'since': since, 'limit': limit})]
+
+
+def prune(connection: Connection, keep: int) -> int:
+    """
+    Delete all but the newest changes.
+
+    Versions keep counting up afterwards; readers that are further behind
+    get None from changes_since() and reload.
+
+    Args:
+        connection (Connection): Open connection (commit afterwards)
+        keep (int): Number of newest changes to keep
+
+    Returns:
+        int: Number of changes deleted
+    """
+    result = connection.execute(text('DELETE FROM graph_changes WHERE version <= :last'),
+                                {'last': current_version(connection) - max(keep, 0)})
+    return result.rowcount
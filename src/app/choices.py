@@ -0,0 +1,43 @@
+"""
+Dropdown choices for school select fields, cached per graph version.
+
+Every form that picks a school needs (id, name) pairs for all schools.
+They are read with a column-only query (no School objects) and kept until
+the graph version changes; every school create/update/delete bumps it via
+graph_cache.invalidate(), so the list is never stale. The reload is left
+out of the request's query budget (query_budget.uncounted()).
+"""
+import threading
+from typing import Dict, List, Tuple
+
+from app import db
+from app.models import School
+from app.optimizer import graph_cache
+from app.query_budget import uncounted
+
+# (graph version, {'id': choices, 'name': choices}) of the last load in this worker
+_cached: Tuple[int, Dict[str, List[Tuple[int, str]]]] = (-1, {})
+_lock: threading.Lock = threading.Lock()
+
+
+def school_choices(order: str = 'id') -> List[Tuple[int, str]]:
+    """
+    (id, name) of every school.
+
+    Args:
+        order (str): 'id' for ID order, 'name' for name order (ties by ID)
+
+    Returns:
+        List[Tuple[int, str]]: Choices for a SelectField (shared list, do not modify)
+    """
+    global _cached
+    # Read the version before the rows: a concurrent write then only causes one extra reload
+    version: int = graph_cache.version()
+    if _cached[0] != version:
+        with _lock:
+            if _cached[0] != version:
+                with uncounted():
+                    rows: list = db.session.query(School.id, School.name).order_by(School.id).all()
+                by_id: List[Tuple[int, str]] = [(school_id, name) for school_id, name in rows]
+                _cached = (version, {'id': by_id, 'name': sorted(by_id, key=lambda choice: (choice[1], choice[0]))})
+    return _cached[1][order]
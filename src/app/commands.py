@@ -0,0 +1,116 @@
+"""
+`flask` CLI commands (run with FLASK_APP=app and src on PYTHONPATH).
+"""
+import csv
+import os
+
+import click
+
+from app import app, db, migrations, bulk_import, bulk_export, changelog
+from app.matrix import FORMATS, matrix_lines
+from app.optimizer import ResourceOptimizer
+
+
+@app.cli.command('init-db')
+def init_db() -> None:
+    """
+    Create any missing database tables and apply pending migrations (safe to rerun).
+    """
+    db.create_all()
+    for migration in migrations.migrate(db.engine):
+        click.echo(f'Applied migration {migration.version}: {migration.name}')
+    click.echo(f"Database ready: {app.config['SQLALCHEMY_DATABASE_URI']}")
+
+
+@app.cli.command('migrate')
+@click.option('--check', is_flag=True, help='Also verify that hot queries use their indexes (exit 1 if not).')
+def migrate(check: bool) -> None:
+    """
+    Apply pending schema migrations to the existing database.
+    """
+    for migration in migrations.migrate(db.engine):
+        click.echo(f'Applied migration {migration.version}: {migration.name}')
+    with db.engine.connect() as connection:
+        applied: set = migrations.applied_versions(connection)
+        click.echo(f'Schema version: {max(applied, default=0)} ({len(applied)}/{len(migrations.MIGRATIONS)} applied)')
+        if check:
+            failures: list = migrations.check_query_plans(connection)
+            for failure in failures:
+                click.echo(f'Query plan check failed: {failure}', err=True)
+            if failures:
+                raise SystemExit(1)
+            click.echo(f'Query plans OK ({len(migrations.QUERY_PLANS)} queries)')
+
+
+@app.cli.command('prune-changes')
+@click.option('--keep', type=int, default=100000, show_default=True, help='Number of newest changes to keep.')
+def prune_changes(keep: int) -> None:
+    """
+    Delete old rows of the graph change log (versions keep counting up).
+    """
+    with db.engine.begin() as connection:
+        deleted: int = changelog.prune(connection, keep)
+        version: int = changelog.current_version(connection)
+    click.echo(f'Deleted {deleted} changes, change log version {version}')
+
+
+@app.cli.command('distance-matrix')
+@click.option('--source', 'source_ids', type=int, multiple=True, help='Source school ID (repeatable, default: all schools).')
+@click.option('--target', 'target_ids', type=int, multiple=True, help='Target school ID (repeatable, default: all schools).')
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), default='csv', show_default=True)
+@click.option('--directed', is_flag=True, help='Only use costs in their entered direction.')
+@click.option('--output', type=click.File('w'), default='-', help='Output file (default: stdout).')
+def distance_matrix(source_ids: tuple, target_ids: tuple, fmt: str, directed: bool, output) -> None:
+    """
+    Write a source x target cost matrix, one search per source.
+    """
+    optimizer: ResourceOptimizer = ResourceOptimizer(bidirectional=not directed)
+    for line in matrix_lines(optimizer, list(source_ids) or None, list(target_ids) or None, fmt):
+        output.write(line)
+
+
+@app.cli.command('import-data')
+@click.argument('kind', type=click.Choice(bulk_import.KINDS))
+@click.argument('path', type=click.Path(exists=True, dir_okay=False, allow_dash=True))
+@click.option('--format', 'fmt', type=click.Choice(bulk_import.FORMATS), help='Input format (default: from the file extension, else csv).')
+@click.option('--rejects', 'rejects_path', type=click.Path(dir_okay=False), help='Reject file (default: <path>.rejects.<format>).')
+@click.option('--batch-size', type=int, help='Rows per transaction (default BULK_IMPORT_BATCH_SIZE, 5000).')
+def import_data(kind: str, path: str, fmt: str, rejects_path: str, batch_size: int) -> None:
+    """
+    Stream a CSV/JSONL file of schools or costs into the database (upsert).
+    """
+    fmt = fmt or ('jsonl' if path.endswith(('.jsonl', '.ndjson')) else 'csv')
+    rejects_path = rejects_path or f"{'import' if path == '-' else path}.rejects.{fmt}"
+    stream = click.get_text_stream('stdin', encoding='utf-8') if path == '-' else open(path, encoding='utf-8', newline='')
+    with stream, open(rejects_path, 'w', encoding='utf-8', newline='') as rejects_file:
+        rejects: bulk_import.RejectWriter = bulk_import.RejectWriter(rejects_file, fmt)
+        try:
+            summary: dict = bulk_import.import_rows(kind, stream, fmt, rejects, batch_size)
+        except Exception as e:
+            # Keep rows rejected before the error, drop an empty reject file
+            rejects_file.close()
+            if not rejects.count:
+                os.remove(rejects_path)
+            if isinstance(e, (UnicodeDecodeError, csv.Error)):
+                raise click.ClickException(f'{e} (rows before it were imported)') from e
+            raise
+    if not summary['rejected']:
+        os.remove(rejects_path)
+    click.echo(f"Imported {summary['imported']} of {summary['read']} {kind} rows in {summary['batches']} batches")
+    if summary['rejected']:
+        click.echo(f"Rejected {summary['rejected']} rows, see {rejects_path}", err=True)
+
+
+@app.cli.command('export-data')
+@click.argument('kind', type=click.Choice(bulk_export.KINDS))
+@click.option('--format', 'fmt', type=click.Choice(bulk_export.FORMATS), default='csv', show_default=True,
+              help='bin is the binary edge list (costs only).')
+@click.option('--output', type=click.File('wb'), default='-', help='Output file (default: stdout).')
+def export_data(kind: str, fmt: str, output) -> None:
+    """
+    Stream the schools or costs table as CSV, JSONL or a binary edge list.
+    """
+    if fmt == 'bin' and kind != 'costs':
+        raise click.BadParameter('bin is only available for costs', param_hint='--format')
+    for chunk in bulk_export.export_chunks(db.engine, kind, fmt):
+        output.write(chunk)
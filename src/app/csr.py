@@ -0,0 +1,252 @@
+from array import array
+from heapq import heappush, heappop
+from typing import Dict, List, Mapping, Optional, Tuple
+
+INF: float = float('inf')
+
+
+class CSRGraph:
+    """
+    School graph stored in compressed sparse row (CSR) form.
+
+    School IDs are mapped to dense indices 0..n-1 (in ascending ID order) and
+    the edges of node i are targets[offsets[i]:offsets[i + 1]] with matching
+    weights. Everything lives in flat typed arrays, so a graph costs a few
+    bytes per edge instead of a dict entry per edge.
+
+    Attributes:
+        ids (array): Dense index -> school ID
+        index (Dict[int, int]): School ID -> dense index
+        offsets (array): Row start of each node in targets/weights (length n + 1)
+        targets (array): Dense index of each edge's destination (int32)
+        weights (array): Cost of each edge (int32)
+    """
+    def __init__(self, ids: array, offsets: array, targets: array, weights: array,
+                 index: Optional[Mapping[int, int]] = None) -> None:
+        """
+        Wrap prebuilt CSR arrays.
+
+        Args:
+            ids (array): Dense index -> school ID, ascending
+            offsets (array): Row offsets, length len(ids) + 1
+            targets (array): Edge destinations as dense indices
+            weights (array): Edge costs
+            index (Mapping[int, int]): School ID -> dense index (a dict is built from ids if omitted)
+        """
+        self.ids: array = ids
+        self.index: Dict[int, int] = index if index is not None else {sid: i for i, sid in enumerate(ids)}
+        self.offsets: array = offsets
+        self.targets: array = targets
+        self.weights: array = weights
+
+    @classmethod
+    def from_dict(cls, graph: Dict[int, Dict[int, int]]) -> 'CSRGraph':
+        """
+        Build a CSR graph from the adjacency dict used by sp.
+
+        Edge order inside each row follows the dict order, and dense indices
+        follow ascending school IDs, so searches break ties exactly like
+        sp.dijkstra does.
+
+        Args:
+            graph (Dict[int, Dict[int, int]]): School connections with costs
+
+        Returns:
+            CSRGraph: Compact copy of the graph
+        """
+        ids: array = array('q', sorted(graph))
+        index: Dict[int, int] = {sid: i for i, sid in enumerate(ids)}
+        offsets: array = array('q', [0])
+        targets: array = array('i')
+        weights: array = array('i')
+        for sid in ids:
+            for neighbor, weight in graph[sid].items():
+                targets.append(index[neighbor])
+                weights.append(weight)
+            offsets.append(len(targets))
+        return cls(ids, offsets, targets, weights)
+
+    def __len__(self) -> int:
+        """
+        Number of schools (nodes).
+
+        Returns:
+            int: Node count
+        """
+        return len(self.ids)
+
+    @property
+    def num_edges(self) -> int:
+        """
+        Number of directed edges.
+
+        Returns:
+            int: Edge count
+        """
+        return len(self.targets)
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the CSR arrays (without the ID index).
+
+        Returns:
+            int: Size in bytes
+        """
+        return sum(a.itemsize * len(a) for a in (self.ids, self.offsets, self.targets, self.weights))
+
+    def with_costs(self, edges: List[Tuple[int, int, int]]) -> 'CSRGraph':
+        """
+        Copy of the graph with some edge costs set, adding edges that are new.
+
+        Only the arrays are copied (a flat memory copy, no per-edge Python
+        objects); IDs and the ID index are shared. New edges go at the end of
+        their row, where from_dict() would put a key added to the row dict.
+
+        Args:
+            edges (List[Tuple[int, int, int]]): (from school ID, to school ID, cost)
+
+        Returns:
+            CSRGraph: Patched copy; this graph is left unchanged
+        """
+        offsets: array = self.offsets
+        targets: array = self.targets
+        weights: array = array('i', self.weights)
+        for tail, head, cost in edges:
+            row: int = self.index[tail]
+            target: int = self.index[head]
+            start: int = offsets[row]
+            end: int = offsets[row + 1]
+            for k in range(start, end):
+                if targets[k] == target:
+                    weights[k] = cost
+                    break
+            else:
+                if offsets is self.offsets:
+                    offsets = array('q', self.offsets)
+                    targets = array('i', self.targets)
+                targets.insert(end, target)
+                weights.insert(end, cost)
+                for later in range(row + 1, len(offsets)):
+                    offsets[later] += 1
+        return CSRGraph(self.ids, offsets, targets, weights, self.index)
+
+    def search(self, source: int, target: Optional[int] = None) -> Tuple[List[float], array]:
+        """
+        Run Dijkstra over dense indices.
+
+        Args:
+            source (int): Dense index of the starting school
+            target (int): Dense index to stop at once settled (optional)
+
+        Returns:
+            (distances, predecessors): Distances per dense index (inf if
+            unreachable) and a flat int32 predecessor array (-1 for none)
+        """
+        n: int = len(self.ids)
+        offsets: array = self.offsets
+        targets: array = self.targets
+        weights: array = self.weights
+        distances: List[float] = [INF] * n
+        predecessors: array = array('i', [-1]) * n
+        visited: bytearray = bytearray(n)
+        distances[source] = 0
+        pq: list = [(0, source)]
+
+        while pq:
+            current_dist, current = heappop(pq)
+            if visited[current]:
+                continue
+            visited[current] = 1
+            if current == target:
+                break
+            # Index the flat arrays directly, slicing would copy each row
+            for k in range(offsets[current], offsets[current + 1]):
+                neighbor: int = targets[k]
+                distance: int = current_dist + weights[k]
+                if distance < distances[neighbor]:
+                    distances[neighbor] = distance
+                    predecessors[neighbor] = current
+                    heappush(pq, (distance, neighbor))
+
+        return distances, predecessors
+
+    def shortest_path_tree(self, source_id: int) -> Tuple[List[float], array]:
+        """
+        Full shortest-path tree from a school, in dense form.
+
+        Args:
+            source_id (int): Starting school ID
+
+        Returns:
+            (distances, predecessors): See search()
+        """
+        return self.search(self.index[source_id])
+
+    def path(self, predecessors: array, source_id: int, target_id: int) -> List[int]:
+        """
+        Rebuild the path between two schools from a dense predecessor array.
+
+        Args:
+            predecessors (array): Predecessor array from search()
+            source_id (int): Starting school ID
+            target_id (int): Ending school ID
+
+        Returns:
+            List[int]: School IDs from source to target, empty if unreachable
+        """
+        source: int = self.index[source_id]
+        node: int = self.index[target_id]
+        if node != source and predecessors[node] < 0:
+            return []
+        path: List[int] = [node]
+        while node != source:
+            node = predecessors[node]
+            path.append(node)
+        ids: array = self.ids
+        return [ids[i] for i in reversed(path)]
+
+    def tree_dicts(self, distances: List[float], predecessors: array, source_id: int) -> Tuple[Dict[int, float], Dict[int, Optional[int]]]:
+        """
+        Convert a dense tree to the dicts returned by sp.shortest_path_tree().
+
+        Args:
+            distances (List[float]): Distances from search()
+            predecessors (array): Predecessors from search()
+            source_id (int): Starting school ID
+
+        Returns:
+            (distances, predecessors): Keyed by school ID
+        """
+        ids: array = self.ids
+        source: int = self.index[source_id]
+        dist_by_id: Dict[int, float] = {ids[i]: d for i, d in enumerate(distances)}
+        pred_by_id: Dict[int, Optional[int]] = {source_id: None}
+        for i, p in enumerate(predecessors):
+            if p >= 0 and i != source:
+                pred_by_id[ids[i]] = ids[p]
+        return dist_by_id, pred_by_id
+
+    def dijkstra(self, source_id: int, target_id: int = None):
+        """
+        Drop-in equivalent of sp.dijkstra() on the CSR graph.
+
+        Args:
+            source_id (int): Starting school ID
+            target_id (int): Ending school ID (optional)
+
+        Returns:
+            If target given: (cost, path)
+            If no target: (all distances, all paths)
+        """
+        source: int = self.index[source_id]
+        if target_id:
+            distances, predecessors = self.search(source, self.index[target_id])
+            cost: float = distances[self.index[target_id]]
+            if cost == INF:
+                return None, []
+            return cost, self.path(predecessors, source_id, target_id)
+
+        distances, predecessors = self.search(source)
+        dist_by_id, pred_by_id = self.tree_dicts(distances, predecessors, source_id)
+        spf: Dict[int, List[int]] = {sid: self.path(predecessors, source_id, sid)[:-1] for sid in pred_by_id}
+        return dist_by_id, spf
@@ -0,0 +1,156 @@
+"""
+Incremental repair of shortest-path trees after a single edge change.
+
+Follows the Ramalingam-Reps approach: a cheaper (or new) edge only pushes
+improvements forward from its head, and a more expensive edge only affects
+the subtree hanging below it in the tree. Everything else in the tree keeps
+its distance and predecessor, so a repair touches the affected schools
+instead of rerunning Dijkstra from scratch.
+
+Trees use the dense form of CSRGraph (distance list and int32 predecessor
+array indexed by dense school index); the graph itself is passed as the
+adjacency dicts keyed by school ID.
+"""
+from array import array
+from heapq import heappush, heappop
+from typing import Dict, List, Optional, Tuple
+
+INF: float = float('inf')
+
+
+def repair_tree(graph: Dict[int, Dict[int, int]], reverse: Dict[int, Dict[int, int]], ids: array, index: Dict[int, int],
+                distances: List[float], predecessors: array, tail: int, head: int,
+                old_weight: Optional[int]) -> Tuple[List[float], array, int]:
+    """
+    Repair one shortest-path tree after edge tail->head changed.
+
+    graph and reverse must already contain the new weight. The input tree is
+    left untouched (it may still be read by other requests); repaired copies
+    are returned, or the input itself when the change cannot affect it.
+
+    Args:
+        graph (Dict[int, Dict[int, int]]): Updated school connections with costs
+        reverse (Dict[int, Dict[int, int]]): Updated reversed graph
+        ids (array): Dense index -> school ID
+        index (Dict[int, int]): School ID -> dense index
+        distances (List[float]): Tree distances before the change
+        predecessors (array): Tree predecessors before the change
+        tail (int): School ID the edge leaves
+        head (int): School ID the edge enters
+        old_weight (Optional[int]): Previous cost, None if the edge is new
+
+    Returns:
+        (distances, predecessors, touched): Repaired tree and the number of
+        schools whose entry had to be recomputed
+    """
+    new_weight: int = graph[tail][head]
+    t: int = index[tail]
+    h: int = index[head]
+    if old_weight is not None and new_weight > old_weight:
+        # Only a tree edge can make any distance worse
+        if predecessors[h] != t:
+            return distances, predecessors, 0
+        return _repair_increase(graph, reverse, ids, index, list(distances), array('i', predecessors), h)
+    if distances[t] + new_weight >= distances[h]:
+        return distances, predecessors, 0
+    return _repair_decrease(graph, ids, index, list(distances), array('i', predecessors), t, h, distances[t] + new_weight)
+
+
+def _repair_decrease(graph: Dict[int, Dict[int, int]], ids: array, index: Dict[int, int], distances: List[float],
+                     predecessors: array, t: int, h: int, improved: float) -> Tuple[List[float], array, int]:
+    """
+    Push an improvement forward from the head of a cheaper edge.
+
+    Only schools whose distance strictly improves are visited.
+
+    Args:
+        graph (Dict[int, Dict[int, int]]): Updated school connections with costs
+        ids (array): Dense index -> school ID
+        index (Dict[int, int]): School ID -> dense index
+        distances (List[float]): Distance copy, updated in place
+        predecessors (array): Predecessor copy, updated in place
+        t (int): Dense index of the edge tail
+        h (int): Dense index of the edge head
+        improved (float): New distance of the head
+
+    Returns:
+        (distances, predecessors, touched): See repair_tree()
+    """
+    distances[h] = improved
+    predecessors[h] = t
+    pq: list = [(improved, h)]
+    touched: int = 0
+    while pq:
+        current_dist, current = heappop(pq)
+        if current_dist > distances[current]:
+            continue
+        touched += 1
+        for neighbor_id, weight in graph[ids[current]].items():
+            neighbor: int = index[neighbor_id]
+            distance: float = current_dist + weight
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current
+                heappush(pq, (distance, neighbor))
+    return distances, predecessors, touched
+
+
+def _repair_increase(graph: Dict[int, Dict[int, int]], reverse: Dict[int, Dict[int, int]], ids: array, index: Dict[int, int],
+                     distances: List[float], predecessors: array, h: int) -> Tuple[List[float], array, int]:
+    """
+    Recompute the subtree below a tree edge that became more expensive.
+
+    The affected schools are exactly the descendants of the edge head. Each
+    one first takes its best entry from an unaffected in-neighbour, then a
+    Dijkstra restricted to the affected set settles the rest.
+
+    Args:
+        graph (Dict[int, Dict[int, int]]): Updated school connections with costs
+        reverse (Dict[int, Dict[int, int]]): Updated reversed graph
+        ids (array): Dense index -> school ID
+        index (Dict[int, int]): School ID -> dense index
+        distances (List[float]): Distance copy, updated in place
+        predecessors (array): Predecessor copy, updated in place
+        h (int): Dense index of the edge head
+
+    Returns:
+        (distances, predecessors, touched): See repair_tree()
+    """
+    # Collect the subtree: children of x are out-neighbours whose predecessor is x
+    affected: List[int] = [h]
+    in_subtree: set = {h}
+    for current in affected:
+        for neighbor_id in graph[ids[current]]:
+            neighbor: int = index[neighbor_id]
+            if predecessors[neighbor] == current and neighbor not in in_subtree:
+                in_subtree.add(neighbor)
+                affected.append(neighbor)
+
+    pq: list = []
+    for node in affected:
+        best: float = INF
+        best_parent: int = -1
+        for parent_id, weight in reverse[ids[node]].items():
+            parent: int = index[parent_id]
+            if parent not in in_subtree and distances[parent] + weight < best:
+                best = distances[parent] + weight
+                best_parent = parent
+        distances[node] = best
+        predecessors[node] = best_parent
+        if best != INF:
+            heappush(pq, (best, node))
+
+    while pq:
+        current_dist, current = heappop(pq)
+        if current_dist > distances[current]:
+            continue
+        for neighbor_id, weight in graph[ids[current]].items():
+            neighbor = index[neighbor_id]
+            if neighbor not in in_subtree:
+                continue
+            distance: float = current_dist + weight
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current
+                heappush(pq, (distance, neighbor))
+    return distances, predecessors, len(affected)
@@ -1,6 +1,6 @@
 from flask_wtf import FlaskForm
 from wtforms import *
-from wtforms.validators import DataRequired, InputRequired, Length
+from wtforms.validators import DataRequired, InputRequired, Length, NumberRange, Optional
 
 class SignUpForm(FlaskForm):
     """
@@ -95,4 +95,10 @@ class OptimizationForm(FlaskForm):
         choices=[],              # filled in view
         validators=[DataRequired(message='Select a destination')]
     )
+    # Ranked alternatives (k-shortest paths), 1 shows only the optimal route
+    alternatives = IntegerField(
+        'Routes to Show',
+        default=1,
+        validators=[Optional(), NumberRange(min=1, max=10, message='Choose between 1 and 10 routes')]
+    )
     submit = SubmitField('Find Optimal Path')
\ No newline at end of file
@@ -0,0 +1,148 @@
+"""
+Disk cache for rendered route images, shared by all workers.
+
+Images are stored under instance/route-images/ in files named by a hash of
+everything that determines the picture (graph version, source, target and
+render options), so the same name doubles as the HTTP ETag. The directory
+is bounded in bytes; hits refresh a file's mtime and the least recently
+used files are evicted first.
+"""
+import hashlib
+import os
+import threading
+from typing import Optional
+
+from app import app
+
+
+class ImageCache:
+    """
+    Size-bounded, content-addressed image store.
+
+    Attributes:
+        directory (str): Folder holding the cached files
+        max_bytes (int): Total size allowed before eviction (0 disables caching)
+        hits (int): Lookups served from disk by this worker
+        misses (int): Lookups that had to render
+        evictions (int): Files removed by this worker to respect max_bytes
+    """
+    def __init__(self, directory: str, max_bytes: int) -> None:
+        """
+        Create a cache (the directory is created on first write).
+
+        Args:
+            directory (str): Folder for cached files
+            max_bytes (int): Size bound in bytes, 0 disables caching
+        """
+        self.directory: str = directory
+        self.max_bytes: int = max_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def key(version: int, source_id: int, target_id: int, **options) -> str:
+        """
+        Content address of one rendering.
+
+        Args:
+            version (int): Graph version the route was computed on
+            source_id (int): Source school ID
+            target_id (int): Target school ID
+            **options: Render options (format, dpi, ...)
+
+        Returns:
+            str: Hex digest, usable as file name and ETag
+        """
+        parts: list = [str(version), str(source_id), str(target_id)]
+        parts += [f'{name}={options[name]}' for name in sorted(options)]
+        return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:32]
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Read a cached image and mark it as recently used.
+
+        Args:
+            key (str): Result of key()
+
+        Returns:
+            Optional[bytes]: Image data, None if not cached
+        """
+        if not self.max_bytes:
+            return None
+        path: str = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data: bytes = f.read()
+            os.utime(path)
+        except OSError:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store an image atomically, then evict old files over the size bound.
+
+        Args:
+            key (str): Result of key()
+            data (bytes): Image data
+        """
+        if not self.max_bytes or len(data) > self.max_bytes:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path: str = self._path(key)
+        tmp_path: str = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used files until the directory fits max_bytes.
+        """
+        with self._lock:
+            entries: list = []
+            total: int = 0
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if entry.name.endswith('.tmp'):
+                        continue
+                    try:
+                        stat = entry.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                    total += stat.st_size
+            if total <= self.max_bytes:
+                return
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Counters of this worker.
+
+        Returns:
+            dict: hits, misses, evictions and max_bytes
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions, 'max_bytes': self.max_bytes}
+
+
+# Route PNGs rendered by routes.school_routes_visual
+route_images: ImageCache = ImageCache(os.path.join(app.instance_path, 'route-images'),
+                                      app.config.get('ROUTE_IMAGE_CACHE_BYTES', 64 * 1024 * 1024))
@@ -3,16 +3,19 @@
 Initialize the database with all tables.
 
 This script creates all the database tables needed for the school management system.
-Run this file to set up a fresh database with empty tables.
+Run this file to set up a fresh database with empty tables. The app no longer
+creates tables on import; run this (or `flask init-db`) once before starting
+the server. Existing tables and data are left untouched; pending schema
+migrations (migrations.py) are applied in place.
 """
 
 import sys
 import os
 
-# Add src directory to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
+# Add src directory to path (this file lives in src/app)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app import app, db
+from app import app, db, migrations
 
 with app.app_context():
     """
@@ -22,5 +25,7 @@ with app.app_context():
     The database file is created in the instance folder.
     """
     db.create_all()
+    for migration in migrations.migrate(db.engine):
+        print(f"Applied migration {migration.version}: {migration.name}")
     print("Database created successfully!")
     print(f"Database file location: {app.config['SQLALCHEMY_DATABASE_URI']}")
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Streaming distance-matrix output shared by the /api/distances endpoint and
+the `flask distance-matrix` command.
+
+Rows come from ResourceOptimizer.distance_rows() one source at a time and
+are formatted lazily, so memory stays flat however large the matrix is.
+"""
+import csv
+import io
+import json
+from typing import Iterator, List, Optional
+
+from app.optimizer import ResourceOptimizer
+
+FORMATS: tuple = ('csv', 'ndjson')
+MIMETYPES: dict = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def matrix_lines(optimizer: ResourceOptimizer, source_ids: Optional[List[int]] = None,
+                 target_ids: Optional[List[int]] = None, fmt: str = 'csv') -> Iterator[str]:
+    """
+    Format a source x target distance matrix line by line.
+
+    CSV has a header row (source_id, then one column per target ID) and one
+    row per source, with empty cells for unreachable targets. NDJSON has one
+    object per source: {"source_id": .., "distances": {"<target_id>": cost}}
+    with null for unreachable targets.
+
+    Args:
+        optimizer (ResourceOptimizer): Optimizer whose graph is searched
+        source_ids (List[int]): Source school IDs (all schools if None)
+        target_ids (List[int]): Target school IDs (all schools if None)
+        fmt (str): 'csv' or 'ndjson'
+
+    Yields:
+        str: Output lines including the trailing newline
+    """
+    optimizer.load_graph()
+    targets: List[int] = list(optimizer.csr.ids) if target_ids is None else target_ids
+    rows = optimizer.distance_rows(source_ids, targets)
+    if fmt == 'ndjson':
+        keys: List[str] = [str(target_id) for target_id in targets]
+        for source_id, row in rows:
+            yield json.dumps({'source_id': source_id, 'distances': dict(zip(keys, row))}) + '\n'
+        return
+
+    buffer: io.StringIO = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
+
+    def line(values: list) -> str:
+        writer.writerow(values)
+        text: str = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    yield line(['source_id'] + targets)
+    for source_id, row in rows:
+        yield line([source_id] + ['' if cost is None else cost for cost in row])
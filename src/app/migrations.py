@@ -0,0 +1,145 @@
+"""
+Versioned schema migrations for an existing database.
+
+db.create_all() only creates missing tables, it never changes one that
+already exists. Each migration below is a numbered list of SQL statements;
+migrate() applies the ones not yet recorded in the schema_migrations table,
+each in its own transaction, so an old instance/schools.db is upgraded in
+place. Statements are written to be harmless on a database that create_all()
+already built from the current models (IF NOT EXISTS), so fresh and old
+databases end up identical.
+
+QUERY_PLANS pairs hot queries with the index SQLite is expected to use;
+check_query_plans() runs EXPLAIN QUERY PLAN on each (`flask migrate --check`).
+"""
+from datetime import datetime, timezone
+from typing import List, NamedTuple, Set, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+
+class Migration(NamedTuple):
+    """
+    One schema change.
+
+    Attributes:
+        version (int): Position in the migration order (never reused)
+        name (str): Short description, stored with the version
+        statements (List[str]): SQL run in one transaction
+    """
+    version: int
+    name: str
+    statements: List[str]
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, 'index transportation_costs.to_school_id', [
+        'CREATE INDEX IF NOT EXISTS ix_transportation_costs_to_school_id ON transportation_costs (to_school_id)',
+    ]),
+    Migration(2, 'index schools.name', [
+        'CREATE INDEX IF NOT EXISTS ix_schools_name ON schools (name)',
+    ]),
+    Migration(3, 'index schools.status, schools._type', [
+        'CREATE INDEX IF NOT EXISTS ix_schools_status_type ON schools (status, _type)',
+    ]),
+    # Read by changelog.py; the triggers log every write, whichever code path makes it
+    Migration(4, 'graph change log', [
+        'CREATE TABLE IF NOT EXISTS graph_changes ('
+        'version INTEGER PRIMARY KEY AUTOINCREMENT, entity TEXT NOT NULL, op TEXT NOT NULL, '
+        'school_id INTEGER NOT NULL, to_school_id INTEGER, old_cost INTEGER, new_cost INTEGER)',
+        'CREATE TRIGGER IF NOT EXISTS tr_schools_insert AFTER INSERT ON schools BEGIN '
+        "INSERT INTO graph_changes (entity, op, school_id) VALUES ('school', 'insert', NEW.id); END",
+        'CREATE TRIGGER IF NOT EXISTS tr_schools_update AFTER UPDATE ON schools '
+        'WHEN OLD.id IS NOT NEW.id OR OLD.name IS NOT NEW.name OR OLD.address IS NOT NEW.address '
+        'OR OLD._type IS NOT NEW._type OR OLD.status IS NOT NEW.status BEGIN '
+        "INSERT INTO graph_changes (entity, op, school_id) VALUES ('school', 'update', NEW.id); END",
+        'CREATE TRIGGER IF NOT EXISTS tr_schools_delete AFTER DELETE ON schools BEGIN '
+        "INSERT INTO graph_changes (entity, op, school_id) VALUES ('school', 'delete', OLD.id); END",
+        'CREATE TRIGGER IF NOT EXISTS tr_costs_insert AFTER INSERT ON transportation_costs BEGIN '
+        'INSERT INTO graph_changes (entity, op, school_id, to_school_id, new_cost) '
+        "VALUES ('cost', 'insert', NEW.from_school_id, NEW.to_school_id, NEW.cost); END",
+        'CREATE TRIGGER IF NOT EXISTS tr_costs_update AFTER UPDATE ON transportation_costs '
+        'WHEN OLD.cost IS NOT NEW.cost OR OLD.from_school_id IS NOT NEW.from_school_id '
+        'OR OLD.to_school_id IS NOT NEW.to_school_id BEGIN '
+        'INSERT INTO graph_changes (entity, op, school_id, to_school_id, old_cost, new_cost) '
+        "VALUES ('cost', 'update', NEW.from_school_id, NEW.to_school_id, OLD.cost, NEW.cost); END",
+        'CREATE TRIGGER IF NOT EXISTS tr_costs_delete AFTER DELETE ON transportation_costs BEGIN '
+        'INSERT INTO graph_changes (entity, op, school_id, to_school_id, old_cost) '
+        "VALUES ('cost', 'delete', OLD.from_school_id, OLD.to_school_id, OLD.cost); END",
+    ]),
+]
+
+# (query, index the plan must mention)
+QUERY_PLANS: List[Tuple[str, str]] = [
+    ('SELECT * FROM transportation_costs WHERE to_school_id = 1', 'ix_transportation_costs_to_school_id'),
+    ('SELECT * FROM schools ORDER BY name', 'ix_schools_name'),
+    ("SELECT * FROM schools WHERE status = 'Open' AND _type = 'high school'", 'ix_schools_status_type'),
+    ("SELECT * FROM schools WHERE status = 'Open'", 'ix_schools_status_type'),
+    # Keyset pages of the school listing (pagination.py)
+    ("SELECT * FROM schools WHERE (name, id) > ('a', 1) ORDER BY name, id LIMIT 51", 'ix_schools_name'),
+    ("SELECT * FROM schools WHERE (name, id) < ('a', 1) ORDER BY name DESC, id DESC LIMIT 51", 'ix_schools_name'),
+    # Change log delta (changelog.py)
+    ('SELECT * FROM graph_changes WHERE version > 1 ORDER BY version LIMIT 1000', 'INTEGER PRIMARY KEY'),
+]
+
+
+def applied_versions(connection: Connection) -> Set[int]:
+    """
+    Versions recorded as applied (creates the bookkeeping table if needed).
+
+    Args:
+        connection (Connection): Open connection
+
+    Returns:
+        Set[int]: Applied migration versions
+    """
+    connection.execute(text('CREATE TABLE IF NOT EXISTS schema_migrations ('
+                            'version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TEXT NOT NULL)'))
+    return {row[0] for row in connection.execute(text('SELECT version FROM schema_migrations'))}
+
+
+def migrate(engine: Engine) -> List[Migration]:
+    """
+    Apply every pending migration in version order.
+
+    Args:
+        engine (Engine): Database engine
+
+    Returns:
+        List[Migration]: Migrations applied by this call
+    """
+    with engine.begin() as connection:
+        done: Set[int] = applied_versions(connection)
+    applied: List[Migration] = []
+    for migration in sorted(MIGRATIONS):
+        if migration.version in done:
+            continue
+        with engine.begin() as connection:
+            for statement in migration.statements:
+                connection.execute(text(statement))
+            # OR IGNORE: another process may have applied it meanwhile
+            connection.execute(text('INSERT OR IGNORE INTO schema_migrations (version, name, applied_at) '
+                                    'VALUES (:version, :name, :applied_at)'),
+                               {'version': migration.version, 'name': migration.name,
+                                'applied_at': datetime.now(timezone.utc).isoformat(timespec='seconds')})
+        applied.append(migration)
+    return applied
+
+
+def check_query_plans(connection: Connection) -> List[str]:
+    """
+    Run EXPLAIN QUERY PLAN on QUERY_PLANS and report queries missing their index.
+
+    Args:
+        connection (Connection): Open connection
+
+    Returns:
+        List[str]: One message per failing query (empty if all use their index)
+    """
+    failures: List[str] = []
+    for query, index in QUERY_PLANS:
+        plan: str = ' | '.join(row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {query}')))
+        if index not in plan:
+            failures.append(f'{query}: expected {index}, plan was: {plan}')
+    return failures
@@ -35,6 +35,11 @@ class School(db.Model):
         status (str): Current operational status (Open/Closed) (required)
     """
     __tablename__ = 'schools'
+    # Keep in sync with migrations.py (existing databases get them from there)
+    __table_args__ = (
+        db.Index('ix_schools_name', 'name'),
+        db.Index('ix_schools_status_type', 'status', '_type'),
+    )
     id: int = db.Column(db.Integer, primary_key=True)
     name: str = db.Column(db.String, nullable=False)
     address: str = db.Column(db.String)
@@ -65,6 +70,8 @@ class TransportationCost(db.Model):
         to_school (School): Relationship to destination school
     """
     __tablename__ = 'transportation_costs'
+    # Inbound edges; the primary key only covers lookups by from_school_id
+    __table_args__ = (db.Index('ix_transportation_costs_to_school_id', 'to_school_id'),)
     from_school_id: int = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, primary_key=True)
     to_school_id: int = db.Column(db.Integer, db.ForeignKey('schools.id'), nullable=False, primary_key=True)
     cost: int = db.Column(db.Integer, nullable=False)
@@ -1,7 +1,488 @@
-from app import db  # ✅ Correct import for database
+from app import app, db  # ✅ Correct import for database
 from app.models import School, TransportationCost  # ✅ Correct model imports
 from app import sp  # ✅ Import your sp module
-from typing import Dict, List, Optional, Union, Tuple, Any
+from app.cache import LRUCache
+from app.csr import CSRGraph, INF
+from app.dynamic_sp import repair_tree
+from typing import BinaryIO, Dict, Iterator, List, Mapping, Optional, Union, Tuple, Any
+from array import array
+import contextlib
+import fcntl
+import os
+import threading
+import time
+
+
+class CachedGraph:
+    """
+    One immutable build of the school graph, shared by all requests of a worker.
+
+    Attributes:
+        version (int): Graph version the build belongs to
+        graph (Dict[int, Dict[int, int]]): Adjacency dict of school connections
+                                           (a read-only mapping view for snapshot builds)
+        school_names (Dict[int, str]): Mapping of school IDs to names
+        csr (CSRGraph): Compact copy of graph used for searches
+        bidirectional (bool): Whether reverse edges were added
+    """
+    def __init__(self, version: int, graph: Dict[int, Dict[int, int]], school_names: Dict[int, str], bidirectional: bool,
+                 csr: Optional[CSRGraph] = None, reverse: Optional[Dict[int, Dict[int, int]]] = None) -> None:
+        """
+        Wrap a freshly built graph.
+
+        Args:
+            version (int): Graph version the build belongs to
+            graph (Dict[int, Dict[int, int]]): Adjacency dict of school connections
+            school_names (Dict[int, str]): Mapping of school IDs to names
+            bidirectional (bool): Whether reverse edges were added
+            csr (CSRGraph): Prebuilt CSR copy of graph (built from graph if omitted)
+            reverse (Dict[int, Dict[int, int]]): Prebuilt reversed graph (optional)
+        """
+        self.version: int = version
+        self.graph: Dict[int, Dict[int, int]] = graph
+        self.school_names: Dict[int, str] = school_names
+        self.csr: CSRGraph = csr if csr is not None else CSRGraph.from_dict(graph)
+        self.bidirectional: bool = bidirectional
+        self._lock: threading.Lock = threading.Lock()
+        self._all_pairs: Optional['AllPairs'] = None
+        self._reverse: Optional[Dict[int, Dict[int, int]]] = reverse
+        self._landmarks: Optional[list] = None
+
+    def reverse(self) -> Dict[int, Dict[int, int]]:
+        """
+        Reversed graph for backward searches, built on first use.
+
+        Returns:
+            Dict[int, Dict[int, int]]: Graph with every edge flipped
+        """
+        if self._reverse is None:
+            with self._lock:
+                if self._reverse is None:
+                    self._reverse = sp.reverse_graph(self.graph)
+        return self._reverse
+
+    def landmarks(self) -> list:
+        """
+        ALT landmark distances for this build, computed on first use.
+
+        Uses ALT_LANDMARKS landmarks (default 8).
+
+        Returns:
+            list: Output of sp.landmark_distances()
+        """
+        if self._landmarks is None:
+            reverse: Dict[int, Dict[int, int]] = self.reverse()
+            with self._lock:
+                if self._landmarks is None:
+                    chosen: list = sp.select_landmarks(self.graph, reverse, app.config.get('ALT_LANDMARKS', 8))
+                    self._landmarks = sp.landmark_distances(self.graph, reverse, chosen)
+        return self._landmarks
+
+    def all_pairs(self) -> 'AllPairs':
+        """
+        Distance and next-hop matrices for this build, computed on first use.
+
+        Matrices saved by another worker (or a previous run) for the same
+        graph version are loaded from the instance folder instead of being
+        recomputed.
+
+        Returns:
+            AllPairs: Matrices from app.apsp (imported lazily, it needs NumPy)
+        """
+        if self._all_pairs is None:
+            with self._lock:
+                if self._all_pairs is None:
+                    from app.apsp import AllPairs
+                    path: str = os.path.join(app.instance_path, f'apsp-{"bi" if self.bidirectional else "uni"}.npz')
+                    matrices: Optional[AllPairs] = AllPairs.load(path, self.version)
+                    if matrices is None:
+                        matrices = AllPairs.compute(self.version, self.csr)
+                        try:
+                            matrices.save(path)
+                        except OSError as e:
+                            app.logger.warning(f'Could not save all-pairs matrices: {e}')
+                    self._all_pairs = matrices
+        return self._all_pairs
+
+
+class GraphCache:
+    """
+    Per-worker cache of the school graph built from the database.
+
+    The graph is built once and reused by every request until schools or
+    transportation costs change. Writers call invalidate(), which touches a
+    version stamp file in the instance folder, so every gunicorn worker sees
+    the change on its next lookup without re-querying the tables.
+
+    Attributes:
+        stamp_path (str): Path of the version stamp file
+    """
+    def __init__(self, stamp_path: str) -> None:
+        """
+        Initialize an empty cache.
+
+        Args:
+            stamp_path (str): Path of the version stamp file shared by workers
+        """
+        self.stamp_path: str = stamp_path
+        self._lock: threading.Lock = threading.Lock()
+        # bidirectional flag -> cached build
+        self._entries: Dict[bool, CachedGraph] = {}
+
+    def version(self) -> int:
+        """
+        Return the current graph version.
+
+        Returns:
+            int: Modification time (ns) of the stamp file, 0 if it does not exist yet
+        """
+        try:
+            return os.stat(self.stamp_path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    @contextlib.contextmanager
+    def _stamp_lock(self):
+        """
+        Hold this worker's lock plus an exclusive flock on the stamp file.
+
+        Serializes version bumps across gunicorn workers, so a worker that
+        reads the version and then writes a new one cannot hide a bump made
+        by another worker in between.
+        """
+        os.makedirs(os.path.dirname(self.stamp_path), exist_ok=True)
+        with self._lock, open(self.stamp_path, 'a') as stamp_file:
+            fcntl.flock(stamp_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(stamp_file, fcntl.LOCK_UN)
+
+    def _bump(self) -> int:
+        """
+        Write a new, strictly larger version to the stamp file.
+
+        Must be called under _stamp_lock().
+
+        Returns:
+            int: New version
+        """
+        stamp: int = max(self.version() + 1, time.time_ns())
+        os.utime(self.stamp_path, ns=(stamp, stamp))
+        return stamp
+
+    def invalidate(self) -> None:
+        """
+        Mark the cached graph as stale in this and every other worker.
+
+        Call after committing any change to schools or transportation costs.
+        """
+        with self._stamp_lock():
+            self._bump()
+            self._entries.clear()
+
+    def apply_edge_change(self, from_school_id: int, to_school_id: int, new_cost: int) -> Dict[str, int]:
+        """
+        Apply one committed cost edit to the cached graphs and repair cached trees.
+
+        Instead of dropping everything, the cached graphs are copied with
+        the new edge and every cached shortest-path tree of the current
+        version is repaired with dynamic_sp.repair_tree(), which recomputes
+        only the schools the edge affects. Only the changed rows are copied:
+        mapped (snapshot) graphs get a PatchedAdjacency overlay and the CSR
+        arrays are patched (CSRGraph.with_costs()), so an edit does not
+        decode or republish the whole graph. The edit is published as a
+        version bump; other workers rebuild as usual (one of them writes the
+        new snapshot). Falls back to invalidate() when the cache is out of
+        date or the edge touches an unknown school.
+
+        Args:
+            from_school_id (int): Source school of the edited cost
+            to_school_id (int): Destination school of the edited cost
+            new_cost (int): Committed cost
+
+        Returns:
+            Dict[str, int]: Number of trees repaired and schools touched
+        """
+        from app import snapshot
+        # In bidirectional graphs the reverse edge mirrors this cost unless it is explicit
+        reverse_explicit: bool = db.session.get(TransportationCost, (to_school_id, from_school_id)) is not None
+        stats: Dict[str, int] = {'trees': 0, 'touched': 0}
+        with self._stamp_lock():
+            version: int = self.version()
+            entries: Dict[bool, CachedGraph] = dict(self._entries)
+            if not entries or any(entry.version != version or from_school_id not in entry.graph
+                                  or to_school_id not in entry.graph for entry in entries.values()):
+                self._bump()
+                self._entries.clear()
+                return stats
+
+            stamp: int = self._bump()
+            for bidirectional, entry in entries.items():
+                changes: List[Tuple[int, int]] = [(from_school_id, to_school_id)]
+                if bidirectional and not reverse_explicit:
+                    changes.append((to_school_id, from_school_id))
+                trees: Dict[int, Tuple[List[float], array]] = {
+                    key[2]: tree for key, tree in tree_cache.items() if key[:2] == (version, bidirectional)}
+                previous: Dict[Tuple[int, int], Optional[int]] = {
+                    (tail, head): entry.graph[tail].get(head) for tail, head in changes}
+                # The reverse graph is only needed to repair trees after a cost increase
+                # (or to keep one that exists already); otherwise it is rebuilt lazily
+                needs_reverse: bool = entry._reverse is not None or bool(trees) and any(
+                    old is not None and new_cost > old for old in previous.values())
+                # Copy-on-write rows: readers of the old version keep theirs. A mapped
+                # (snapshot) graph gets an overlay of the changed rows instead of
+                # being decoded into a dict
+                graph: Mapping[int, Dict[int, int]] = (
+                    dict(entry.graph) if isinstance(entry.graph, dict) else snapshot.PatchedAdjacency(entry.graph, {}))
+                reverse: Optional[Mapping[int, Dict[int, int]]] = None
+                if needs_reverse:
+                    reverse = (dict(entry.reverse()) if isinstance(graph, dict)
+                               else snapshot.PatchedAdjacency(entry.reverse(), {}))
+                graph_rows: dict = graph.rows if isinstance(graph, snapshot.PatchedAdjacency) else graph
+                reverse_rows: Optional[dict] = reverse.rows if isinstance(reverse, snapshot.PatchedAdjacency) else reverse
+                for tail, head in changes:
+                    graph_rows[tail] = {**graph[tail], head: new_cost}
+                    if reverse_rows is not None:
+                        reverse_rows[head] = {**reverse[head], tail: new_cost}
+                    for source, (distances, predecessors) in trees.items():
+                        distances, predecessors, touched = repair_tree(
+                            graph, reverse, entry.csr.ids, entry.csr.index, distances, predecessors,
+                            tail, head, previous[(tail, head)])
+                        trees[source] = (distances, predecessors)
+                        stats['touched'] += touched
+                csr: CSRGraph = entry.csr.with_costs([(tail, head, new_cost) for tail, head in changes])
+                updated: CachedGraph = CachedGraph(stamp, graph, entry.school_names, bidirectional, csr, reverse)
+                self._entries[bidirectional] = updated
+                for source, tree in trees.items():
+                    # Re-key: the old-version tree is unreachable now, free its slot
+                    tree_cache.pop((version, bidirectional, source))
+                    tree_cache.put((stamp, bidirectional, source), tree)
+                stats['trees'] += len(trees)
+        return stats
+
+    def get(self, bidirectional: bool) -> CachedGraph:
+        """
+        Return the cached graph, rebuilding it if the version changed.
+
+        Args:
+            bidirectional (bool): Whether reverse edges are added for routes
+
+        Returns:
+            CachedGraph: Shared build, must be treated as read-only
+        """
+        version: int = self.version()
+        entry: Optional[CachedGraph] = self._entries.get(bidirectional)
+        if entry is not None and entry.version == version:
+            return entry
+        with self._lock:
+            entry = self._entries.get(bidirectional)
+            if entry is None or entry.version != version:
+                # Version is read before querying, so a write that lands
+                # during the build simply triggers another rebuild later
+                from app.query_budget import uncounted
+                with uncounted():
+                    entry = self._load(version, bidirectional)
+                self._entries[bidirectional] = entry
+        return entry
+
+    def _load(self, version: int, bidirectional: bool) -> CachedGraph:
+        """
+        Map the shared snapshot of a graph version, building it if needed.
+
+        The first worker to need a version builds the graph from the
+        database and publishes a snapshot (app.snapshot) while the others
+        wait on its lock, then every worker maps the same file. Graphs
+        smaller than GRAPH_SNAPSHOT_MIN_NODES (default 1000) are kept as
+        plain dicts; GRAPH_SNAPSHOT = False turns snapshots off.
+
+        Args:
+            version (int): Graph version read before building
+            bidirectional (bool): Whether reverse edges are added for routes
+
+        Returns:
+            CachedGraph: New build
+        """
+        if not app.config.get('GRAPH_SNAPSHOT', True):
+            return self._build(version, bidirectional)
+        from app import snapshot
+        path: str = snapshot.path_for(bidirectional)
+        shared: Optional[snapshot.GraphSnapshot] = snapshot.GraphSnapshot.open(path, version, bidirectional)
+        if shared is None:
+            with snapshot.build_lock(path):
+                shared = snapshot.GraphSnapshot.open(path, version, bidirectional)
+                if shared is None:
+                    entry: CachedGraph = self._build(version, bidirectional)
+                    if len(entry.graph) < app.config.get('GRAPH_SNAPSHOT_MIN_NODES', 1000):
+                        return entry
+                    snapshot.publish(path, version, bidirectional, entry.csr, entry.school_names)
+                    shared = snapshot.GraphSnapshot.open(path, version, bidirectional)
+                    if shared is None:
+                        return entry
+        return CachedGraph(version, shared.graph, shared.school_names, bidirectional, shared.csr)
+
+    def _build(self, version: int, bidirectional: bool) -> CachedGraph:
+        """
+        Build a graph version from the database into this worker's memory.
+
+        Args:
+            version (int): Graph version read before building
+            bidirectional (bool): Whether reverse edges are added for routes
+
+        Returns:
+            CachedGraph: New build
+        """
+        builder: ResourceOptimizer = ResourceOptimizer(bidirectional=bidirectional)
+        builder.build_graph_from_database()
+        return CachedGraph(version, builder.graph, builder.school_names, bidirectional)
+
+
+class HierarchyIndex:
+    """
+    Contraction hierarchies kept fresh in the background.
+
+    Building a hierarchy for a state-wide graph takes seconds to minutes, so
+    it runs in a daemon thread and queries keep using the other engines
+    until the hierarchy matches the current graph version. Built hierarchies
+    are saved to the instance folder so other workers and restarts can load
+    them instead of contracting again.
+
+    Each worker runs at most one build thread per graph flavour; versions
+    requested meanwhile collapse into the newest, which the thread picks up
+    when it finishes. A flock on the hierarchy file lets only one worker
+    contract a version, the others then load its file.
+    """
+    def __init__(self) -> None:
+        """
+        Initialize with no hierarchies.
+        """
+        self._lock: threading.Lock = threading.Lock()
+        # bidirectional flag -> hierarchy / version being built / newest build waiting
+        self._hierarchies: Dict[bool, 'ContractionHierarchy'] = {}
+        self._building: Dict[bool, int] = {}
+        self._pending: Dict[bool, CachedGraph] = {}
+
+    def path(self, bidirectional: bool) -> str:
+        """
+        File used to share hierarchies between workers.
+
+        Args:
+            bidirectional (bool): Whether reverse edges were added
+
+        Returns:
+            str: Pickle path in the instance folder
+        """
+        return os.path.join(app.instance_path, f'ch-{"bi" if bidirectional else "uni"}.pickle')
+
+    def fresh(self, cached: CachedGraph) -> Optional['ContractionHierarchy']:
+        """
+        Return the hierarchy for a graph build if it is up to date.
+
+        Args:
+            cached (CachedGraph): Current graph build
+
+        Returns:
+            Optional[ContractionHierarchy]: Hierarchy, or None if stale or missing
+        """
+        hierarchy = self._hierarchies.get(cached.bidirectional)
+        if hierarchy is not None and hierarchy.version == cached.version:
+            return hierarchy
+        return None
+
+    def get(self, cached: CachedGraph, wait: bool = False) -> Optional['ContractionHierarchy']:
+        """
+        Return a fresh hierarchy, loading or scheduling a build if needed.
+
+        Args:
+            cached (CachedGraph): Current graph build
+            wait (bool): Build in the calling thread instead of the background
+
+        Returns:
+            Optional[ContractionHierarchy]: Hierarchy, or None while a background build runs
+        """
+        hierarchy = self.fresh(cached)
+        if hierarchy is not None:
+            return hierarchy
+        from app.ch import ContractionHierarchy
+        hierarchy = ContractionHierarchy.load(self.path(cached.bidirectional), cached.version)
+        if hierarchy is not None:
+            self._hierarchies[cached.bidirectional] = hierarchy
+            return hierarchy
+        if wait:
+            self._build(cached)
+            return self.fresh(cached)
+        self.schedule(cached)
+        return None
+
+    def schedule(self, cached: CachedGraph) -> None:
+        """
+        Build a graph version in the background.
+
+        Starts the build thread if none is running; otherwise the version is
+        queued and replaces any older queued version.
+
+        Args:
+            cached (CachedGraph): Graph build to contract
+        """
+        flag: bool = cached.bidirectional
+        with self._lock:
+            building: Optional[int] = self._building.get(flag)
+            if building is not None:
+                pending: Optional[CachedGraph] = self._pending.get(flag)
+                if cached.version > building and (pending is None or cached.version > pending.version):
+                    self._pending[flag] = cached
+                return
+            self._building[flag] = cached.version
+        threading.Thread(target=self._run, args=(cached,), name='ch-build', daemon=True).start()
+
+    def _run(self, cached: CachedGraph) -> None:
+        """
+        Build thread: contract cached, then the newest queued version, if any.
+
+        Args:
+            cached (CachedGraph): First graph build to contract
+        """
+        flag: bool = cached.bidirectional
+        while True:
+            self._build(cached)
+            with self._lock:
+                pending: Optional[CachedGraph] = self._pending.pop(flag, None)
+                if pending is None or pending.version <= cached.version:
+                    del self._building[flag]
+                    return
+                self._building[flag] = pending.version
+            cached = pending
+
+    def _build(self, cached: CachedGraph) -> None:
+        """
+        Contract a graph build and publish the result.
+
+        Holds the hierarchy file's lock, so when another worker already
+        contracted this version its file is loaded instead. Versions that
+        became stale while waiting are skipped.
+
+        Args:
+            cached (CachedGraph): Graph build to contract
+        """
+        from app import snapshot
+        from app.ch import ContractionHierarchy
+        path: str = self.path(cached.bidirectional)
+        try:
+            with snapshot.build_lock(path):
+                hierarchy: Optional[ContractionHierarchy] = ContractionHierarchy.load(path, cached.version)
+                if hierarchy is None:
+                    if graph_cache.version() != cached.version:
+                        return
+                    started: float = time.perf_counter()
+                    hierarchy = ContractionHierarchy.build(cached.version, cached.graph)
+                    hierarchy.save(path)
+                    app.logger.info(f'Contraction hierarchy built in {time.perf_counter() - started:.1f}s '
+                                    f'({len(hierarchy.rank)} schools, {hierarchy.num_shortcuts} shortcuts)')
+            current = self._hierarchies.get(cached.bidirectional)
+            if current is None or current.version <= hierarchy.version:
+                self._hierarchies[cached.bidirectional] = hierarchy
+        except Exception as e:
+            app.logger.error(f'Contraction hierarchy build failed: {e}')
 
 
 class ResourceOptimizer:
@@ -13,19 +494,125 @@ class ResourceOptimizer:
         graph (Dict[int, Dict[int, int]]): Graph representation of school connections
         school_names (Dict[int, str]): Mapping of school IDs to names
         bidirectional (bool): Whether to treat routes as bidirectional
+        engine (str): Search engine used by find_optimal_path
+        graph_version (int): Version of the cached graph currently loaded
+        csr (CSRGraph): Compact copy of graph used for searches
     """
-    def __init__(self, bidirectional: bool = False) -> None:
+    ENGINES: Tuple[str, ...] = ('auto', 'dijkstra', 'all_pairs', 'bidirectional', 'alt', 'ch')
+
+    def __init__(self, bidirectional: bool = False, engine: str = 'auto') -> None:
         """
         Initialize optimizer with empty graph.
         
         Args:
             bidirectional (bool): If True, creates bidirectional edges for routes
+            engine (str): 'dijkstra' (cached full trees), 'all_pairs', 'bidirectional',
+                          'alt', 'ch' (contraction hierarchy, built on demand),
+                          or 'auto' to pick one per query (see resolve_engine)
         """
+        assert engine in self.ENGINES, f'Unknown engine: {engine}'
         # Initialize optimizer with empty graph
         self.graph: Dict[int, Dict[int, int]] = {}
         self.school_names: Dict[int, str] = {}
         self.bidirectional: bool = bidirectional
+        self.engine: str = engine
+        self.graph_version: int = 0
+        self.csr: Optional[CSRGraph] = None
+        self.cached: Optional[CachedGraph] = None
+
+    def load_graph(self) -> Dict[int, Dict[int, int]]:
+        """
+        Load the graph from the shared per-worker cache.
+
+        Only rebuilds from the database when schools or transportation
+        costs changed since the cached copy was built.
+
+        Returns:
+            Dict[int, Dict[int, int]]: Shared (read-only) graph of school connections
+        """
+        cached: CachedGraph = graph_cache.get(self.bidirectional)
+        self.cached = cached
+        self.graph_version = cached.version
+        self.graph = cached.graph
+        self.school_names = cached.school_names
+        self.csr = cached.csr
+        return self.graph
     
+    def resolve_engine(self, source_school_id: int) -> str:
+        """
+        Pick the engine for a query on the loaded graph.
+
+        In 'auto' mode, districts with at most APSP_MAX_NODES schools (default
+        500, 0 disables) use precomputed all-pairs matrices. Larger ones reuse
+        a cached tree for the source if there is one. From CH_MIN_NODES schools
+        (default 20000, 0 disables) a contraction hierarchy is used once it is
+        fresh (a stale one is rebuilt in the background meanwhile). Otherwise
+        ALT point-to-point search is used from P2P_MIN_NODES schools (default
+        5000), and a full Dijkstra tree below that.
+
+        Args:
+            source_school_id (int): Starting school ID
+
+        Returns:
+            str: Engine name
+        """
+        if self.engine != 'auto':
+            return self.engine
+        num_nodes: int = len(self.csr)
+        if num_nodes <= app.config.get('APSP_MAX_NODES', 500):
+            return 'all_pairs'
+        if (self.graph_version, self.bidirectional, source_school_id) in tree_cache:
+            return 'dijkstra'
+        ch_min_nodes: int = app.config.get('CH_MIN_NODES', 20000)
+        if ch_min_nodes and num_nodes >= ch_min_nodes and hierarchy_index.get(self.cached) is not None:
+            return 'ch'
+        if num_nodes >= app.config.get('P2P_MIN_NODES', 5000):
+            return 'alt'
+        return 'dijkstra'
+
+    def shortest_path_tree(self, source_school_id: int) -> Tuple[List[float], array]:
+        """
+        Return the full shortest-path tree from a school, using the shared LRU.
+
+        Trees are keyed by (graph version, bidirectional, source), so any
+        later query from the same source is a lookup plus path rebuild, and
+        a graph change makes old entries unreachable until they age out.
+
+        Args:
+            source_school_id (int): Starting school ID
+
+        Returns:
+            Tuple[List[float], array]: Shared (read-only) dense distances and
+            predecessors from CSRGraph.shortest_path_tree()
+        """
+        if self.csr is None:
+            self.load_graph()
+        key: Tuple[int, bool, int] = (self.graph_version, self.bidirectional, source_school_id)
+        tree = tree_cache.get(key)
+        if tree is None:
+            tree = self.csr.shortest_path_tree(source_school_id)
+            tree_cache.put(key, tree)
+        return tree
+
+    def point_to_point(self, engine: str, source_school_id: int, target_school_id: int) -> Tuple[Optional[int], List[int], int]:
+        """
+        Run one of the point-to-point engines on the loaded graph.
+
+        Args:
+            engine (str): 'bidirectional', 'alt' or 'ch'
+            source_school_id (int): Starting school ID
+            target_school_id (int): Ending school ID
+
+        Returns:
+            (cost, path, explored): See sp.bidirectional_dijkstra()
+        """
+        if engine == 'ch':
+            hierarchy = hierarchy_index.get(self.cached, wait=True)
+            return hierarchy.query(source_school_id, target_school_id)
+        if engine == 'alt':
+            return sp.alt_search(self.graph, source_school_id, target_school_id, self.cached.landmarks())
+        return sp.bidirectional_dijkstra(self.graph, self.cached.reverse(), source_school_id, target_school_id)
+
     def build_graph_from_database(self) -> Dict[int, Dict[int, int]]:
         """
         Build graph representation from database transportation costs.
@@ -37,9 +624,9 @@ class ResourceOptimizer:
             Dict[int, Dict[int, int]]: Graph with school IDs as keys and 
                                      connected schools with costs as values
         """
-        # Fresh rebuild each call
-        self.graph.clear()
-        self.school_names.clear()
+        # Fresh rebuild each call (new dicts, cached graphs may share the old ones)
+        self.graph = {}
+        self.school_names = {}
 
         # Query all schools from database
         schools: List[School] = School.query.all()
@@ -54,13 +641,32 @@ class ResourceOptimizer:
         
         # Add edges (connections) with costs
         for cost in costs:
-            if cost.from_school_id in self.graph:
+            # Skip edges whose endpoints no longer exist (e.g. deleted schools)
+            if cost.from_school_id in self.graph and cost.to_school_id in self.graph:
                 self.graph[cost.from_school_id][cost.to_school_id] = cost.cost
-            if self.bidirectional and cost.to_school_id in self.graph:
+            if self.bidirectional and cost.to_school_id in self.graph and cost.from_school_id in self.graph:
                 # only add reverse if not defined
                 self.graph[cost.to_school_id].setdefault(cost.from_school_id, cost.cost)
         
         return self.graph
+
+    def build_graph_from_edge_list(self, stream: BinaryIO) -> Dict[int, Dict[int, int]]:
+        """
+        Build the graph from a binary edge list instead of the database.
+
+        Same result as build_graph_from_database() for an export of the same
+        data (`flask export-data costs --format bin`), without ORM objects.
+
+        Args:
+            stream (BinaryIO): Binary edge list (see bulk_export.py)
+
+        Returns:
+            Dict[int, Dict[int, int]]: Graph with school IDs as keys and
+                                     connected schools with costs as values
+        """
+        from app.bulk_export import read_edge_list
+        self.graph, self.school_names = read_edge_list(stream, self.bidirectional)
+        return self.graph
     
     def find_optimal_path(self, source_school_id: int, target_school_id: int) -> Dict[str, Any]:
         """
@@ -86,20 +692,56 @@ class ResourceOptimizer:
         if source_school_id == target_school_id:
             return {'success': False, 'message': 'Source and target schools cannot be the same.'}
 
-        self.build_graph_from_database()
+        self.load_graph()
         
         try:
             assert source_school_id in self.graph, f'Source school (ID: {source_school_id}) not found in system.'
             assert target_school_id in self.graph, f'Target school (ID: {target_school_id}) not found in system.'
             
-            total_cost: int
-            path: List[int]
-            total_cost, path = sp.dijkstra(self.graph, source_school_id, target_school_id)
-            assert path, 'No valid path exists between these schools. Check transportation costs.'
-            
-            all_distances: Dict[int, int]
+            engine: str = self.resolve_engine(source_school_id)
+            source: int = self.csr.index[source_school_id]
+            target: int = self.csr.index[target_school_id]
+            all_distances: Dict[int, float]
             spf: Dict[int, List[int]]
-            all_distances, spf = sp.dijkstra(self.graph, source_school_id, None)
+            explored: Optional[int] = None
+            
+            if engine in ('bidirectional', 'alt', 'ch'):
+                # Point-to-point search: only the route itself is known, so the
+                # debug table covers the schools on the path
+                total_cost, path, explored = self.point_to_point(engine, source_school_id, target_school_id)
+                assert path, 'No valid path exists between these schools. Check transportation costs.'
+                
+                all_distances = {}
+                spf = {}
+                running_cost: int = 0
+                for i, node_id in enumerate(path):
+                    if i:
+                        running_cost += self.graph[path[i - 1]][node_id]
+                    all_distances[node_id] = running_cost
+                    spf[node_id] = path[:i]
+            elif engine == 'all_pairs':
+                # Precomputed matrices: the route is a walk along next hops
+                matrices = self.cached.all_pairs()
+                path: List[int] = matrices.path(source, target)
+                assert path, 'No valid path exists between these schools. Check transportation costs.'
+                total_cost: int = int(matrices.dist[source, target])
+                
+                row: List[float] = matrices.dist[source].tolist()
+                all_distances = {sid: (int(d) if d != float('inf') else d) for sid, d in zip(self.csr.ids, row)}
+                spf = {self.csr.ids[k]: matrices.path(source, k)[:-1] for k, d in enumerate(row) if d != float('inf')}
+            else:
+                # One full tree per (graph version, source) answers every target
+                dense_distances: List[float]
+                dense_predecessors: array
+                dense_distances, dense_predecessors = self.shortest_path_tree(source_school_id)
+                
+                path = self.csr.path(dense_predecessors, source_school_id, target_school_id)
+                assert path, 'No valid path exists between these schools. Check transportation costs.'
+                total_cost = dense_distances[target]
+                
+                predecessors: Dict[int, Optional[int]]
+                all_distances, predecessors = self.csr.tree_dicts(dense_distances, dense_predecessors, source_school_id)
+                spf = {node_id: sp.build_path(predecessors, source_school_id, node_id)[:-1] for node_id in predecessors}
             
         except AssertionError as e:
             return {'success': False, 'message': str(e)}
@@ -123,6 +765,186 @@ class ResourceOptimizer:
             'debug': {
                 'distances': all_distances,
                 'spf': spf_names,
-                'source_id': source_school_id
+                'source_id': source_school_id,
+                'engine': engine,
+                'explored': explored,
+                'tree_cache': tree_cache.stats()
             }
-        }
\ No newline at end of file
+        }
+
+    def find_alternative_paths(self, source_school_id: int, target_school_id: int, k: int) -> Dict[str, Any]:
+        """
+        Find up to k loopless routes between two schools, cheapest first.
+
+        Uses sp.k_shortest_paths() (Yen's algorithm guided by one reversed
+        shortest-path tree), so asking for alternatives costs little more
+        than the optimal route itself.
+
+        Args:
+            source_school_id (int): Starting school ID
+            target_school_id (int): Destination school ID
+            k (int): Maximum number of routes (capped at KSP_MAX_K, default 10)
+
+        Returns:
+            Dict[str, Any]: Result dictionary containing:
+                - success (bool): Whether at least one route was found
+                - message (str): Status or error message
+                - routes (List[Dict]): path, path_names, total_cost and
+                  num_transfers of each route (if successful)
+                - explored (int): Nodes settled by spur searches (if successful)
+        """
+        if source_school_id == target_school_id:
+            return {'success': False, 'message': 'Source and target schools cannot be the same.'}
+        self.load_graph()
+        if source_school_id not in self.graph:
+            return {'success': False, 'message': f'Source school (ID: {source_school_id}) not found in system.'}
+        if target_school_id not in self.graph:
+            return {'success': False, 'message': f'Target school (ID: {target_school_id}) not found in system.'}
+
+        k = max(1, min(k, app.config.get('KSP_MAX_K', 10)))
+        found, explored = sp.k_shortest_paths(self.graph, self.cached.reverse(), source_school_id, target_school_id, k)
+        if not found:
+            return {'success': False, 'message': 'No valid path exists between these schools. Check transportation costs.'}
+
+        routes: List[Dict[str, Any]] = [{
+            'path': path,
+            'path_names': [self.school_names.get(sid, f'Unknown School (ID: {sid})') for sid in path],
+            'total_cost': total_cost,
+            'num_transfers': len(path) - 1
+        } for total_cost, path in found]
+        return {
+            'success': True,
+            'routes': routes,
+            'explored': explored,
+            'message': f'Found {len(routes)} route(s).'
+        }
+
+    def distance_rows(self, source_ids: Optional[List[int]] = None,
+                      target_ids: Optional[List[int]] = None) -> Iterator[Tuple[int, List[Optional[int]]]]:
+        """
+        Yield one row of a distance matrix per source, one search per source.
+
+        Small districts read rows straight from the all-pairs matrices. Larger
+        ones reuse a cached tree when there is one and otherwise run a fresh
+        CSR search that is not added to tree_cache, so exporting a full
+        matrix does not evict the trees serving interactive routes.
+
+        Args:
+            source_ids (List[int]): Source school IDs (all schools if None)
+            target_ids (List[int]): Target school IDs (all schools if None)
+
+        Yields:
+            Tuple[int, List[Optional[int]]]: Source ID and its cost to each
+            target in target_ids order (None if unreachable or unknown)
+        """
+        self.load_graph()
+        csr: CSRGraph = self.csr
+        sources: List[int] = list(csr.ids) if source_ids is None else source_ids
+        targets: List[int] = list(csr.ids) if target_ids is None else target_ids
+        columns: List[int] = [csr.index.get(target_school_id, -1) for target_school_id in targets]
+        matrices = self.cached.all_pairs() if len(csr) <= app.config.get('APSP_MAX_NODES', 500) else None
+
+        for source_school_id in sources:
+            if source_school_id not in csr.index:
+                yield source_school_id, [None] * len(targets)
+                continue
+            source: int = csr.index[source_school_id]
+            distances: List[float]
+            if matrices is not None:
+                distances = matrices.dist[source].tolist()
+            else:
+                tree = tree_cache.get((self.graph_version, self.bidirectional, source_school_id))
+                distances = tree[0] if tree is not None else csr.search(source)[0]
+            row: List[Optional[int]] = []
+            for column in columns:
+                distance: float = distances[column] if column >= 0 else INF
+                row.append(int(distance) if distance != INF else None)
+            yield source_school_id, row
+
+    def find_paths(self, pairs: List[Tuple[int, int]]) -> Iterator[Dict[str, Any]]:
+        """
+        Find the optimal paths for many (source, target) pairs.
+
+        Pairs are grouped by source and each distinct source is searched
+        once: a single shortest-path tree (or all-pairs row) answers every
+        target of the group, and a lone target on a large graph uses the
+        point-to-point engine picked by resolve_engine(). Results are
+        yielded as soon as their group is done, grouped by source.
+
+        Args:
+            pairs (List[Tuple[int, int]]): (source school ID, target school ID) pairs
+
+        Yields:
+            Dict[str, Any]: One result per pair with its position in pairs
+            ('index'), 'source_id', 'target_id', 'success' and either
+            path, path_names, total_cost and num_transfers or a message
+        """
+        self.load_graph()
+        groups: Dict[int, List[Tuple[int, int]]] = {}
+        for position, (source_school_id, target_school_id) in enumerate(pairs):
+            groups.setdefault(source_school_id, []).append((position, target_school_id))
+
+        for source_school_id, targets in groups.items():
+            routes: Dict[int, Tuple[Optional[float], List[int]]] = {}
+            if source_school_id in self.graph:
+                engine: str = self.resolve_engine(source_school_id)
+                source: int = self.csr.index[source_school_id]
+                if engine == 'all_pairs':
+                    matrices = self.cached.all_pairs()
+                    for _, target_school_id in targets:
+                        if target_school_id in self.graph:
+                            target: int = self.csr.index[target_school_id]
+                            routes[target_school_id] = (matrices.dist[source, target], matrices.path(source, target))
+                elif engine in ('bidirectional', 'alt', 'ch') and len(targets) == 1:
+                    target_school_id = targets[0][1]
+                    if target_school_id in self.graph and target_school_id != source_school_id:
+                        total_cost, path, _ = self.point_to_point(engine, source_school_id, target_school_id)
+                        routes[target_school_id] = (total_cost, path)
+                else:
+                    dense_distances, dense_predecessors = self.shortest_path_tree(source_school_id)
+                    for _, target_school_id in targets:
+                        if target_school_id in self.graph:
+                            routes[target_school_id] = (dense_distances[self.csr.index[target_school_id]],
+                                                        self.csr.path(dense_predecessors, source_school_id, target_school_id))
+
+            for position, target_school_id in targets:
+                result: Dict[str, Any] = {'index': position, 'source_id': source_school_id, 'target_id': target_school_id}
+                total_cost, path = routes.get(target_school_id, (None, []))
+                if source_school_id == target_school_id:
+                    result.update(success=False, message='Source and target schools cannot be the same.')
+                elif source_school_id not in self.graph:
+                    result.update(success=False, message=f'Source school (ID: {source_school_id}) not found in system.')
+                elif target_school_id not in self.graph:
+                    result.update(success=False, message=f'Target school (ID: {target_school_id}) not found in system.')
+                elif not path:
+                    result.update(success=False, message='No valid path exists between these schools. Check transportation costs.')
+                else:
+                    result.update(success=True, path=path,
+                                  path_names=[self.school_names.get(sid, f'Unknown School (ID: {sid})') for sid in path],
+                                  total_cost=int(total_cost), num_transfers=len(path) - 1)
+                yield result
+
+
+# Shared graph cache for this worker
+graph_cache: GraphCache = GraphCache(os.path.join(app.instance_path, 'graph.version'))
+
+# Contraction hierarchies, rebuilt in the background after graph changes
+hierarchy_index: HierarchyIndex = HierarchyIndex()
+
+
+def refresh_hierarchies() -> None:
+    """
+    Rebuild trigger for contraction hierarchies after a cost edit.
+
+    Loads the new graph version and starts a background build for it when
+    the district is large enough to use hierarchies (CH_MIN_NODES).
+    """
+    ch_min_nodes: int = app.config.get('CH_MIN_NODES', 20000)
+    if not ch_min_nodes:
+        return
+    cached: CachedGraph = graph_cache.get(True)
+    if len(cached.csr) >= ch_min_nodes:
+        hierarchy_index.schedule(cached)
+
+# Shortest-path trees keyed by (graph version, bidirectional, source)
+tree_cache: LRUCache = LRUCache(maxsize=app.config.get('ROUTE_TREE_CACHE_SIZE', 128))
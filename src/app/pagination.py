@@ -0,0 +1,144 @@
+"""
+Keyset (cursor) pagination for the school and cost listings.
+
+OFFSET pagination gets slower with every page because SQLite still walks
+the skipped rows. A keyset page instead asks for rows strictly after (or
+before) the sort key of the last row shown, which an index answers
+directly, so every page costs the same however large the district is.
+Cursors are the sort key of a boundary row, JSON-encoded in URL-safe
+base64 so they can be passed around as an opaque ?after= / ?before= value.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple
+
+from flask import abort, request
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from app import app
+
+
+class Page:
+    """
+    One page of rows plus the cursors of its neighbours.
+
+    Attributes:
+        items (List[Any]): Rows of this page, in sort order
+        next_cursor (Optional[str]): Cursor for ?after= of the next page, None on the last page
+        prev_cursor (Optional[str]): Cursor for ?before= of the previous page, None on the first page
+        limit (int): Page size used
+    """
+    def __init__(self, items: List[Any], next_cursor: Optional[str], prev_cursor: Optional[str], limit: int) -> None:
+        """
+        Wrap a fetched page.
+
+        Args:
+            items (List[Any]): Rows of this page
+            next_cursor (Optional[str]): Cursor of the next page
+            prev_cursor (Optional[str]): Cursor of the previous page
+            limit (int): Page size used
+        """
+        self.items: List[Any] = items
+        self.next_cursor: Optional[str] = next_cursor
+        self.prev_cursor: Optional[str] = prev_cursor
+        self.limit: int = limit
+
+
+def encode_cursor(key: Tuple) -> str:
+    """
+    Turn a sort key into an opaque URL-safe cursor.
+
+    Args:
+        key (Tuple): Sort column values of a row
+
+    Returns:
+        str: Cursor string
+    """
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, width: int) -> Tuple:
+    """
+    Parse a cursor made by encode_cursor(); aborts with 400 if malformed.
+
+    Args:
+        cursor (str): Cursor string from the query string
+        width (int): Number of sort columns expected
+
+    Returns:
+        Tuple: Sort key
+    """
+    try:
+        key: Any = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        abort(400, description='Invalid page cursor.')
+    # Only strings and integers are sort keys; anything else would reach the query as a bad binding
+    if (not isinstance(key, list) or len(key) != width
+            or any(not isinstance(value, (str, int)) or isinstance(value, bool) for value in key)):
+        abort(400, description='Invalid page cursor.')
+    return tuple(key)
+
+
+def page_size(config_key: str, default: int = 50) -> int:
+    """
+    Page size from ?limit=, else the configured default, capped by PAGE_SIZE_MAX.
+
+    Args:
+        config_key (str): Config entry holding the default size for this listing
+        default (int): Size used when the config entry is missing
+
+    Returns:
+        int: Page size (at least 1)
+    """
+    limit: int = request.args.get('limit', default=app.config.get(config_key, default), type=int)
+    return max(1, min(limit, app.config.get('PAGE_SIZE_MAX', 500)))
+
+
+def keyset_page(query: Query, columns: list, limit: int, after: Optional[str] = None,
+                before: Optional[str] = None) -> Page:
+    """
+    Fetch one page of query ordered by columns.
+
+    The columns must make the order unique (end with a primary key) and
+    should be covered by an index for the page to stay cheap.
+
+    Args:
+        query (Query): Filtered query without ORDER BY/LIMIT
+        columns (list): Mapped columns to sort by, e.g. [School.name, School.id]
+        limit (int): Page size
+        after (Optional[str]): Cursor; return the rows following it
+        before (Optional[str]): Cursor; return the rows preceding it (ignored if after is given)
+
+    Returns:
+        Page: Rows and neighbour cursors
+    """
+    key_expr = tuple_(*columns) if len(columns) > 1 else columns[0]
+
+    def bound(cursor: str):
+        key: Tuple = decode_cursor(cursor, len(columns))
+        return key if len(columns) > 1 else key[0]
+
+    backwards: bool = before is not None and after is None
+    if backwards:
+        query = query.filter(key_expr < bound(before)).order_by(*[column.desc() for column in columns])
+    else:
+        if after is not None:
+            query = query.filter(key_expr > bound(after))
+        query = query.order_by(*columns)
+    # One extra row tells whether another page follows
+    rows: List[Any] = query.limit(limit + 1).all()
+    more: bool = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    def cursor_of(row: Any) -> str:
+        return encode_cursor(tuple(getattr(row, column.key) for column in columns))
+
+    if not rows:
+        return Page(rows, None, None, limit)
+    if backwards:
+        return Page(rows, cursor_of(rows[-1]), cursor_of(rows[0]) if more else None, limit)
+    return Page(rows, cursor_of(rows[-1]) if more else None, cursor_of(rows[0]) if after is not None else None, limit)
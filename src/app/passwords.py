@@ -0,0 +1,186 @@
+"""
+Password hashing off the request threads, with a calibrated work factor.
+
+bcrypt is deliberately slow, and a burst of logins would otherwise tie up
+every request thread of a worker. Hashes run on a small per-process
+executor instead; when it already has BCRYPT_MAX_PENDING jobs (default
+and upper bound: THREADS - 1, at least 1, since every caller waits on its
+request thread), new requests are turned away at once (PasswordHashingBusy,
+answered with 503 and Retry-After) so the remaining threads keep serving
+routes.
+
+The bcrypt cost is calibrated once per process to take about
+BCRYPT_TARGET_MS (BCRYPT_ROUNDS pins it instead). Hashes stored with a
+different cost are re-hashed on the next successful login.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import bcrypt
+
+from app import app
+
+# bcrypt accepts 4..31; stay within a range that is both safe and usable
+MIN_ROUNDS: int = 10
+MAX_ROUNDS: int = 16
+
+
+class PasswordHashingBusy(Exception):
+    """
+    Raised when the hashing executor has no free slot.
+    """
+
+
+_rounds: Optional[int] = None
+_executor: Optional[ThreadPoolExecutor] = None
+_slots: Optional[threading.BoundedSemaphore] = None
+_lock: threading.Lock = threading.Lock()
+counters: Dict[str, int] = {'hashed': 0, 'checked': 0, 'rejected': 0, 'rehashed': 0}
+
+
+def calibrate(target_ms: float) -> int:
+    """
+    Pick the largest bcrypt cost whose hash takes at most target_ms here.
+
+    Each extra round doubles the time, so one timed hash at a low cost is
+    scaled up, then the choice is checked with a real hash.
+
+    Args:
+        target_ms (float): Wanted hashing time in milliseconds
+
+    Returns:
+        int: Cost between MIN_ROUNDS and MAX_ROUNDS
+    """
+    probe: int = 8
+    start: float = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(probe))
+    probe_ms: float = max((time.perf_counter() - start) * 1000, 0.01)
+    cost: int = probe
+    while cost < MAX_ROUNDS and probe_ms * 2 ** (cost + 1 - probe) <= target_ms:
+        cost += 1
+    cost = max(cost, MIN_ROUNDS)
+    # The estimate ignores fixed overhead; step down once if it overshoots
+    start = time.perf_counter()
+    bcrypt.hashpw(b'calibration', bcrypt.gensalt(cost))
+    if (time.perf_counter() - start) * 1000 > 1.5 * target_ms and cost > MIN_ROUNDS:
+        cost -= 1
+    return cost
+
+
+def rounds() -> int:
+    """
+    bcrypt cost used for new hashes in this process.
+
+    Returns:
+        int: BCRYPT_ROUNDS if set, otherwise the calibrated cost
+    """
+    global _rounds
+    if _rounds is None:
+        with _lock:
+            if _rounds is None:
+                configured: Optional[int] = app.config.get('BCRYPT_ROUNDS')
+                _rounds = int(configured) if configured else calibrate(app.config.get('BCRYPT_TARGET_MS', 250))
+    return _rounds
+
+
+def _run(job: Callable, *args):
+    """
+    Run a hashing job on the executor, or inline if BCRYPT_WORKERS is 0.
+
+    Args:
+        job (Callable): bcrypt function to call
+        *args: Its arguments
+
+    Returns:
+        Whatever job returns
+
+    Raises:
+        PasswordHashingBusy: All BCRYPT_MAX_PENDING slots are taken
+    """
+    global _executor, _slots
+    workers: int = app.config.get('BCRYPT_WORKERS', 1)
+    if workers <= 0:
+        return job(*args)
+    if _executor is None:
+        with _lock:
+            if _executor is None:
+                # Waiting callers hold request threads: always leave one free for routes
+                threads: int = app.config.get('THREADS', 2)
+                pending: int = app.config.get('BCRYPT_MAX_PENDING', threads - 1)
+                _slots = threading.BoundedSemaphore(max(1, min(pending, threads - 1)))
+                _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='bcrypt')
+    if not _slots.acquire(blocking=False):
+        counters['rejected'] += 1
+        raise PasswordHashingBusy()
+    try:
+        return _executor.submit(job, *args).result()
+    finally:
+        _slots.release()
+
+
+def hash_password(password: str) -> bytes:
+    """
+    Salt and hash a password with the current cost.
+
+    Args:
+        password (str): Plain text password
+
+    Returns:
+        bytes: bcrypt hash
+
+    Raises:
+        PasswordHashingBusy: Too many hashes in flight
+    """
+    hashed: bytes = _run(bcrypt.hashpw, password.encode('utf-8'), bcrypt.gensalt(rounds()))
+    counters['hashed'] += 1
+    return hashed
+
+
+def check_password(password: str, hashed: bytes) -> bool:
+    """
+    Check a password against a stored hash.
+
+    Args:
+        password (str): Plain text password
+        hashed (bytes): Stored bcrypt hash
+
+    Returns:
+        bool: True if the password matches
+
+    Raises:
+        PasswordHashingBusy: Too many hashes in flight
+    """
+    matches: bool = _run(bcrypt.checkpw, password.encode('utf-8'), hashed)
+    counters['checked'] += 1
+    return matches
+
+
+def needs_rehash(hashed: bytes) -> bool:
+    """
+    Whether a stored hash uses a different cost than new hashes would.
+
+    Args:
+        hashed (bytes): Stored bcrypt hash ($2b$<cost>$...)
+
+    Returns:
+        bool: True if it should be replaced after the next successful login
+    """
+    try:
+        return int(hashed[4:6]) != rounds()
+    except (TypeError, ValueError):
+        return True
+
+
+def _reset_after_fork() -> None:
+    """
+    Drop the executor inherited from a parent process (its threads are gone).
+    """
+    global _executor, _slots
+    _executor = None
+    _slots = None
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
@@ -0,0 +1,103 @@
+"""
+Per-request SQL query counting with budgets per endpoint.
+
+Every statement run through db.engine during a request is counted. When
+an endpoint listed in QUERY_BUDGETS runs more queries than its budget (an
+N+1 regression, for example) a warning is logged; with
+QUERY_BUDGET_STRICT set the response is replaced by a 500 naming the
+overrun, so tests and smoke checks catch the regression. QUERY_BUDGETS in app.config
+overrides single entries. Queries run while a streamed response is being
+generated are not counted, nor are those inside uncounted(): the per-version
+cache loads (graph rebuild, school choices) run once per worker after a
+graph version bump, not once per request, so budgets cover the warm path.
+"""
+import contextlib
+from typing import Dict, Optional
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+from app import app, db
+
+# endpoint (GET/HEAD) or "endpoint METHOD" -> maximum number of queries per request,
+# identity lookups included
+QUERY_BUDGETS: Dict[str, int] = {
+    'list_schools': 2,
+    'school_costs': 4,
+    'school_costs POST': 8,
+    'update_school': 2,
+    'school_routes': 2,
+    'school_routes POST': 2,
+}
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    """
+    before_cursor_execute hook: count one statement for the current request.
+    """
+    if has_request_context() and not g.get('query_count_paused', 0):
+        g.query_count = g.get('query_count', 0) + 1
+
+
+@contextlib.contextmanager
+def uncounted():
+    """
+    Leave the queries run inside the block out of the request's count.
+
+    For loads shared by every later request of the worker (per-version caches).
+    Outside a request context it does nothing.
+    """
+    if not has_request_context():
+        yield
+        return
+    g.query_count_paused = g.get('query_count_paused', 0) + 1
+    try:
+        yield
+    finally:
+        g.query_count_paused -= 1
+
+
+with app.app_context():
+    event.listen(db.engine, 'before_cursor_execute', _count_query)
+
+
+def budget_for(endpoint: str, method: str) -> Optional[int]:
+    """
+    Query budget of one endpoint and HTTP method.
+
+    Args:
+        endpoint (str): Flask endpoint name
+        method (str): HTTP method
+
+    Returns:
+        Optional[int]: Budget, None if the request is not budgeted
+    """
+    budgets: Dict[str, int] = {**QUERY_BUDGETS, **app.config.get('QUERY_BUDGETS', {})}
+    if method in ('GET', 'HEAD'):
+        return budgets.get(endpoint)
+    return budgets.get(f'{endpoint} {method}')
+
+
+@app.after_request
+def check_query_budget(response: Response) -> Response:
+    """
+    Compare the request's query count with its endpoint budget.
+
+    Args:
+        response (Response): Outgoing response
+
+    Returns:
+        Response: The response (a 500 naming the overrun in strict mode),
+        with X-Query-Count in debug or strict mode
+    """
+    count: int = g.get('query_count', 0)
+    strict: bool = app.config.get('QUERY_BUDGET_STRICT', False)
+    budget: Optional[int] = budget_for(request.endpoint, request.method)
+    if budget is not None and count > budget:
+        message: str = f'{request.endpoint} {request.method} ran {count} queries (budget {budget})'
+        app.logger.warning(message)
+        if strict:
+            response = Response(message, status=500, mimetype='text/plain')
+    if strict or app.debug:
+        response.headers['X-Query-Count'] = str(count)
+    return response
@@ -0,0 +1,349 @@
+"""
+Route graph rendering in two layers.
+
+The base layer (every school's circle, ID and name on a circular layout)
+depends only on the graph version, so it is rasterized once and reused.
+Each request only draws the overlay on top of it: the highlighted path
+schools, arrows and cost labels (weights come from the optimizer graph),
+plus title and legend. Request time therefore grows with the path length,
+not with the number of schools.
+
+matplotlib and Pillow (a matplotlib dependency) are imported lazily, callers
+handle ImportError. route_svg() draws the same picture as SVG markup with the
+standard library only, so serving it never imports matplotlib.
+"""
+import math
+from io import BytesIO
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+from app import app
+from app.cache import LRUCache
+from app.optimizer import ResourceOptimizer
+
+# Fixed canvas so base and overlay line up pixel for pixel
+FIGSIZE: Tuple[float, float] = (6.4, 7.2)
+DPI: int = 150
+AXES_RECT: Tuple[float, float, float, float] = (0.0, 0.0, 1.0, 6.4 / 7.2)
+RADIUS: float = 3
+
+SOURCE_COLOR: str = 'lightgreen'
+TARGET_COLOR: str = 'lightcoral'
+PATH_COLOR: str = 'yellow'
+SCHOOL_COLOR: str = 'lightblue'
+ROUTE_COLOR: str = 'red'
+
+# SVG geometry in points: the PNG figure is 6.4 x 7.2 in and the axes
+# square spans its full width, so one data unit is 460.8 / 8 points
+SVG_WIDTH: float = 460.8
+SVG_HEIGHT: float = 518.4
+SVG_SCALE: float = SVG_WIDTH / 8
+# Above this many schools the SVG base layer drops names and non-path IDs
+SVG_LABEL_LIMIT: int = 300
+
+# Rendered base layers keyed by (graph version, bidirectional, format)
+base_layers: LRUCache = LRUCache(maxsize=app.config.get('ROUTE_BASE_LAYER_CACHE_SIZE', 4))
+
+
+def circle_layout(school_ids: List[int]) -> Dict[int, Tuple[float, float]]:
+    """
+    Place schools evenly on a circle, in the given order.
+
+    Args:
+        school_ids (List[int]): School IDs, ascending
+
+    Returns:
+        Dict[int, Tuple[float, float]]: Position of each school
+    """
+    step: float = 2 * math.pi / max(len(school_ids), 1)
+    return {sid: (RADIUS * math.cos(i * step), RADIUS * math.sin(i * step)) for i, sid in enumerate(school_ids)}
+
+
+def _new_figure():
+    """
+    Black figure with the shared axes geometry (no pyplot, thread-safe).
+
+    Returns:
+        (fig, ax): Figure attached to an Agg canvas and its axes
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=FIGSIZE, dpi=DPI, facecolor='black')
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes(AXES_RECT)
+    ax.set_xlim(-4, 4)
+    ax.set_ylim(-4, 4)
+    ax.set_aspect('equal')
+    ax.axis('off')
+    return fig, ax
+
+
+def _draw_school(ax, position: Tuple[float, float], school_id: int, color: str) -> None:
+    """
+    Draw one school circle with its ID.
+
+    Args:
+        ax: Target axes
+        position (Tuple[float, float]): Circle center
+        school_id (int): School ID shown inside the circle
+        color (str): Fill color
+    """
+    from matplotlib.patches import Circle
+    x, y = position
+    ax.add_patch(Circle((x, y), 0.3, color=color, ec='white', linewidth=2))
+    ax.text(x, y, str(school_id), ha='center', va='center', fontweight='bold', fontsize=10)
+
+
+def base_layer(optimizer: ResourceOptimizer):
+    """
+    Rasterized base layer for the optimizer's graph version, cached.
+
+    Args:
+        optimizer (ResourceOptimizer): Optimizer with a loaded graph
+
+    Returns:
+        (positions, region): School positions and the rendered pixels as an
+        Agg buffer region, restored by route_png() instead of redrawing
+    """
+    key: Tuple[int, bool, str] = (optimizer.graph_version, optimizer.bidirectional, 'png')
+    layer = base_layers.get(key)
+    if layer is not None:
+        return layer
+
+    school_names: Dict[int, str] = optimizer.school_names
+    positions: Dict[int, Tuple[float, float]] = circle_layout(sorted(school_names))
+    fig, ax = _new_figure()
+    for school_id, (x, y) in positions.items():
+        _draw_school(ax, (x, y), school_id, SCHOOL_COLOR)
+        ax.text(x, y - 0.6, school_names[school_id][:15], ha='center', va='center', fontsize=8, color='white')
+    fig.canvas.draw()
+    layer = (positions, fig.canvas.copy_from_bbox(fig.bbox))
+    base_layers.put(key, layer)
+    return layer
+
+
+def route_png(optimizer: ResourceOptimizer, result: dict, source_id: int, target_id: int) -> bytes:
+    """
+    Render a found route as PNG: cached base layer plus the route overlay.
+
+    Args:
+        optimizer (ResourceOptimizer): Optimizer that produced result
+        result (dict): Successful find_optimal_path() result
+        source_id (int): Source school ID
+        target_id (int): Target school ID
+
+    Returns:
+        bytes: PNG image data
+    """
+    from matplotlib.lines import Line2D
+    from PIL import Image
+    positions, region = base_layer(optimizer)
+    path_ids: List[int] = result['path']
+    names: Dict[int, str] = optimizer.school_names
+
+    fig, ax = _new_figure()
+
+    # Recolor only the schools on the path
+    for school_id in path_ids:
+        if school_id == source_id:
+            color = SOURCE_COLOR
+        elif school_id == target_id:
+            color = TARGET_COLOR
+        else:
+            color = PATH_COLOR
+        _draw_school(ax, positions[school_id], school_id, color)
+
+    # Route arrows with costs from the optimizer graph
+    for from_id, to_id in zip(path_ids[:-1], path_ids[1:]):
+        x1, y1 = positions[from_id]
+        x2, y2 = positions[to_id]
+        ax.annotate('', xy=(x2, y2), xytext=(x1, y1),
+                    arrowprops=dict(arrowstyle='->', color=ROUTE_COLOR, lw=3))
+        ax.text((x1 + x2) / 2, (y1 + y2) / 2, f'${optimizer.graph[from_id][to_id]}', ha='center', va='center',
+                bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.8),
+                fontsize=9, fontweight='bold')
+
+    ax.set_title(f'Optimal Route: {names[source_id]} → {names[target_id]}\n'
+                 f'Total Cost: ${result["total_cost"]} | Transfers: {result["num_transfers"]}',
+                 color='white', fontsize=14, fontweight='bold', pad=12)
+    legend_elements = [
+        Line2D([0], [0], marker='o', color='w', markerfacecolor=SOURCE_COLOR, markersize=10, label='Source School'),
+        Line2D([0], [0], marker='o', color='w', markerfacecolor=TARGET_COLOR, markersize=10, label='Target School'),
+        Line2D([0], [0], marker='o', color='w', markerfacecolor=PATH_COLOR, markersize=10, label='Path Schools'),
+        Line2D([0], [0], color=ROUTE_COLOR, linewidth=3, label='Optimal Route')
+    ]
+    ax.legend(handles=legend_elements, loc='upper right',
+              facecolor='black', edgecolor='white', labelcolor='white')
+
+    # Blit: restore the base pixels, then draw only the axes children on top
+    # (the axes is off, so it paints no background of its own)
+    renderer = fig.canvas.get_renderer()
+    renderer.restore_region(region)
+    ax.draw(renderer)
+    width, height = renderer.get_canvas_width_height()
+    image = Image.frombuffer('RGBA', (int(width), int(height)), renderer.buffer_rgba(), 'raw', 'RGBA', 0, 1)
+    buffer: BytesIO = BytesIO()
+    image.convert('RGB').save(buffer, format='png')
+    return buffer.getvalue()
+
+
+def _svg_point(position: Tuple[float, float]) -> Tuple[float, float]:
+    """
+    Convert data coordinates (axes -4..4) to SVG points.
+
+    Args:
+        position (Tuple[float, float]): Data coordinates
+
+    Returns:
+        Tuple[float, float]: SVG x, y (y grows downwards)
+    """
+    x, y = position
+    return (x + 4) * SVG_SCALE, SVG_HEIGHT - (y + 4) * SVG_SCALE
+
+
+def _svg_school(position: Tuple[float, float], school_id: int, color: str, radius: float, label: bool) -> str:
+    """
+    SVG markup of one school circle, optionally with its ID.
+
+    Args:
+        position (Tuple[float, float]): Circle center in data coordinates
+        school_id (int): School ID
+        color (str): Fill color
+        radius (float): Circle radius in data units
+        label (bool): Whether to print the ID inside
+
+    Returns:
+        str: SVG elements
+    """
+    x, y = _svg_point(position)
+    markup: str = f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius * SVG_SCALE:.1f}" fill="{color}"/>'
+    if label:
+        markup += f'<text x="{x:.1f}" y="{y:.1f}" class="id">{school_id}</text>'
+    return markup
+
+
+def _svg_radius(num_schools: int) -> float:
+    """
+    Circle radius that keeps neighbouring schools apart on the layout.
+
+    Args:
+        num_schools (int): Number of schools
+
+    Returns:
+        float: Radius in data units (0.3 for small districts, like the PNG)
+    """
+    return min(0.3, 0.45 * math.pi * RADIUS / max(num_schools, 1))
+
+
+def svg_base_layer(optimizer: ResourceOptimizer) -> Tuple[Dict[int, Tuple[float, float]], str]:
+    """
+    SVG markup of every school for the optimizer's graph version, cached.
+
+    Args:
+        optimizer (ResourceOptimizer): Optimizer with a loaded graph
+
+    Returns:
+        (positions, markup): School positions and the base layer SVG elements
+    """
+    key: Tuple[int, bool, str] = (optimizer.graph_version, optimizer.bidirectional, 'svg')
+    layer = base_layers.get(key)
+    if layer is not None:
+        return layer
+
+    school_names: Dict[int, str] = optimizer.school_names
+    positions: Dict[int, Tuple[float, float]] = circle_layout(sorted(school_names))
+    labels: bool = len(positions) <= SVG_LABEL_LIMIT
+    radius: float = _svg_radius(len(positions))
+    parts: List[str] = ['<g class="schools">']
+    for school_id, position in positions.items():
+        parts.append(_svg_school(position, school_id, SCHOOL_COLOR, radius, labels))
+        if labels:
+            x, y = _svg_point((position[0], position[1] - 0.6))
+            parts.append(f'<text x="{x:.1f}" y="{y:.1f}" class="name">{escape(school_names[school_id][:15])}</text>')
+    parts.append('</g>')
+    layer = (positions, ''.join(parts))
+    base_layers.put(key, layer)
+    return layer
+
+
+def route_svg(optimizer: ResourceOptimizer, result: dict, source_id: int, target_id: int) -> str:
+    """
+    Render a found route as SVG with the same colors and legend as the PNG.
+
+    Args:
+        optimizer (ResourceOptimizer): Optimizer that produced result
+        result (dict): Successful find_optimal_path() result
+        source_id (int): Source school ID
+        target_id (int): Target school ID
+
+    Returns:
+        str: SVG document
+    """
+    positions, base = svg_base_layer(optimizer)
+    path_ids: List[int] = result['path']
+    names: Dict[int, str] = optimizer.school_names
+    radius: float = _svg_radius(len(positions))
+
+    parts: List[str] = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {SVG_WIDTH} {SVG_HEIGHT}" '
+        f'width="{SVG_WIDTH}pt" height="{SVG_HEIGHT}pt" font-family="DejaVu Sans, sans-serif">',
+        '<style>'
+        f'circle{{stroke:white;stroke-width:{min(2.0, radius * SVG_SCALE / 8):.2f}}}'
+        '.legend circle{stroke-width:1}'
+        'text{text-anchor:middle;dominant-baseline:central}'
+        '.id{font-size:10px;font-weight:bold}'
+        '.name{font-size:8px;fill:white}'
+        '.cost{font-size:9px;font-weight:bold}'
+        '.title{font-size:14px;font-weight:bold;fill:white}'
+        '.legend text{font-size:10px;fill:white;text-anchor:start}'
+        '</style>',
+        f'<defs><marker id="head" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="4" markerHeight="4" orient="auto">'
+        f'<path d="M0,0L10,5L0,10" fill="none" stroke="{ROUTE_COLOR}" stroke-width="2"/></marker></defs>',
+        f'<rect width="100%" height="100%" fill="black"/>',
+        base,
+    ]
+
+    # Overlay: path schools, route arrows and costs from the optimizer graph
+    for school_id in path_ids:
+        if school_id == source_id:
+            color = SOURCE_COLOR
+        elif school_id == target_id:
+            color = TARGET_COLOR
+        else:
+            color = PATH_COLOR
+        parts.append(_svg_school(positions[school_id], school_id, color, radius, True))
+    for from_id, to_id in zip(path_ids[:-1], path_ids[1:]):
+        x1, y1 = _svg_point(positions[from_id])
+        x2, y2 = _svg_point(positions[to_id])
+        parts.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" stroke="{ROUTE_COLOR}" '
+                     f'stroke-width="3" marker-end="url(#head)"/>')
+    for from_id, to_id in zip(path_ids[:-1], path_ids[1:]):
+        x1, y1 = _svg_point(positions[from_id])
+        x2, y2 = _svg_point(positions[to_id])
+        label: str = f'${optimizer.graph[from_id][to_id]}'
+        width: float = 6.0 * len(label) + 6
+        mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
+        parts.append(f'<rect x="{mid_x - width / 2:.1f}" y="{mid_y - 8:.1f}" width="{width:.1f}" height="16" rx="3" '
+                     f'fill="yellow" fill-opacity="0.8"/>'
+                     f'<text x="{mid_x:.1f}" y="{mid_y:.1f}" class="cost">{escape(label)}</text>')
+
+    parts.append(f'<text x="{SVG_WIDTH / 2}" y="16" class="title">'
+                 f'Optimal Route: {escape(names[source_id])} → {escape(names[target_id])}</text>')
+    parts.append(f'<text x="{SVG_WIDTH / 2}" y="34" class="title">'
+                 f'Total Cost: ${result["total_cost"]} | Transfers: {result["num_transfers"]}</text>')
+
+    entries: List[Tuple[str, str]] = [(SOURCE_COLOR, 'Source School'), (TARGET_COLOR, 'Target School'),
+                                      (PATH_COLOR, 'Path Schools'), (ROUTE_COLOR, 'Optimal Route')]
+    left: float = round(SVG_WIDTH - 112, 1)
+    top: float = round(SVG_HEIGHT - SVG_WIDTH + 4, 1)
+    parts.append(f'<g class="legend"><rect x="{left}" y="{top}" width="108" height="66" rx="3" '
+                 f'fill="black" stroke="white"/>')
+    for i, (color, text) in enumerate(entries):
+        y: float = round(top + 11 + i * 15, 1)
+        if text == 'Optimal Route':
+            parts.append(f'<line x1="{left + 6}" y1="{y}" x2="{left + 24}" y2="{y}" stroke="{color}" stroke-width="3"/>')
+        else:
+            parts.append(f'<circle cx="{left + 15}" cy="{y}" r="4.5" fill="{color}"/>')
+        parts.append(f'<text x="{left + 30}" y="{y}">{text}</text>')
+    parts.append('</g></svg>')
+    return ''.join(parts)
@@ -1,14 +1,35 @@
-from app import app, db, sp
+from app import app, db, sp, render, warmup, passwords, bulk_import, bulk_export, changelog
 from app.models import User, School, TransportationCost
 from app.forms import SignUpForm, LoginForm, SchoolCreateForm, SchoolUpdateForm, SchoolDeleteForm, TransportationCostForm, OptimizationForm
-from flask import render_template, redirect, url_for, request, flash, send_from_directory, send_file, Response
+from flask import render_template, redirect, url_for, request, flash, send_from_directory, send_file, Response, jsonify, stream_with_context, stream_template
 from flask_login import login_required, login_user, logout_user
-from app.optimizer import ResourceOptimizer
-import bcrypt
+from app.optimizer import ResourceOptimizer, graph_cache, refresh_hierarchies
+from app.matrix import FORMATS, MIMETYPES, matrix_lines
+from app.image_cache import ImageCache, route_images
+from app.passwords import PasswordHashingBusy
+from app.pagination import Page, keyset_page, page_size
+from app.choices import school_choices
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import joinedload
+from werkzeug.http import is_resource_modified
+from datetime import datetime, timezone
+import csv
+import io
+import json
+import os
+import uuid
 import sys  # Dijkstra's algorithm implementation using a priority queue
 from heapq import heappush, heappop
 import tempfile
 
+# Sort orders of the school listing; each ends with the primary key and is index-backed
+SCHOOL_SORTS: dict = {
+    'id': [School.id],
+    'name': [School.name, School.id],
+}
+# Rows fetched per batch when streaming a full listing
+EXPORT_BATCH_SIZE: int = 500
+
 @app.route('/')
 @app.route('/index')
 @app.route('/index.html')
@@ -41,9 +62,12 @@ def signup() -> str:
             form.passwd_confirm.errors.append('Passwords do not match.')
         # If no errors, create the user
         else:
-            # Salt/Hash password
-            salt: bytes = bcrypt.gensalt()
-            hashed: bytes = bcrypt.hashpw(form.passwd.data.encode('utf-8'), salt)
+            # Salt/Hash password (off the request thread, may be refused when busy)
+            try:
+                hashed: bytes = passwords.hash_password(form.passwd.data)
+            except PasswordHashingBusy:
+                form.passwd.errors.append('The server is busy, please try again in a moment.')
+                return render_template('signup.html', form=form), 503, {'Retry-After': '1'}
             user: User = User(
                 id=form.id.data,
                 name=form.name.data,
@@ -72,7 +96,20 @@ def login() -> str:
         # Check for user in database
         user: User = db.session.query(User).filter_by(id=form.id.data).first()
         # If user exists and password is correct (checked with bcrypt), log the user in
-        if user and bcrypt.checkpw(form.passwd.data.encode('utf-8'), user.passwd):
+        try:
+            valid: bool = bool(user) and passwords.check_password(form.passwd.data, user.passwd)
+        except PasswordHashingBusy:
+            form.id.errors.append('The server is busy, please try again in a moment.')
+            return render_template('login.html', form=form), 503, {'Retry-After': '1'}
+        if valid and passwords.needs_rehash(user.passwd):
+            # Work factor changed since this hash was stored; if busy, retry on a later login
+            try:
+                user.passwd = passwords.hash_password(form.passwd.data)
+                db.session.commit()
+                passwords.counters['rehashed'] += 1
+            except PasswordHashingBusy:
+                pass
+        if valid:
             login_user(user)
             # Upon successful login, flash success message
             flash('Logged in successfully.')
@@ -104,13 +141,39 @@ def signout() -> Response:
 @login_required
 def list_schools() -> str: 
     """
-    Display list of all schools in the system.
+    Display one page of the schools in the system.
+
+    Pages are keyset-paginated (?after= / ?before= cursors, ?limit=,
+    SCHOOLS_PAGE_SIZE) in ?sort=id (default) or ?sort=name order, so each
+    page costs the same whatever the number of schools.
     
     Returns:
         str: Rendered schools.html template with schools data
     """
-    schools: list[School] = db.session.query(School).all()
-    return render_template('schools.html', schools=schools)
+    sort: str = request.args.get('sort', 'id')
+    if sort not in SCHOOL_SORTS:
+        return Response('sort must be one of: ' + ', '.join(SCHOOL_SORTS), status=400)
+    page: Page = keyset_page(db.session.query(School), SCHOOL_SORTS[sort], page_size('SCHOOLS_PAGE_SIZE'),
+                             after=request.args.get('after'), before=request.args.get('before'))
+    return render_template('schools.html', schools=page.items, page=page, sort=sort)
+
+@app.route('/schools/export')
+@login_required
+def export_schools() -> Response:
+    """
+    Full school listing as one printable page, streamed while it renders.
+
+    Rows are fetched in batches and the template is rendered with
+    stream_template, so memory stays flat for any number of schools.
+
+    Returns:
+        Response: Streamed HTML table of every school in ?sort= order
+    """
+    sort: str = request.args.get('sort', 'id')
+    if sort not in SCHOOL_SORTS:
+        return Response('sort must be one of: ' + ', '.join(SCHOOL_SORTS), status=400)
+    schools = db.session.query(School).order_by(*SCHOOL_SORTS[sort]).yield_per(EXPORT_BATCH_SIZE)
+    return Response(stream_template('schools_export.html', schools=schools, sort=sort))
 
 @login_required
 @app.route('/schools/create', methods=['GET', 'POST'])
@@ -131,6 +194,7 @@ def create_school() -> str:
         )
         db.session.add(school)
         db.session.commit()
+        graph_cache.invalidate()
         return redirect(url_for('list_schools'))
     return render_template('schools/create.html', form=form)
 
@@ -160,6 +224,7 @@ def update_school(id: int) -> str:
         school.status = form.status.data
         try:
             db.session.commit()
+            graph_cache.invalidate()
             flash('School updated successfully.')
             return redirect(url_for('list_schools'))
         except Exception as e:
@@ -185,6 +250,7 @@ def delete_school(id: int) -> Response:
     try:
         db.session.delete(school)
         db.session.commit()
+        graph_cache.invalidate()
         flash('School deleted.')
     except Exception as e:
         db.session.rollback()
@@ -205,10 +271,17 @@ def school_costs(id: int) -> str:
         str: Rendered costs template
     """
     from_school: School = db.session.query(School).get_or_404(id)
-    existing_costs: list[TransportationCost] = db.session.query(TransportationCost).filter_by(from_school_id=id).all()
-    
-    # Get all schools for the dropdown choices
-    schools: list[School] = db.session.query(School).all()
+    # One keyset page of outbound costs, ordered by destination (primary key order),
+    # with both schools joined in the same query instead of lazy-loaded per row
+    costs_query = db.session.query(TransportationCost).filter_by(from_school_id=id).options(
+        joinedload(TransportationCost.from_school), joinedload(TransportationCost.to_school))
+    page: Page = keyset_page(costs_query,
+                             [TransportationCost.to_school_id], page_size('COSTS_PAGE_SIZE'),
+                             after=request.args.get('after'), before=request.args.get('before'))
+    existing_costs: list[TransportationCost] = page.items
+    
+    # (id, name) of all schools for the dropdowns, cached per graph version
+    schools: list[tuple] = school_choices()
     
     # Check if we have at least 2 schools
     if len(schools) < 2:
@@ -218,8 +291,8 @@ def school_costs(id: int) -> str:
     form: TransportationCostForm = TransportationCostForm()
     
     # Set up dropdown choices
-    form.from_school_id.choices = [(school.id, school.name) for school in schools]
-    form.to_school.choices = [(school.id, school.name) for school in schools if school.id != id]  # Exclude current school
+    form.from_school_id.choices = schools
+    form.to_school.choices = [choice for choice in schools if choice[0] != id]  # Exclude current school
     
     # Set the from_school to current school
     form.from_school_id.data = id
@@ -229,7 +302,7 @@ def school_costs(id: int) -> str:
         
         if to_school_id == id:
             flash('Cannot set cost to the same school.')
-            return render_template('costs.html', form=form, from_school=from_school, existing_costs=existing_costs, schools=schools)
+            return render_template('costs.html', form=form, from_school=from_school, existing_costs=existing_costs, schools=schools, page=page)
             
         existing_cost: TransportationCost = db.session.query(TransportationCost).filter_by(from_school_id=id, to_school_id=to_school_id).first()
         if existing_cost:
@@ -239,9 +312,25 @@ def school_costs(id: int) -> str:
             db.session.add(TransportationCost(from_school_id=id, to_school_id=to_school_id, cost=form.cost.data))
             flash('Transportation cost added.')
         db.session.commit()
+        # Patch the cached graph and repair cached trees instead of dropping them
+        graph_cache.apply_edge_change(id, to_school_id, form.cost.data)
+        refresh_hierarchies()
         return redirect(url_for('school_costs', id=id))
         
-    return render_template('costs.html', form=form, from_school=from_school, existing_costs=existing_costs, schools=schools)
+    return render_template('costs.html', form=form, from_school=from_school, existing_costs=existing_costs, schools=schools, page=page)
+
+@app.route('/ready')
+def ready() -> Response:
+    """
+    Readiness probe: warm imports, templates and the graph, then report.
+
+    The first call in a worker does the warm-up (normally already done by
+    the gunicorn hooks), later calls only return the recorded timings.
+
+    Returns:
+        Response: JSON with ready flag and seconds spent per warm-up step
+    """
+    return jsonify({'ready': True, 'timings': warmup.warm_up()})
 
 @app.route('/download/requirements')
 def download_requirements() -> Response:
@@ -268,148 +357,305 @@ def school_routes(id: int) -> str:
         str: Rendered optimizer template with route results
     """
     form: OptimizationForm = OptimizationForm() 
-    schools: list[School] = School.query.order_by(School.name).all() 
-    form.target_school_id.choices = [(s.id, s.name) for s in schools if s.id != id] 
+    form.target_school_id.choices = [choice for choice in school_choices('name') if choice[0] != id]
 
     if request.method == 'POST' and form.validate_on_submit(): 
         optimizer: ResourceOptimizer = ResourceOptimizer(bidirectional=True)
         result: dict = optimizer.find_optimal_path(id, form.target_school_id.data)
+        # Ranked alternatives share the optimizer's cached graph
+        alternatives: dict = None
+        if result.get('success') and (form.alternatives.data or 1) > 1:
+            alternatives = optimizer.find_alternative_paths(id, form.target_school_id.data, form.alternatives.data)
         # Pass target_school_id to template for graph
         return render_template(
             'optimizer.html',
             form=None,
             result=result,
+            alternatives=alternatives,
             source_id=id,
             target_id=form.target_school_id.data  # Pass target_id for selected route
         )
     return render_template('optimizer.html', form=form, result=None, source_id=id, target_id=None)
 
+@app.route('/api/routes', methods=['POST'])
+@login_required
+def batch_routes() -> Response:
+    """
+    Find optimal routes for many (source, target) pairs in one request.
+
+    Expects a JSON body like {"pairs": [[1, 2], [1, 3]], "bidirectional": true}
+    (pairs may also be {"source_id": .., "target_id": ..} objects). Pairs are
+    grouped by source, so each distinct source is searched once. With
+    ?format=ndjson the results are streamed one JSON line per pair as each
+    source finishes (in source order, each line carries its 'index' in pairs);
+    otherwise a single JSON document lists them in request order.
+
+    Returns:
+        Response: JSON results, NDJSON stream, or a JSON error with status 400
+    """
+    payload = request.get_json(silent=True)
+    raw_pairs = payload.get('pairs') if isinstance(payload, dict) else None
+    if not isinstance(raw_pairs, list):
+        return jsonify({'error': 'JSON body with a "pairs" list is required.'}), 400
+    max_pairs: int = app.config.get('ROUTE_BATCH_MAX_PAIRS', 10000)
+    if len(raw_pairs) > max_pairs:
+        return jsonify({'error': f'At most {max_pairs} pairs per request.'}), 400
+
+    pairs: list[tuple[int, int]] = []
+    for position, pair in enumerate(raw_pairs):
+        if isinstance(pair, dict):
+            pair = (pair.get('source_id'), pair.get('target_id'))
+        if not isinstance(pair, (list, tuple)) or len(pair) != 2 or not all(type(sid) is int for sid in pair):
+            return jsonify({'error': f'Pair {position} must be two integer school IDs.'}), 400
+        pairs.append((pair[0], pair[1]))
+
+    optimizer: ResourceOptimizer = ResourceOptimizer(bidirectional=bool(payload.get('bidirectional', True)))
+    if request.args.get('format') == 'ndjson':
+        # Load the graph now, while the request context is still set up
+        optimizer.load_graph()
+        lines = (json.dumps(result) + '\n' for result in optimizer.find_paths(pairs))
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+    results: list[dict] = sorted(optimizer.find_paths(pairs), key=lambda result: result['index'])
+    return jsonify({'results': results, 'sources': len({source for source, _ in pairs})})
+
+@app.route('/api/routes/alternatives', methods=['GET'])
+@login_required
+def alternative_routes() -> Response:
+    """
+    Ranked alternative routes between two schools (k-shortest loopless paths).
+
+    Query parameters: source_id, target_id and k (default 3).
+
+    Returns:
+        Response: JSON result of ResourceOptimizer.find_alternative_paths(),
+        status 400 if parameters are missing or no route exists
+    """
+    source_id: int = request.args.get('source_id', type=int)
+    target_id: int = request.args.get('target_id', type=int)
+    k: int = request.args.get('k', default=3, type=int)
+    if source_id is None or target_id is None:
+        return jsonify({'success': False, 'message': 'source_id and target_id parameters are required'}), 400
+    optimizer: ResourceOptimizer = ResourceOptimizer(bidirectional=request.args.get('bidirectional', '1') != '0')
+    result: dict = optimizer.find_alternative_paths(source_id, target_id, k)
+    return jsonify(result), (200 if result['success'] else 400)
+
+@app.route('/api/import/<kind>', methods=['POST'])
+@login_required
+def import_data(kind: str) -> Response:
+    """
+    Bulk upsert schools or costs from an uploaded CSV/JSONL file.
+
+    The file is sent as multipart field "file" or as the raw request body;
+    ?format=csv|jsonl (default: from the file name, else csv). Rows are
+    read and written in batches as they stream in (see bulk_import.py).
+    Rejected rows go to a reject file that can be downloaded from
+    rejects_url.
+
+    Args:
+        kind (str): 'schools' or 'costs'
+
+    Returns:
+        Response: JSON summary (read, imported, rejected, batches, first rejects)
+    """
+    if kind not in bulk_import.KINDS:
+        return jsonify({'error': f'kind must be one of: {", ".join(bulk_import.KINDS)}'}), 404
+    upload = request.files.get('file')
+    filename: str = upload.filename if upload else ''
+    fmt: str = request.args.get('format') or ('jsonl' if filename.endswith(('.jsonl', '.ndjson')) else 'csv')
+    if fmt not in bulk_import.FORMATS:
+        return jsonify({'error': f'format must be one of: {", ".join(bulk_import.FORMATS)}'}), 400
+    stream = io.TextIOWrapper(upload.stream if upload else request.stream, encoding='utf-8', newline='')
+
+    rejects_dir: str = os.path.join(app.instance_path, 'import-rejects')
+    os.makedirs(rejects_dir, exist_ok=True)
+    rejects_name: str = f'{kind}-{uuid.uuid4().hex}.{fmt}'
+    rejects_path: str = os.path.join(rejects_dir, rejects_name)
+    with open(rejects_path, 'w', encoding='utf-8', newline='') as rejects_file:
+        rejects: bulk_import.RejectWriter = bulk_import.RejectWriter(rejects_file, fmt)
+        try:
+            summary: dict = bulk_import.import_rows(kind, stream, fmt, rejects)
+        except Exception as e:
+            rejects_file.close()
+            os.remove(rejects_path)
+            if isinstance(e, UnicodeDecodeError):
+                return jsonify({'error': 'File must be UTF-8 text (rows before the bad byte were imported).'}), 400
+            if isinstance(e, csv.Error):
+                return jsonify({'error': f'Malformed CSV: {e} (rows before it were imported).'}), 400
+            raise
+        finally:
+            stream.detach()
+    if kind == 'costs' and summary['imported']:
+        refresh_hierarchies()
+    if rejects.count:
+        summary['rejects_url'] = url_for('import_rejects', name=rejects_name)
+        summary['first_rejects'] = rejects.samples
+    else:
+        os.remove(rejects_path)
+    return jsonify(summary)
+
+@app.route('/api/import/rejects/<name>', methods=['GET'])
+@login_required
+def import_rejects(name: str) -> Response:
+    """
+    Download a reject file written by import_data().
+
+    Args:
+        name (str): File name from rejects_url
+
+    Returns:
+        Response: The reject file
+    """
+    return send_from_directory(os.path.join(app.instance_path, 'import-rejects'), name, as_attachment=True)
+
+@app.route('/api/export/<kind>', methods=['GET'])
+@login_required
+def export_data(kind: str) -> Response:
+    """
+    Stream the schools or transportation costs table as a download.
+
+    ?format=csv (default), jsonl, or bin for the binary edge list (costs
+    only; it also carries school IDs and names). Rows are written as they
+    come off the cursor, see bulk_export.py.
+
+    Args:
+        kind (str): 'schools' or 'costs'
+
+    Returns:
+        Response: Streamed file
+    """
+    if kind not in bulk_export.KINDS:
+        return jsonify({'error': f'kind must be one of: {", ".join(bulk_export.KINDS)}'}), 404
+    fmt: str = request.args.get('format', 'csv')
+    if fmt not in bulk_export.FORMATS or (fmt == 'bin' and kind != 'costs'):
+        return jsonify({'error': 'format must be csv or jsonl (bin: costs only)'}), 400
+    filename: str = f"{kind}.{'clel' if fmt == 'bin' else fmt}"
+    return Response(bulk_export.export_chunks(db.engine, kind, fmt), mimetype=bulk_export.MIMETYPES[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
+
+@app.route('/api/changes', methods=['GET'])
+@login_required
+def graph_changes() -> Response:
+    """
+    Current change log version and, with ?since=, the changes after it.
+
+    Changes come oldest first, at most ?limit= (default
+    CHANGE_LOG_PAGE_SIZE, 1000, up to 10000) per call; when "more" is
+    true, ask again with since set to the last change's version. If the
+    log was pruned past since, the answer is 410 and the caller must
+    reload the tables.
+
+    Returns:
+        Response: JSON {"version", "changes", "more"}, status 410 if since is too old,
+        503 if the change log migration was not applied
+    """
+    since: int = request.args.get('since', type=int)
+    limit: int = max(1, min(request.args.get('limit', default=app.config.get('CHANGE_LOG_PAGE_SIZE', 1000), type=int),
+                            10000))
+    try:
+        with db.engine.connect() as connection:
+            version: int = changelog.current_version(connection)
+            if since is None:
+                return jsonify({'version': version})
+            changes: list = changelog.changes_since(connection, since, limit)
+    except OperationalError:
+        return jsonify({'error': 'Change log missing, run `flask migrate`.'}), 503
+    if changes is None:
+        return jsonify({'error': 'Changes after since were pruned; reload the tables.', 'version': version}), 410
+    more: bool = len(changes) == limit and changes[-1].version < version
+    return jsonify({'version': version, 'changes': [change._asdict() for change in changes], 'more': more})
+
+@app.route('/api/distances', methods=['GET'])
+@login_required
+def distance_matrix() -> Response:
+    """
+    Stream a source x target cost matrix, one search per source.
+
+    Query parameters: source_id and target_id (repeatable, default all
+    schools), format ('csv' or 'ndjson', default csv) and bidirectional
+    (default 1). Rows are generated while the response is sent.
+
+    Returns:
+        Response: Streamed CSV or NDJSON, status 400 for an unknown format
+    """
+    fmt: str = request.args.get('format', 'csv')
+    if fmt not in FORMATS:
+        return jsonify({'error': f'format must be one of {", ".join(FORMATS)}'}), 400
+    source_ids: list[int] = request.args.getlist('source_id', type=int) or None
+    target_ids: list[int] = request.args.getlist('target_id', type=int) or None
+    optimizer: ResourceOptimizer = ResourceOptimizer(bidirectional=request.args.get('bidirectional', '1') != '0')
+    # Load the graph now, while the request context is still set up
+    optimizer.load_graph()
+    lines = matrix_lines(optimizer, source_ids, target_ids, fmt)
+    return Response(stream_with_context(lines), mimetype=MIMETYPES[fmt],
+                    headers={'Content-Disposition': f'attachment; filename=distances.{fmt}'})
+
 @app.route('/schools/<int:id>/routes/visual', methods=['GET'])
 @login_required
 def school_routes_visual(id: int) -> Response:
     """
-    Generate visual graph showing optimal route between schools.
-    Uses pure Python (matplotlib) instead of Graphviz for deployment compatibility.
+    Serve the route graph image, rendering it only when not cached.
+
+    ?format=svg returns an SVG drawn without matplotlib (default png).
+    Images are cached per graph version, source, target and render options
+    (see image_cache.route_images). The response carries an ETag and
+    Last-Modified (the graph version time), and conditional requests for an
+    unchanged graph are answered with 304 before anything is computed.
     
     Args:
         id (int): Source school ID
         
     Returns:
-        Response: PNG image file of the route graph
+        Response: PNG or SVG image of the route graph, or 304 Not Modified
     """
-    try:
-        import matplotlib
-        matplotlib.use('Agg')  # Use non-GUI backend
-        import matplotlib.pyplot as plt
-        import matplotlib.patches as patches
-        import numpy as np
-        from io import BytesIO
-    except ImportError:
-        return Response('Visualization requires matplotlib. Please install: pip install matplotlib', 
-                       status=500, mimetype='text/plain')
-    
-    # Query all schools
-    schools: list[School] = School.query.order_by(School.id).all()
-    school_dict: dict[int, str] = {s.id: s.name for s in schools}
-    
     target_id: int = request.args.get('target_id', type=int)
     if not target_id:
         return Response('target_id parameter is required', status=400, mimetype='text/plain')
+    fmt: str = request.args.get('format', 'png')
+    if fmt not in ('png', 'svg'):
+        return Response('format must be png or svg', status=400, mimetype='text/plain')
+
+    version: int = graph_cache.version()
+    etag: str = ImageCache.key(version, id, target_id, format=fmt, dpi=150, bidirectional=True)
+    last_modified: datetime = datetime.fromtimestamp(version // 1_000_000_000, tz=timezone.utc)
+    if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+        response: Response = Response(status=304)
+    else:
+        image_bytes = route_images.get(etag)
+        if image_bytes is None:
+            image_bytes = render_route_image(id, target_id, fmt)
+            if isinstance(image_bytes, Response):
+                return image_bytes
+            route_images.put(etag, image_bytes)
+        response = Response(image_bytes, mimetype='image/svg+xml' if fmt == 'svg' else 'image/png')
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    # Let browsers keep the image but revalidate it, a 304 is cheap
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    return response
+
+def render_route_image(id: int, target_id: int, fmt: str):
+    """
+    Compute a route and draw it over the cached base layer (see render.py).
     
-    # Calculate optimal path
+    Args:
+        id (int): Source school ID
+        target_id (int): Target school ID
+        fmt (str): 'png' (matplotlib) or 'svg' (standard library only)
+        
+    Returns:
+        bytes: Image data, or a plain-text error Response
+    """
     optimizer: ResourceOptimizer = ResourceOptimizer(bidirectional=True)
     result: dict = optimizer.find_optimal_path(id, target_id)
-    
     if not result.get('success'):
         return Response(f'Route calculation failed: {result.get("message", "Unknown error")}', 
                        status=400, mimetype='text/plain')
-    
-    path_ids: list[int] = result['path']
-    
-    # Create visualization
-    fig, ax = plt.subplots(figsize=(12, 8))
-    fig.patch.set_facecolor('black')
-    ax.set_facecolor('black')
-    
-    # Position schools in a circle for better visualization
-    num_schools = len(schools)
-    angles = np.linspace(0, 2 * np.pi, num_schools, endpoint=False)
-    radius = 3
-    
-    school_positions = {}
-    for i, school in enumerate(schools):
-        x = radius * np.cos(angles[i])
-        y = radius * np.sin(angles[i])
-        school_positions[school.id] = (x, y)
-    
-    # Draw all schools as nodes
-    for school in schools:
-        x, y = school_positions[school.id]
-        if school.id == id:
-            color = 'lightgreen'  # Source school
-        elif school.id == target_id:
-            color = 'lightcoral'  # Target school
-        elif school.id in path_ids:
-            color = 'yellow'  # Schools in path
-        else:
-            color = 'lightblue'  # Other schools
-            
-        circle = plt.Circle((x, y), 0.3, color=color, ec='white', linewidth=2)
-        ax.add_patch(circle)
-        ax.text(x, y, str(school.id), ha='center', va='center', fontweight='bold', fontsize=10)
-        ax.text(x, y-0.6, school.name[:15], ha='center', va='center', fontsize=8, color='white')
-    
-    # Draw the optimal path
-    for i in range(len(path_ids) - 1):
-        from_id = path_ids[i]
-        to_id = path_ids[i + 1]
-        
-        x1, y1 = school_positions[from_id]
-        x2, y2 = school_positions[to_id]
-        
-        # Draw arrow
-        ax.annotate('', xy=(x2, y2), xytext=(x1, y1),
-                   arrowprops=dict(arrowstyle='->', color='red', lw=3))
-        
-        # Add cost label
-        cost_obj: TransportationCost = TransportationCost.query.filter_by(
-            from_school_id=from_id, to_school_id=to_id).first()
-        cost = cost_obj.cost if cost_obj else 0
-        
-        mid_x, mid_y = (x1 + x2) / 2, (y1 + y2) / 2
-        ax.text(mid_x, mid_y, f'${cost}', ha='center', va='center', 
-               bbox=dict(boxstyle='round,pad=0.3', facecolor='yellow', alpha=0.8),
-               fontsize=9, fontweight='bold')
-    
-    # Set title and formatting
-    ax.set_title(f'Optimal Route: {school_dict[id]} → {school_dict[target_id]}\n'
-                f'Total Cost: ${result["total_cost"]} | Transfers: {result["num_transfers"]}',
-                color='white', fontsize=14, fontweight='bold', pad=20)
-    
-    ax.set_xlim(-4, 4)
-    ax.set_ylim(-4, 4)
-    ax.set_aspect('equal')
-    ax.axis('off')
-    
-    # Add legend
-    legend_elements = [
-        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='lightgreen', 
-                  markersize=10, label='Source School'),
-        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='lightcoral', 
-                  markersize=10, label='Target School'),
-        plt.Line2D([0], [0], marker='o', color='w', markerfacecolor='yellow', 
-                  markersize=10, label='Path Schools'),
-        plt.Line2D([0], [0], color='red', linewidth=3, label='Optimal Route')
-    ]
-    ax.legend(handles=legend_elements, loc='upper right', 
-             facecolor='black', edgecolor='white', labelcolor='white')
-    
-    # Save to bytes
-    img_buffer = BytesIO()
-    plt.savefig(img_buffer, format='png', facecolor='black', 
-               bbox_inches='tight', dpi=150)
-    img_buffer.seek(0)
-    png_bytes = img_buffer.getvalue()
-    plt.close()
-    
-    return Response(png_bytes, mimetype='image/png')
+    if fmt == 'svg':
+        return render.route_svg(optimizer, result, id, target_id).encode('utf-8')
+    try:
+        return render.route_png(optimizer, result, id, target_id)
+    except ImportError:
+        return Response('Visualization requires matplotlib. Please install: pip install matplotlib', 
+                       status=500, mimetype='text/plain')
@@ -0,0 +1,342 @@
+"""
+Immutable graph snapshots shared by every gunicorn worker through mmap.
+
+Without a snapshot each worker builds its own adjacency dict from the
+database, so memory grows with workers x graph size. Instead, the first
+worker to need a graph version writes the CSR arrays and school names to
+one file in the instance folder; every worker then maps that file
+read-only and wraps zero-copy memoryviews of it in a CSRGraph. The pages
+live once in the OS page cache however many workers map them.
+
+File layout (native little-endian, every section padded to 8 bytes):
+
+    header   b'CLGS', uint16 format, uint16 flags (bit 0: bidirectional),
+             int64 graph version, int64 schools (n), int64 edges (m),
+             int64 name bytes
+    ids           n     int64   school ID of each dense index, ascending
+    offsets       n + 1 int64   row starts in targets/weights
+    targets       m     int32   dense index of each edge's destination
+    weights       m     int32   cost of each edge
+    name offsets  n + 1 int64   start of each school's name in the blob
+    names         UTF-8 school names back to back
+
+A new version is written to a temp file and renamed over the old one, so
+readers only ever see complete files, and workers still mapping the old
+file keep it until they move on.
+"""
+import contextlib
+import fcntl
+import mmap
+import operator
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterator, List, Mapping, Optional
+
+from app import app
+from app.csr import CSRGraph
+
+MAGIC: bytes = b'CLGS'
+FORMAT: int = 1
+HEADER: struct.Struct = struct.Struct('<4sHHqqqq')
+BIDIRECTIONAL: int = 1
+
+
+def path_for(bidirectional: bool) -> str:
+    """
+    Snapshot file of one graph flavour.
+
+    Args:
+        bidirectional (bool): Whether the graph has reverse edges added
+
+    Returns:
+        str: Path in the instance folder
+    """
+    return os.path.join(app.instance_path, f'graph-{"bi" if bidirectional else "uni"}.snap')
+
+
+def _padded(size: int) -> int:
+    """
+    Round a section size up to a multiple of 8 bytes.
+    """
+    return (size + 7) & ~7
+
+
+class SortedIndex(Mapping):
+    """
+    School ID -> dense index by binary search over the mapped, ascending IDs.
+
+    Stands in for the dict CSRGraph normally builds, which would cost every
+    worker a private object per school.
+    """
+    def __init__(self, ids: memoryview) -> None:
+        """
+        Wrap the ID section.
+
+        Args:
+            ids (memoryview): Ascending school IDs (int64)
+        """
+        self.ids: memoryview = ids
+
+    def __getitem__(self, school_id: int) -> int:
+        ids: memoryview = self.ids
+        try:
+            key: int = operator.index(school_id)
+        except TypeError:
+            raise KeyError(school_id) from None
+        # IDs without gaps (the usual autoincrement case) need no search
+        i: int = key - ids[0] if ids else 0
+        if not 0 <= i < len(ids) or ids[i] != key:
+            i = bisect_left(ids, key)
+            if i == len(ids) or ids[i] != key:
+                raise KeyError(school_id)
+        return i
+
+    def __contains__(self, school_id: object) -> bool:
+        try:
+            self[school_id]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class SnapshotAdjacency(Mapping):
+    """
+    Read-only adjacency mapping over a CSR graph.
+
+    Behaves like the {school: {neighbor: cost}} dict the sp module and
+    renderers expect, but builds each row on access from the shared arrays,
+    so the whole dict never exists in the worker.
+    """
+    def __init__(self, csr: CSRGraph) -> None:
+        """
+        Wrap a CSR graph.
+
+        Args:
+            csr (CSRGraph): Graph whose rows are exposed
+        """
+        self.csr: CSRGraph = csr
+
+    def __getitem__(self, school_id: int) -> Dict[int, int]:
+        csr: CSRGraph = self.csr
+        row: int = csr.index[school_id]
+        start: int = csr.offsets[row]
+        end: int = csr.offsets[row + 1]
+        ids = csr.ids
+        return {ids[target]: weight for target, weight in zip(csr.targets[start:end], csr.weights[start:end])}
+
+    def __contains__(self, school_id: object) -> bool:
+        return school_id in self.csr.index
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.csr.ids)
+
+    def __len__(self) -> int:
+        return len(self.csr.ids)
+
+
+class PatchedAdjacency(Mapping):
+    """
+    Adjacency mapping with a few rows replaced on top of a shared base.
+
+    Lets a worker apply a cost edit to a mapped graph by copying only the
+    rows that changed, instead of decoding the whole snapshot into a dict.
+    Patching a PatchedAdjacency again stacks the rows onto the same base.
+    """
+    def __init__(self, base: Mapping[int, Dict[int, int]], rows: Dict[int, Dict[int, int]]) -> None:
+        """
+        Wrap a base mapping and the replaced rows.
+
+        Args:
+            base (Mapping[int, Dict[int, int]]): Unchanged graph
+            rows (Dict[int, Dict[int, int]]): School ID -> replacement row (same schools as base)
+        """
+        if isinstance(base, PatchedAdjacency):
+            rows = {**base.rows, **rows}
+            base = base.base
+        self.base: Mapping[int, Dict[int, int]] = base
+        self.rows: Dict[int, Dict[int, int]] = rows
+
+    def __getitem__(self, school_id: int) -> Dict[int, int]:
+        row: Optional[Dict[int, int]] = self.rows.get(school_id)
+        return row if row is not None else self.base[school_id]
+
+    def __contains__(self, school_id: object) -> bool:
+        return school_id in self.base
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.base)
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+
+class SnapshotNames(Mapping):
+    """
+    Read-only school ID -> name mapping decoded from the snapshot on access.
+    """
+    def __init__(self, csr: CSRGraph, offsets: memoryview, blob: memoryview) -> None:
+        """
+        Wrap the name sections.
+
+        Args:
+            csr (CSRGraph): Graph providing the ID -> dense index map
+            offsets (memoryview): Name offsets (n + 1 int64)
+            blob (memoryview): UTF-8 names back to back
+        """
+        self.csr: CSRGraph = csr
+        self.offsets: memoryview = offsets
+        self.blob: memoryview = blob
+
+    def __getitem__(self, school_id: int) -> str:
+        row: int = self.csr.index[school_id]
+        return str(self.blob[self.offsets[row]:self.offsets[row + 1]], 'utf-8')
+
+    def get(self, school_id: int, default: Optional[str] = None) -> Optional[str]:
+        try:
+            return self[school_id]
+        except KeyError:
+            return default
+
+    def __contains__(self, school_id: object) -> bool:
+        return school_id in self.csr.index
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.csr.ids)
+
+    def __len__(self) -> int:
+        return len(self.csr.ids)
+
+
+class GraphSnapshot:
+    """
+    One mapped snapshot file.
+
+    Attributes:
+        version (int): Graph version the snapshot was written for
+        bidirectional (bool): Whether reverse edges were added
+        csr (CSRGraph): CSR graph over zero-copy views of the file
+        graph (SnapshotAdjacency): Adjacency mapping view of csr
+        school_names (SnapshotNames): School ID -> name view
+    """
+    def __init__(self, version: int, bidirectional: bool, csr: CSRGraph, school_names: SnapshotNames,
+                 mapped: mmap.mmap) -> None:
+        """
+        Wrap the views of a mapped file.
+
+        Args:
+            version (int): Graph version of the file
+            bidirectional (bool): Whether reverse edges were added
+            csr (CSRGraph): Graph over views of mapped
+            school_names (SnapshotNames): Name views of mapped
+            mapped (mmap.mmap): The mapping; unmapped once the snapshot is dropped
+        """
+        self.version: int = version
+        self.bidirectional: bool = bidirectional
+        self.csr: CSRGraph = csr
+        self.graph: SnapshotAdjacency = SnapshotAdjacency(csr)
+        self.school_names: SnapshotNames = school_names
+        self._mapped: mmap.mmap = mapped
+
+    @classmethod
+    def open(cls, path: str, version: int, bidirectional: bool) -> Optional['GraphSnapshot']:
+        """
+        Map a snapshot file if it holds the wanted graph.
+
+        Args:
+            path (str): Snapshot file
+            version (int): Graph version needed
+            bidirectional (bool): Graph flavour needed
+
+        Returns:
+            Optional[GraphSnapshot]: Snapshot, or None if missing, stale or malformed
+        """
+        if sys.byteorder != 'little':
+            return None
+        try:
+            with open(path, 'rb') as f:
+                header: bytes = f.read(HEADER.size)
+                if len(header) != HEADER.size:
+                    return None
+                magic, fmt, flags, file_version, n, m, name_bytes = HEADER.unpack(header)
+                if (magic != MAGIC or fmt != FORMAT or file_version != version
+                        or bool(flags & BIDIRECTIONAL) != bidirectional):
+                    return None
+                mapped: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        sizes: List[int] = [8 * n, 8 * (n + 1), 4 * m, 4 * m, 8 * (n + 1), name_bytes]
+        if len(mapped) != HEADER.size + sum(_padded(size) for size in sizes):
+            mapped.close()
+            return None
+        view: memoryview = memoryview(mapped)
+        sections: List[memoryview] = []
+        position: int = HEADER.size
+        for size in sizes:
+            sections.append(view[position:position + size])
+            position += _padded(size)
+        ids, offsets, targets, weights, name_offsets, blob = sections
+        ids = ids.cast('q')
+        csr: CSRGraph = CSRGraph(ids, offsets.cast('q'), targets.cast('i'), weights.cast('i'), SortedIndex(ids))
+        return cls(version, bidirectional, csr, SnapshotNames(csr, name_offsets.cast('q'), blob), mapped)
+
+
+def publish(path: str, version: int, bidirectional: bool, csr: CSRGraph, school_names: Mapping[int, str]) -> None:
+    """
+    Write a snapshot atomically (write to a temp file, then rename).
+
+    Args:
+        path (str): Snapshot file
+        version (int): Graph version of csr
+        bidirectional (bool): Whether reverse edges were added
+        csr (CSRGraph): Graph to write
+        school_names (Mapping[int, str]): Name of every school in csr
+    """
+    if sys.byteorder != 'little':
+        return
+    names: List[bytes] = [(school_names.get(sid) or '').encode('utf-8') for sid in csr.ids]
+    name_offsets: array = array('q', [0])
+    for name in names:
+        name_offsets.append(name_offsets[-1] + len(name))
+    blob: bytes = b''.join(names)
+    sections: List[bytes] = [bytes(array('q', csr.ids)), bytes(array('q', csr.offsets)),
+                             bytes(array('i', csr.targets)), bytes(array('i', csr.weights)),
+                             name_offsets.tobytes(), blob]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path: str = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, FORMAT, BIDIRECTIONAL if bidirectional else 0, version,
+                            len(csr.ids), len(csr.targets), len(blob)))
+        for section in sections:
+            f.write(section)
+            f.write(b'\0' * (_padded(len(section)) - len(section)))
+    os.replace(tmp_path, path)
+
+
+@contextlib.contextmanager
+def build_lock(path: str):
+    """
+    Exclusive flock held while one worker builds and publishes a file.
+
+    Other workers wait on it and then read the published file instead of
+    building the same thing themselves (graph snapshots, contraction
+    hierarchies).
+
+    Args:
+        path (str): File the lock belongs to
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(f'{path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
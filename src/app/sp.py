@@ -48,4 +48,485 @@ def dijkstra(graph: dict, source: int, target: int = None):
         return distances[target], path
     
     # ✅ Return all distances and SPF for debugging
-    return distances, spf
\ No newline at end of file
+    return distances, spf
+
+def shortest_path_tree(graph: dict, source: int):
+    """
+    Compute the full shortest-path tree from a source school.
+    
+    Unlike dijkstra(), paths are not copied on every relaxation: each node
+    only remembers its predecessor, and build_path() walks the tree when a
+    path is actually needed.
+    
+    Args:
+        graph (dict): School connections with costs
+        source (int): Starting school ID
+    
+    Returns:
+        (distances, predecessors): distances holds every node (inf if unreachable),
+        predecessors maps each reached node to the previous node (None for source)
+    """
+    distances: dict = {node: float('inf') for node in graph}
+    distances[source] = 0
+    predecessors: dict = {source: None}
+    pq: list = [(0, source)]
+    visited: set = set()
+    
+    while pq:
+        current_dist, current = heappop(pq)
+        
+        if current in visited:
+            continue
+        visited.add(current)
+        
+        for neighbor, weight in graph[current].items():
+            distance: int = current_dist + weight
+            
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current
+                heappush(pq, (distance, neighbor))
+    
+    return distances, predecessors
+
+
+def build_path(predecessors: dict, source: int, target: int) -> list:
+    """
+    Rebuild the path to a target from a predecessor map.
+    
+    Args:
+        predecessors (dict): Predecessor map from shortest_path_tree()
+        source (int): Starting school ID
+        target (int): Ending school ID
+    
+    Returns:
+        list: School IDs from source to target, empty if target was not reached
+    """
+    if target not in predecessors:
+        return []
+    path: list = []
+    node = target
+    while node is not None:
+        path.append(node)
+        if node == source:
+            break
+        node = predecessors[node]
+    path.reverse()
+    return path
+
+
+def reverse_graph(graph: dict) -> dict:
+    """
+    Build the graph with every edge flipped.
+    
+    Used by searches that run backwards from the target.
+    
+    Args:
+        graph (dict): School connections with costs
+    
+    Returns:
+        dict: For each school, the schools that reach it and the costs
+    """
+    reverse: dict = {node: {} for node in graph}
+    for node, edges in graph.items():
+        for neighbor, weight in edges.items():
+            reverse[neighbor][node] = weight
+    return reverse
+
+
+def bidirectional_dijkstra(graph: dict, reverse: dict, source: int, target: int):
+    """
+    Find the shortest path by searching from both ends at once.
+    
+    The forward search runs on graph from the source, the backward search
+    on the reversed graph from the target, and the search stops as soon as
+    the two frontiers cannot improve the best meeting point.
+    
+    Args:
+        graph (dict): School connections with costs
+        reverse (dict): Reversed graph from reverse_graph()
+        source (int): Starting school ID
+        target (int): Ending school ID
+    
+    Returns:
+        (cost, path, explored): cost is None and path empty if unreachable,
+        explored is the number of nodes settled by both searches
+    """
+    if source == target:
+        return 0, [source], 1
+    graphs: tuple = (graph, reverse)
+    distances: tuple = ({source: 0}, {target: 0})
+    parents: tuple = ({source: None}, {target: None})
+    queues: tuple = ([(0, source)], [(0, target)])
+    settled: tuple = (set(), set())
+    best: float = float('inf')
+    meeting: int = None
+    
+    while queues[0] and queues[1]:
+        # Stop once no path through the frontiers can beat the best meeting
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        # Expand the side with the smaller frontier
+        side: int = 0 if len(queues[0]) <= len(queues[1]) else 1
+        current_dist, current = heappop(queues[side])
+        if current in settled[side]:
+            continue
+        settled[side].add(current)
+        
+        other_distances: dict = distances[1 - side]
+        for neighbor, weight in graphs[side][current].items():
+            distance: int = current_dist + weight
+            if distance < distances[side].get(neighbor, float('inf')):
+                distances[side][neighbor] = distance
+                parents[side][neighbor] = current
+                heappush(queues[side], (distance, neighbor))
+            if neighbor in other_distances and distance + other_distances[neighbor] < best:
+                best = distance + other_distances[neighbor]
+                meeting = neighbor
+    
+    explored: int = len(settled[0]) + len(settled[1])
+    if meeting is None:
+        return None, [], explored
+    # Meeting point -> source via forward parents, then -> target via backward parents
+    path: list = []
+    node: int = meeting
+    while node is not None:
+        path.append(node)
+        node = parents[0][node]
+    path.reverse()
+    node = parents[1][meeting]
+    while node is not None:
+        path.append(node)
+        node = parents[1][node]
+    return best, path, explored
+
+
+def select_landmarks(graph: dict, reverse: dict, count: int) -> list:
+    """
+    Pick landmark schools spread across the graph (farthest-first).
+    
+    Starts from the lowest school ID and repeatedly adds the school that is
+    farthest (in either direction) from every landmark chosen so far.
+    
+    Args:
+        graph (dict): School connections with costs
+        reverse (dict): Reversed graph from reverse_graph()
+        count (int): Number of landmarks wanted
+    
+    Returns:
+        list: Landmark school IDs
+    """
+    if not graph:
+        return []
+    landmarks: list = [min(graph)]
+    closest: dict = {node: float('inf') for node in graph}
+    while len(landmarks) < min(count, len(graph)):
+        last: int = landmarks[-1]
+        for distances in (shortest_path_tree(graph, last)[0], shortest_path_tree(reverse, last)[0]):
+            for node, d in distances.items():
+                if d < closest[node]:
+                    closest[node] = d
+        candidates: list = [(d, node) for node, d in closest.items() if d != float('inf') and node not in landmarks]
+        if not candidates:
+            break
+        landmarks.append(max(candidates)[1])
+    return landmarks
+
+
+def landmark_distances(graph: dict, reverse: dict, landmarks: list) -> list:
+    """
+    Precompute distances from and to each landmark for ALT.
+    
+    Args:
+        graph (dict): School connections with costs
+        reverse (dict): Reversed graph from reverse_graph()
+        landmarks (list): Landmark school IDs
+    
+    Returns:
+        list: One (from_landmark, to_landmark) pair of distance dicts per landmark
+    """
+    return [(shortest_path_tree(graph, landmark)[0], shortest_path_tree(reverse, landmark)[0])
+            for landmark in landmarks]
+
+
+def alt_search(graph: dict, source: int, target: int, landmark_data: list):
+    """
+    Find the shortest path with A*, landmarks and the triangle inequality (ALT).
+    
+    For every landmark L the triangle inequality gives two lower bounds on
+    the remaining cost from v to the target: d(v,L) - d(target,L) and
+    d(L,target) - d(L,v). The largest bound guides the search towards the
+    target, so far fewer schools are settled than with plain Dijkstra.
+    
+    Args:
+        graph (dict): School connections with costs
+        source (int): Starting school ID
+        target (int): Ending school ID
+        landmark_data (list): Output of landmark_distances()
+    
+    Returns:
+        (cost, path, explored): cost is None and path empty if unreachable,
+        explored is the number of nodes settled
+    """
+    bounds: list = [(to_landmark, to_landmark[target], from_landmark, from_landmark[target])
+                    for from_landmark, to_landmark in landmark_data]
+    
+    def heuristic(node: int) -> float:
+        h: float = 0
+        for to_landmark, target_to, from_landmark, from_target in bounds:
+            # inf - finite proves the target is unreachable; nan/-inf give no bound
+            bound: float = to_landmark[node] - target_to
+            if bound > h:
+                h = bound
+            bound = from_target - from_landmark[node]
+            if bound > h:
+                h = bound
+        return h
+    
+    distances: dict = {source: 0}
+    parents: dict = {source: None}
+    start_h: float = heuristic(source)
+    pq: list = [(start_h, source)] if start_h != float('inf') else []
+    visited: set = set()
+    
+    while pq:
+        _, current = heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current == target:
+            break
+        current_dist: int = distances[current]
+        for neighbor, weight in graph[current].items():
+            distance: int = current_dist + weight
+            if distance < distances.get(neighbor, float('inf')):
+                h: float = heuristic(neighbor)
+                if h == float('inf'):
+                    continue
+                distances[neighbor] = distance
+                parents[neighbor] = current
+                heappush(pq, (distance + h, neighbor))
+    
+    if target not in visited:
+        return None, [], len(visited)
+    return distances[target], build_path(parents, source, target), len(visited)
+
+
+def dijkstra_explored(graph: dict, source: int, target: int):
+    """
+    Plain early-exit Dijkstra that also reports how many nodes it settled.
+    
+    Baseline for comparing bidirectional_dijkstra() and alt_search().
+    
+    Args:
+        graph (dict): School connections with costs
+        source (int): Starting school ID
+        target (int): Ending school ID
+    
+    Returns:
+        (cost, path, explored): cost is None and path empty if unreachable
+    """
+    distances: dict = {source: 0}
+    parents: dict = {source: None}
+    pq: list = [(0, source)]
+    visited: set = set()
+    
+    while pq:
+        current_dist, current = heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current == target:
+            break
+        for neighbor, weight in graph[current].items():
+            distance: int = current_dist + weight
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                parents[neighbor] = current
+                heappush(pq, (distance, neighbor))
+    
+    if target not in visited:
+        return None, [], len(visited)
+    return distances[target], build_path(parents, source, target), len(visited)
+
+
+def k_shortest_paths(graph: dict, reverse: dict, source: int, target: int, k: int):
+    """
+    Find up to k loopless paths in order of cost (Yen's algorithm).
+    
+    One Dijkstra on the reversed graph, run until it settles the source,
+    gives the exact distance to the target of every school closer to it
+    than the source. That tree supplies the first path, and every spur
+    search is an A* guided by it: removing edges can only make paths longer,
+    so tree distances (and the search radius for schools outside the tree)
+    are lower bounds, and a spur search ends as soon as it reaches a school
+    whose tree path is still usable.
+    
+    Args:
+        graph (dict): School connections with costs
+        reverse (dict): reverse_graph(graph)
+        source (int): Starting school ID
+        target (int): Ending school ID
+        k (int): Maximum number of paths
+    
+    Returns:
+        (routes, explored): list of (cost, path) sorted by cost, empty if the
+        target is unreachable, and the number of nodes settled by all searches
+    """
+    to_target, next_hops, radius = _reverse_search(reverse, target, source)
+    if source not in to_target or k < 1:
+        return [], len(to_target)
+    
+    # Predecessors in the reversed tree are next hops towards the target
+    first: list = build_path(next_hops, target, source)[::-1]
+    routes: list = [(to_target[source], first)]
+    # Index where each route left its parent; spurs before it were already tried
+    deviations: list = [0]
+    candidates: list = []
+    seen: set = {tuple(first)}
+    explored: int = len(to_target)
+    
+    while len(routes) < k:
+        previous: list = routes[-1][1]
+        start: int = deviations[-1]
+        root_cost: int = sum(graph[a][b] for a, b in zip(previous[:start], previous[1:start + 1]))
+        for i in range(start, len(previous) - 1):
+            spur: int = previous[i]
+            root: list = previous[:i + 1]
+            removed: set = {path[i + 1] for _, path in routes if path[:i + 1] == root}
+            blocked: set = set(root[:-1])
+            spur_cost, spur_path, settled = _spur_search(graph, spur, target, to_target, next_hops, radius, blocked, removed)
+            explored += settled
+            if spur_path:
+                path: list = root[:-1] + spur_path
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heappush(candidates, (root_cost + spur_cost, len(path), i, path))
+            root_cost += graph[spur][previous[i + 1]]
+        if not candidates:
+            break
+        cost, _, deviation, path = heappop(candidates)
+        routes.append((cost, path))
+        deviations.append(deviation)
+    
+    return routes, explored
+
+
+def _reverse_search(reverse: dict, target: int, source: int):
+    """
+    Dijkstra towards the target, stopped once the source is settled.
+    
+    Args:
+        reverse (dict): Reversed school connections
+        target (int): Ending school ID (root of the search)
+        source (int): Starting school ID
+    
+    Returns:
+        (to_target, next_hops, radius): exact distances of settled nodes,
+        their next hop towards the target (None for the target), and the
+        radius reached, a lower bound for every unsettled node (inf if the
+        search ran out, i.e. the other nodes cannot reach the target)
+    """
+    distances: dict = {target: 0}
+    next_hops: dict = {target: None}
+    to_target: dict = {}
+    pq: list = [(0, target)]
+    
+    while pq:
+        current_dist, current = heappop(pq)
+        if current in to_target:
+            continue
+        to_target[current] = current_dist
+        if current == source:
+            # Every node not settled yet is at least this far away
+            return to_target, next_hops, current_dist
+        for neighbor, weight in reverse[current].items():
+            distance: int = current_dist + weight
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                next_hops[neighbor] = current
+                heappush(pq, (distance, neighbor))
+    
+    return to_target, next_hops, float('inf')
+
+
+def _spur_search(graph: dict, spur: int, target: int, to_target: dict, next_hops: dict, radius: float,
+                 blocked: set, removed: set):
+    """
+    A* from a spur node avoiding the root path and some first hops.
+    
+    The search stops at the first settled school whose tree path to the
+    target avoids the root path: with a consistent heuristic that school's
+    key is already the optimal spur cost, and the tree supplies the rest.
+    
+    Args:
+        graph (dict): School connections with costs
+        spur (int): Start of the search
+        target (int): Ending school ID
+        to_target (dict): Exact distances to target from _reverse_search()
+        next_hops (dict): Next hop towards the target of every node in to_target
+        radius (float): Lower bound for nodes missing from to_target
+        blocked (set): Nodes that may not be visited (the root path)
+        removed (set): Neighbors of spur whose edge from spur may not be used
+    
+    Returns:
+        (cost, path, explored): See alt_search()
+    """
+    distances: dict = {spur: 0}
+    parents: dict = {spur: None}
+    pq: list = [(to_target.get(spur, radius), spur)]
+    visited: set = set()
+    # Whether a node's tree path to the target avoids the root path and the spur
+    clean: dict = {spur: False}
+    
+    while pq:
+        _, current = heappop(pq)
+        if current in visited:
+            continue
+        visited.add(current)
+        if current in to_target and _tree_path_clean(current, next_hops, blocked, clean):
+            tail: list = build_path(next_hops, target, current)[::-1]
+            return distances[current] + to_target[current], build_path(parents, spur, current) + tail[1:], len(visited)
+        current_dist: int = distances[current]
+        for neighbor, weight in graph[current].items():
+            if neighbor in blocked or (current == spur and neighbor in removed):
+                continue
+            h: float = to_target.get(neighbor, radius)
+            if h == float('inf'):
+                continue
+            distance: int = current_dist + weight
+            if distance < distances.get(neighbor, float('inf')):
+                distances[neighbor] = distance
+                parents[neighbor] = current
+                heappush(pq, (distance + h, neighbor))
+    
+    return None, [], len(visited)
+
+
+def _tree_path_clean(node: int, next_hops: dict, blocked: set, clean: dict) -> bool:
+    """
+    Check (and memoize) that a node's tree path to the target avoids blocked nodes.
+    
+    Args:
+        node (int): Node in the reversed tree
+        next_hops (dict): Next hop towards the target (None at the target)
+        blocked (set): Nodes the path may not visit
+        clean (dict): Memo of already checked nodes, updated in place
+    
+    Returns:
+        bool: True if the tree path from node is usable
+    """
+    walked: list = []
+    result: bool = True
+    while node is not None:
+        if node in clean:
+            result = clean[node]
+            break
+        if node in blocked:
+            result = False
+            break
+        walked.append(node)
+        node = next_hops[node]
+    for walked_node in walked:
+        clean[walked_node] = result
+    return result
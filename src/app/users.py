@@ -0,0 +1,82 @@
+"""
+Per-worker cache of the identity Flask-Login loads on every request.
+
+load_user() used to query the users table for each authenticated page
+view. It now returns a UserRecord (ID, name, about; never the password
+hash) from a bounded LRU whose entries expire after USER_CACHE_TTL seconds.
+Changes to a User row made by this worker drop its entry immediately;
+other workers pick them up when the entry expires.
+"""
+import time
+from typing import Optional
+
+from flask_login import UserMixin
+from sqlalchemy import event
+
+from app import app, db
+from app.cache import LRUCache
+from app.models import User
+
+
+class UserRecord(UserMixin):
+    """
+    Detached, read-only view of a user used as current_user.
+
+    Attributes:
+        id (str): User identifier
+        name (str): Display name
+        about (str): Optional user description
+    """
+    def __init__(self, id: str, name: str, about: str) -> None:
+        """
+        Wrap the identity columns of one users row.
+
+        Args:
+            id (str): User identifier
+            name (str): Display name
+            about (str): Optional user description
+        """
+        self.id: str = id
+        self.name: str = name
+        self.about: str = about
+
+
+# Entries are (expires at, UserRecord)
+user_cache: LRUCache = LRUCache(maxsize=app.config.get('USER_CACHE_SIZE', 1024))
+
+
+def load(id: str) -> Optional[UserRecord]:
+    """
+    Identity of a logged-in user, from the cache when still fresh.
+
+    Args:
+        id (str): User ID stored in the session
+
+    Returns:
+        Optional[UserRecord]: The user, or None if the ID does not exist
+    """
+    cached: Optional[tuple] = user_cache.get(id)
+    now: float = time.monotonic()
+    if cached is not None and cached[0] > now:
+        return cached[1]
+    row = db.session.query(User.id, User.name, User.about).filter(User.id == id).first()
+    if row is None:
+        user_cache.pop(id)
+        return None
+    record: UserRecord = UserRecord(row.id, row.name, row.about)
+    user_cache.put(id, (now + app.config.get('USER_CACHE_TTL', 60), record))
+    return record
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate(mapper, connection, target: User) -> None:
+    """
+    Drop the cached record of a user row that changed in this worker.
+
+    Args:
+        mapper: SQLAlchemy mapper (unused)
+        connection: SQLAlchemy connection (unused)
+        target (User): Changed user
+    """
+    user_cache.pop(target.id)
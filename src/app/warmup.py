@@ -0,0 +1,78 @@
+"""
+Worker warm-up: do the slow first-request work before serving traffic.
+
+warm_imports() loads the heavy modules and compiles every template; with
+gunicorn's preload_app it runs once in the master, so forked workers share
+the result. warm_graph() builds this worker's cached graph from the
+database and must run after the fork. The /ready endpoint and the gunicorn
+hooks in gunicorn.conf.py both call warm_up().
+"""
+import threading
+import time
+from typing import Dict
+
+from app import app
+
+# Seconds spent in each warm-up step of this process (empty until warmed)
+timings: Dict[str, float] = {}
+_lock: threading.Lock = threading.Lock()
+
+
+def warm_imports() -> None:
+    """
+    Import numpy/matplotlib, compile all Jinja templates and calibrate bcrypt.
+
+    Missing optional packages are skipped: the SVG renderer and the
+    Dijkstra engines work without them.
+    """
+    start: float = time.perf_counter()
+    try:
+        from app import apsp  # noqa: F401 (numpy)
+    except ImportError:
+        pass
+    try:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg  # noqa: F401
+        from matplotlib.figure import Figure  # noqa: F401
+        from PIL import Image  # noqa: F401
+    except ImportError:
+        pass
+    timings['imports'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    timings['templates'] = time.perf_counter() - start
+
+    # Calibrated once here so forked workers inherit the same bcrypt cost
+    from app import passwords
+    start = time.perf_counter()
+    passwords.rounds()
+    timings['bcrypt'] = time.perf_counter() - start
+
+
+def warm_graph() -> None:
+    """
+    Load the cached graph (both directions) for this worker.
+    """
+    from app.optimizer import graph_cache
+    start: float = time.perf_counter()
+    with app.app_context():
+        graph_cache.get(True)
+        graph_cache.get(False)
+    timings['graph'] = time.perf_counter() - start
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Run the warm-up steps that have not run in this process yet.
+
+    Returns:
+        Dict[str, float]: Seconds spent per step
+    """
+    with _lock:
+        if 'bcrypt' not in timings:
+            warm_imports()
+        if 'graph' not in timings:
+            warm_graph()
+    return dict(timings)
+
@@ -0,0 +1,51 @@
+"""
+Shared fixtures: the app runs inside a temporary working directory, so its
+instance folder (database, graph stamp, snapshots) is created there and
+thrown away.
+"""
+import os
+import sys
+
+import pytest
+
+SRC: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """
+    The Flask app over an empty database in a temporary instance folder.
+    """
+    cwd: str = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('campus-link'))
+    sys.path.insert(0, SRC)
+    try:
+        from app import app, db
+        app.config.update(TESTING=True, WTF_CSRF_ENABLED=False, BCRYPT_WORKERS=0, BCRYPT_ROUNDS=4)
+        with app.app_context():
+            db.create_all()
+        yield app
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.fixture(scope='session')
+def client(app):
+    """
+    Logged-in test client over six schools.
+    """
+    from app import db
+    from app.models import School, TransportationCost
+    from app.optimizer import graph_cache
+    with app.app_context():
+        for sid in range(1, 7):
+            db.session.add(School(id=sid, name=f'School {sid}', address='-', _type='high school', status='Open'))
+        for a, b, cost in [(1, 2, 4), (2, 3, 1), (1, 3, 7), (3, 4, 2), (4, 5, 3), (2, 5, 9), (5, 6, 1)]:
+            db.session.add(TransportationCost(from_school_id=a, to_school_id=b, cost=cost))
+        db.session.commit()
+    graph_cache.invalidate()
+    test_client = app.test_client()
+    assert test_client.post('/users/signup', data={'id': 'tester', 'name': 'Tester', 'about': '',
+                                                   'passwd': 'password1', 'passwd_confirm': 'password1'}).status_code == 302
+    assert test_client.post('/users/login', data={'id': 'tester', 'passwd': 'password1'}).status_code == 302
+    return test_client
@@ -0,0 +1,55 @@
+"""
+Migrations upgrade an old schools.db in place, and the hot queries then use their indexes.
+"""
+import sqlite3
+
+import pytest
+from sqlalchemy import create_engine, text
+
+# Schema of a schools.db created before migrations existed: tables only, no secondary indexes
+OLD_SCHEMA: str = '''
+CREATE TABLE users (id VARCHAR NOT NULL, name VARCHAR, about VARCHAR, passwd BLOB, PRIMARY KEY (id));
+CREATE TABLE schools (id INTEGER NOT NULL, name VARCHAR NOT NULL, address VARCHAR, _type VARCHAR NOT NULL,
+                      status VARCHAR NOT NULL, PRIMARY KEY (id));
+CREATE TABLE transportation_costs (from_school_id INTEGER NOT NULL, to_school_id INTEGER NOT NULL,
+                                   cost INTEGER NOT NULL, PRIMARY KEY (from_school_id, to_school_id),
+                                   FOREIGN KEY(from_school_id) REFERENCES schools (id),
+                                   FOREIGN KEY(to_school_id) REFERENCES schools (id));
+INSERT INTO schools VALUES (1, 'North High', '-', 'high school', 'Open'), (2, 'South Middle', '-', 'middle', 'Closed');
+INSERT INTO transportation_costs VALUES (1, 2, 7);
+'''
+
+
+@pytest.fixture
+def old_database(app, tmp_path):
+    """
+    Engine over an old-style schools.db file.
+    """
+    path = tmp_path / 'schools.db'
+    with sqlite3.connect(path) as connection:
+        connection.executescript(OLD_SCHEMA)
+    engine = create_engine(f'sqlite:///{path}')
+    yield engine
+    engine.dispose()
+
+
+def test_migrate_old_database(old_database) -> None:
+    from app import migrations
+    with old_database.connect() as connection:
+        assert connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index' "
+                                       "AND name LIKE 'ix_%'")).all() == []
+
+    applied = migrations.migrate(old_database)
+    assert [migration.version for migration in applied] == [migration.version for migration in migrations.MIGRATIONS]
+    with old_database.connect() as connection:
+        rows = connection.execute(text('SELECT version, name FROM schema_migrations ORDER BY version')).all()
+        assert [tuple(row) for row in rows] == [(m.version, m.name) for m in sorted(migrations.MIGRATIONS)]
+        # Existing rows survive the upgrade
+        assert connection.execute(text('SELECT COUNT(*) FROM schools')).scalar_one() == 2
+        assert connection.execute(text('SELECT cost FROM transportation_costs')).scalar_one() == 7
+
+    # A second run finds nothing to do
+    assert migrations.migrate(old_database) == []
+    with old_database.connect() as connection:
+        assert connection.execute(text('SELECT COUNT(*) FROM schema_migrations')).scalar_one() == len(migrations.MIGRATIONS)
+        assert migrations.check_query_plans(connection) == []
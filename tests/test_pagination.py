@@ -0,0 +1,101 @@
+"""
+Keyset pagination of the school and cost listings.
+"""
+import base64
+import json
+import re
+from typing import List, Tuple
+
+import pytest
+
+NEXT: re.Pattern = re.compile(r'href="([^"]*after=[^"]*)">Next')
+PREVIOUS: re.Pattern = re.compile(r'href="([^"]*before=[^"]*)">&laquo; Previous')
+SCHOOL_ROW: re.Pattern = re.compile(r'href="/schools/(\d+)/costs"')
+COST_ROW: re.Pattern = re.compile(r'<td>\$(\d+)</td>')
+
+
+@pytest.fixture(scope='module')
+def listings(app, client):
+    """
+    Client over enough schools and costs from school 1 to fill several pages.
+    """
+    from app import db
+    from app.models import School, TransportationCost
+    from app.optimizer import graph_cache
+    with app.app_context():
+        for sid in range(100, 130):
+            # Duplicate names out of ID order, so name order needs the ID tie-break
+            db.session.add(School(id=sid, name=f'Extra {sid % 7}', address='-', _type='high school', status='Open'))
+            db.session.add(TransportationCost(from_school_id=1, to_school_id=sid, cost=sid))
+        db.session.commit()
+    graph_cache.invalidate()
+    return client
+
+
+def walk(client, url: str, link: re.Pattern, row: re.Pattern) -> Tuple[List[List[str]], str]:
+    """
+    Follow Next (or Previous) links from url.
+
+    Returns:
+        (pages, last_url): Rows of every page in visiting order and the URL of the last one
+    """
+    pages: List[List[str]] = []
+    while True:
+        response = client.get(url)
+        assert response.status_code == 200
+        html: str = response.get_data(as_text=True)
+        pages.append(row.findall(html))
+        found = link.search(html)
+        if found is None:
+            return pages, url
+        url = found.group(1).replace('&amp;', '&')
+
+
+def check_walks(client, url: str, row: re.Pattern, expected: List[str], limit: int) -> None:
+    """
+    Walk forward to the last page and back again; both must list every row once, in order.
+    """
+    pages, last = walk(client, url, NEXT, row)
+    assert [item for page in pages for item in page] == expected
+    assert all(len(page) == limit for page in pages[:-1])
+    back, _ = walk(client, last, PREVIOUS, row)
+    assert [item for page in reversed(back) for item in page] == expected
+
+
+@pytest.mark.parametrize('sort', ['id', 'name'])
+def test_school_pages(app, listings, sort: str) -> None:
+    from app import db
+    from app.models import School
+    from app.routes import SCHOOL_SORTS
+    with app.app_context():
+        expected: List[str] = [str(school.id) for school in db.session.query(School).order_by(*SCHOOL_SORTS[sort])]
+    check_walks(listings, f'/schools?sort={sort}&limit=7', SCHOOL_ROW, expected, 7)
+
+
+def test_cost_pages(app, listings) -> None:
+    from app import db
+    from app.models import TransportationCost
+    with app.app_context():
+        expected: List[str] = [str(cost.cost) for cost in db.session.query(TransportationCost)
+                               .filter_by(from_school_id=1).order_by(TransportationCost.to_school_id)]
+    check_walks(listings, '/schools/1/costs?limit=7', COST_ROW, expected, 7)
+
+
+def cursor(key: object) -> str:
+    """
+    Encode any JSON value the way pagination.encode_cursor() encodes sort keys.
+    """
+    return base64.urlsafe_b64encode(json.dumps(key).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('after', [
+    'not base64!', cursor('W'), cursor(['W']), cursor([{'a': 1}, 1]), cursor([['W'], 1]),
+    cursor(['W', None]), cursor(['W', 1.5]), cursor(['W', True]),
+], ids=['garbage', 'not-a-list', 'too-short', 'object', 'nested-list', 'null', 'float', 'bool'])
+def test_malformed_cursor(listings, after: str) -> None:
+    assert listings.get(f'/schools?sort=name&after={after}').status_code == 400
+    assert listings.get(f'/schools?sort=name&before={after}').status_code == 400
+
+
+def test_malformed_cost_cursor(listings) -> None:
+    assert listings.get(f'/schools/1/costs?after={cursor([{"a": 1}])}').status_code == 400
@@ -0,0 +1,44 @@
+"""
+Query budgets of the costs and routes pages, warm and after a graph version bump.
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def strict(app, monkeypatch):
+    """
+    Turn over-budget requests into 500s, and report X-Query-Count.
+    """
+    monkeypatch.setitem(app.config, 'QUERY_BUDGET_STRICT', True)
+
+
+def bump_version() -> None:
+    """
+    Bump the graph version, as any school or cost change does.
+    """
+    from app.optimizer import graph_cache
+    graph_cache.invalidate()
+
+
+# endpoint, method, URL, form data, expected status
+REQUESTS: list = [
+    ('school_costs', 'GET', '/schools/1/costs', None, 200),
+    ('school_costs', 'POST', '/schools/1/costs', {'from_school_id': 1, 'to_school': 6, 'cost': 5}, 302),
+    ('school_routes', 'GET', '/schools/1/routes', None, 200),
+    ('school_routes', 'POST', '/schools/1/routes', {'target_school_id': 6}, 200),
+]
+
+
+@pytest.mark.parametrize('cold', [False, True], ids=['warm', 'after-bump'])
+@pytest.mark.parametrize('endpoint, method, url, data, status', REQUESTS,
+                         ids=[f'{method} {url}' for _, method, url, _, _ in REQUESTS])
+def test_query_budget(client, endpoint: str, method: str, url: str, data: dict, status: int, cold: bool) -> None:
+    from app.query_budget import budget_for
+    # Warm the per-version caches first, then optionally drop them again
+    client.open(url, method=method, data=data)
+    if cold:
+        bump_version()
+    response = client.open(url, method=method, data=data)
+    # Strict mode answers an overrun with 500
+    assert response.status_code == status, response.data[:300]
+    assert int(response.headers['X-Query-Count']) <= budget_for(endpoint, method)